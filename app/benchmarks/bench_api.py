@@ -0,0 +1,200 @@
+"""
+End-to-end API benchmark on a seeded dataset.
+
+Run from the app directory:
+
+    python -m benchmarks.bench_api [--users 1000] [--tasks-per-user 1000]
+        [--requests 500] [--output results.json] [--compare old.json]
+
+Seeds users and tasks with the test factories into a throwaway test
+database on the configured backend (SQLite or a local MySQL, see
+ENVIRONMENT), then drives login, task list, search, deep cursor and page
+paging, create and detail through Django's test client, each as a random
+seeded user. Reports requests/s, p50 and p99 per scenario and saves them
+as JSON with the commit they were measured at; `--compare` prints the
+change against an earlier results file.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from .seed import PASSWORD, TITLE_WORDS, seed_tasks, seed_users
+from .utils import percentile, setup, test_database
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class Scenarios:
+    """ One method per scenario; each issues a single request. """
+
+    def __init__(self, client, users, tokens, task_ids):
+        self.client = client
+        self.users = users
+        self.tokens = tokens
+        self.task_ids = task_ids
+        self.cursors = {}
+
+    def auth(self, index):
+        return {"HTTP_AUTHORIZATION": f"Bearer {self.tokens[index]}"}
+
+    def pick(self):
+        return random.randrange(len(self.tokens))
+
+    def login(self):
+        user = self.users[self.pick()]
+        return self.client.post(
+            "/api/v1/auth/login/", {"email": user.email, "password": PASSWORD})
+
+    def task_list(self):
+        return self.client.get("/api/v1/tasks/", **self.auth(self.pick()))
+
+    def task_search(self):
+        return self.client.get(
+            "/api/v1/tasks/", {"search": random.choice(TITLE_WORDS)}, **self.auth(self.pick()))
+
+    def task_cursor_paging(self):
+        """ Follow `next` links, so later requests land deep in the list. """
+        index = self.pick()
+        url = self.cursors.get(index) or "/api/v1/tasks/"
+        response = self.client.get(url, **self.auth(index))
+        self.cursors[index] = response.json()["links"]["next"]
+        return response
+
+    def task_page_number(self):
+        page = random.randint(1, 10)
+        return self.client.get("/api/v1/tasks/", {"page": page}, **self.auth(self.pick()))
+
+    def task_create(self):
+        return self.client.post(
+            "/api/v1/tasks/", {"title": "benchmark"},
+            content_type="application/json", **self.auth(self.pick()))
+
+    def task_detail(self):
+        index = self.pick()
+        task_id = random.choice(self.task_ids[index])
+        return self.client.get(f"/api/v1/tasks/{task_id}/", **self.auth(index))
+
+    names = [
+        "login", "task_list", "task_search", "task_cursor_paging",
+        "task_page_number", "task_create", "task_detail",
+    ]
+
+
+def measure(scenario, requests):
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        request_started = time.perf_counter()
+        response = scenario()
+        latencies.append(time.perf_counter() - request_started)
+        assert response.status_code < 400, (response.status_code, response.content[:200])
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(elapsed / requests * 1000, 2),
+    }
+
+
+def compare(results, path):
+    with open(path) as previous_file:
+        previous = json.load(previous_file)
+    print(f"\nagainst {previous['meta']['commit']} ({path}):")
+    for name, current in results["scenarios"].items():
+        before = previous["scenarios"].get(name)
+        if not before:
+            continue
+        change = (current["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100
+        print(f"{name:<20} p50 {before['p50_ms']:>8.2f} -> {current['p50_ms']:>8.2f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks-per-user", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=500, help="per scenario")
+    parser.add_argument("--sample-users", type=int, default=100, help="users issuing requests")
+    parser.add_argument("--scenarios", nargs="+", choices=Scenarios.names, default=Scenarios.names)
+    parser.add_argument("--no-list-cache", action="store_true", help="bypass the task list cache")
+    parser.add_argument("--fast-hasher", action="store_true",
+                        help="hash with MD5 so login measures everything but PBKDF2")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import override_settings
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from tasks.models import Task
+
+    overrides = {}
+    if args.no_list_cache:
+        overrides["CACHES"] = {
+            **settings.CACHES,
+            settings.TASK_LIST_CACHE_ALIAS: {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        }
+    if args.fast_hasher:
+        overrides["PASSWORD_HASHERS"] = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+    random.seed(0)
+    with test_database(), override_settings(**overrides):
+        started = time.perf_counter()
+        users = seed_users(args.users)
+        total = seed_tasks(
+            users, args.tasks_per_user,
+            progress=lambda written: print(f"\rseeded {written} tasks", end="", flush=True))
+        print(f"\rseeded {len(users)} users and {total} tasks in {time.perf_counter() - started:.0f}s")
+
+        sample = random.sample(users, min(args.sample_users, len(users)))
+        tokens = [str(RefreshToken.for_user(user).access_token) for user in sample]
+        task_ids = [list(Task.objects.filter(user=user).values_list("id", flat=True)[:100]) for user in sample]
+        scenarios = Scenarios(Client(), sample, tokens, task_ids)
+
+        results = {
+            "meta": {
+                "commit": git_commit(),
+                "date": datetime.now(timezone.utc).isoformat(),
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "users": args.users,
+                "tasks": total,
+                "list_cache": not args.no_list_cache,
+                "fast_hasher": args.fast_hasher,
+            },
+            "scenarios": {},
+        }
+        for name in args.scenarios:
+            stats = measure(getattr(scenarios, name), args.requests)
+            results["scenarios"][name] = stats
+            print(f"{name:<20} {stats['rps']:>8.1f} req/s  p50 {stats['p50_ms']:>8.2f} ms"
+                  f"  p99 {stats['p99_ms']:>8.2f} ms")
+
+    output = args.output or f"bench-{results['meta']['commit']}.json"
+    with open(output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"saved {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Concurrent throughput of the task API: sync viewset against async views.
+
+Run from the app directory:
+
+    python -m benchmarks.bench_async_tasks [--concurrency 50] [--requests 2000]
+
+Drives Django's ASGI handler in-process with AsyncClient, once with only
+the router (TaskViewSets run through sync_to_async) and once with the
+async list/detail views mounted in front, alternating list and detail
+requests. Reports requests/s, p50 and p99 latency for each.
+"""
+import argparse
+import asyncio
+import time
+from types import ModuleType
+
+from .utils import percentile, setup, test_database
+
+
+def urlconf(name, patterns):
+    from django.urls import include, path
+
+    module = ModuleType(name)
+    module.urlpatterns = [path('api/v1/tasks/', include((patterns, 'task')))]
+    return module
+
+
+async def drive(token, task_ids, concurrency, total):
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    issued = 0
+
+    async def worker():
+        nonlocal issued
+        while issued < total:
+            n = issued
+            issued += 1
+            if n % 2:
+                url = f"/api/v1/tasks/{task_ids[n % len(task_ids)]}/"
+            else:
+                url = "/api/v1/tasks/"
+            started = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.content
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - started), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=200)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.test.utils import override_settings
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from tasks.models import Task
+    from tasks.urls import tasks as task_urls
+    from user.models import User
+
+    variants = [
+        ("sync TaskViewSets", urlconf("bench_sync_urls", task_urls.router.urls)),
+        ("async views", urlconf("bench_async_urls", task_urls.async_urlpatterns + task_urls.router.urls)),
+    ]
+
+    with test_database():
+        user = User.objects.create(email="bench@example.com", is_active=True)
+        tasks = Task.objects.bulk_create(
+            Task(user=user, title=f"Task {i}", description="benchmark") for i in range(args.tasks))
+        token = str(RefreshToken.for_user(user).access_token)
+        task_ids = [task.id for task in tasks]
+
+        for label, module in variants:
+            with override_settings(ROOT_URLCONF=module):
+                rate, latencies = asyncio.run(drive(token, task_ids, args.concurrency, args.requests))
+            print(
+                f"{label:<20} {rate:>8.1f} req/s"
+                f"  p50 {percentile(latencies, 50) * 1000:>7.1f} ms"
+                f"  p99 {percentile(latencies, 99) * 1000:>7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
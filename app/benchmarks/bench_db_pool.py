@@ -0,0 +1,115 @@
+"""
+Connection handling cost per request: new connections, persistent ones
+and the pool.
+
+Run from the app directory:
+
+    python -m benchmarks.bench_db_pool [--requests 2000] [--threads 8] [--queries 3]
+
+Drives `--requests` simulated requests from `--threads` threads against the
+configured database. Each request runs `--queries` trivial queries between
+Django's request-start and request-finish connection handling, so the
+connection set-up and tear-down dominates. Compares:
+
+    new         CONN_MAX_AGE=0 on the stock backend: a connection per request
+    persistent  CONN_MAX_AGE=None: a connection per thread, kept open
+    pooled      the `core.backends` backend, sized to `--pool-size`
+
+and reports requests/s, p50 and p99 latency and the connections opened.
+The difference is a network handshake (and authentication) per request,
+so run it against MySQL; on SQLite opening a connection is nearly free.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import percentile, setup
+
+POOLED_ENGINES = {
+    "django.db.backends.mysql": "core.backends.mysql",
+    "django.db.backends.sqlite3": "core.backends.sqlite3",
+}
+STOCK_ENGINES = {pooled: stock for stock, pooled in POOLED_ENGINES.items()}
+
+
+def configure(alias, base, **overrides):
+    from django.db import DEFAULT_DB_ALIAS, connections
+
+    connections.settings[alias] = connections.configure_settings(
+        {DEFAULT_DB_ALIAS: {**base, **overrides}})[DEFAULT_DB_ALIAS]
+    return alias
+
+
+def run(alias, requests, threads, queries):
+    from django.db import connections
+
+    opened = []
+    pools = set()
+
+    def request():
+        started = time.perf_counter()
+        connection = connections[alias]
+        # What the request_started and request_finished signals do.
+        connection.close_if_unusable_or_obsolete()
+        was_connected = connection.connection is not None
+        for _ in range(queries):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+        if not was_connected:
+            opened.append(1)
+        if hasattr(connection, "pool"):
+            pools.add(connection.pool)
+        connection.close_if_unusable_or_obsolete()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        latencies = list(executor.map(lambda _: request(), range(requests)))
+        # Close each worker thread's persistent connection.
+        list(executor.map(lambda _: connections[alias].close(), range(threads)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        # Pooled wrappers "connect" per request but borrow from the pool.
+        "connects": sum(pool.stats()["opened"] for pool in pools) if pools else len(opened),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=3, help="per request")
+    parser.add_argument("--pool-size", type=int, default=8)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.db import connections
+
+    from core.pool import close_pool
+
+    base = dict(connections.settings["default"])
+    stock = STOCK_ENGINES.get(base["ENGINE"], base["ENGINE"])
+    if stock not in POOLED_ENGINES:
+        parser.error(f"No pooled backend for {stock}.")
+    pool = {**base.get("POOL", {}), "MIN_SIZE": 1, "MAX_SIZE": args.pool_size}
+
+    modes = {
+        "new": configure("bench_new", base, ENGINE=stock, CONN_MAX_AGE=0),
+        "persistent": configure("bench_persistent", base, ENGINE=stock, CONN_MAX_AGE=None),
+        "pooled": configure("bench_pooled", base, ENGINE=POOLED_ENGINES[stock], CONN_MAX_AGE=0, POOL=pool),
+    }
+    print(f"{stock}, {args.requests} requests from {args.threads} threads, {args.queries} queries each")
+    for label, alias in modes.items():
+        stats = run(alias, args.requests, args.threads, args.queries)
+        print(f"{label:<11} {stats['rps']:>9.1f} req/s  p50 {stats['p50_ms']:>7.3f} ms"
+              f"  p99 {stats['p99_ms']:>7.3f} ms  {stats['connects']:>5} connects")
+    close_pool(modes["pooled"])
+
+
+if __name__ == "__main__":
+    main()
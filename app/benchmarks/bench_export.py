@@ -0,0 +1,87 @@
+"""
+Peak memory and throughput of the streaming task export.
+
+Run from the app directory:
+
+    python -m benchmarks.bench_export [--tasks N] [--chunk-size N]
+
+Seeds N tasks (1M by default) for one user in a throwaway test database,
+then streams them as NDJSON and CSV, and serializes a tenth of them the way
+a non-paginated list would, reporting Python heap peaks via tracemalloc.
+"""
+import argparse
+import time
+import tracemalloc
+
+from .utils import setup, test_database
+
+SEED_BATCH = 5000
+
+
+def seed(user, count):
+    from tasks.models import Task
+
+    for start in range(0, count, SEED_BATCH):
+        Task.objects.bulk_create(
+            Task(user=user, title=f"Task {i}", description="lorem ipsum " * 8)
+            for i in range(start, min(count, start + SEED_BATCH))
+        )
+
+
+def measure(consume):
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        rows = consume()
+        elapsed = time.perf_counter() - started
+        return rows, elapsed, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.db import reset_queries
+
+    from tasks.export import iter_csv, iter_ndjson
+    from tasks.models import Task
+    from tasks.serializers import TaskSerializer
+    from user.models import User
+
+    with test_database():
+        user = User.objects.create_user(email="bench@example.com", password="x", is_active=True)
+        seed(user, args.tasks)
+        queryset = Task.objects.filter(user=user)
+
+        def stream(writer):
+            def consume():
+                lines = 0
+                for chunk in writer([queryset], args.chunk_size):
+                    lines += chunk.count("\n")
+                    # DEBUG keeps executed queries; they are not part of the export.
+                    reset_queries()
+                return lines
+            return consume
+
+        def materialize():
+            return len(TaskSerializer(queryset[:args.tasks // 10], many=True).data)
+
+        cases = [
+            ("streamed NDJSON", stream(iter_ndjson)),
+            ("streamed CSV", stream(iter_csv)),
+            ("serialized list (1/10 of rows)", materialize),
+        ]
+        for label, consume in cases:
+            rows, elapsed, peak = measure(consume)
+            print(f"{label:<32} {rows:>9} rows {rows / elapsed:>10.0f} rows/s "
+                  f"peak {peak / 2 ** 20:>8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Login throughput before and after single token issuance.
+
+Run from the app directory:
+
+    python -m benchmarks.bench_login [--logins N]
+
+Uses a throwaway test database on the configured backend. Passwords are
+hashed with MD5 so the numbers show the work around hashing (token
+minting and the last_login write) rather than PBKDF2.
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from .utils import setup, test_database
+
+
+def legacy_serializer_class():
+    """ The login serializer as it was: two token pairs and a full-row save. """
+    from django.conf import settings
+    from django.utils import timezone
+    from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+    from user.serializers import CustomObtainTokenPairSerializer
+
+    class LegacyObtainTokenPairSerializer(CustomObtainTokenPairSerializer):
+
+        def validate(self, attrs):
+            data = TokenObtainPairSerializer.validate(self, attrs)
+            options = {"hours": settings.TOKEN_LIFESPAN}
+            refresh = self.get_token(self.user)
+            access_token = refresh.access_token
+            access_token.set_exp(lifetime=timedelta(**options))
+            self.user.last_login = timezone.now()
+            self.user.save()
+            data['refresh'] = str(refresh)
+            data['access'] = str(access_token)
+            return data
+
+    return LegacyObtainTokenPairSerializer
+
+
+def measure(serializer_class, credentials, logins):
+    started = time.perf_counter()
+    for _ in range(logins):
+        serializer = serializer_class(data=credentials)
+        serializer.is_valid(raise_exception=True)
+    return logins / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logins", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.test.utils import override_settings
+
+    from user.models import User
+    from user.serializers import CustomObtainTokenPairSerializer
+
+    with test_database():
+        with override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]):
+            credentials = {"email": "bench@example.com", "password": "passer@@@111"}
+            User.objects.create_user(is_active=True, **credentials)
+
+            cases = [
+                ("before: two token pairs, full save", legacy_serializer_class(), 0),
+                ("after: one token pair, last_login only", CustomObtainTokenPairSerializer, 0),
+                ("after: coalesced last_login (60s)", CustomObtainTokenPairSerializer, 60),
+            ]
+            for label, serializer_class, interval in cases:
+                with override_settings(LAST_LOGIN_UPDATE_INTERVAL=interval):
+                    rate = measure(serializer_class, credentials, args.logins)
+                print(f"{label:<42} {rate:>10.1f} logins/s")
+
+
+if __name__ == "__main__":
+    main()
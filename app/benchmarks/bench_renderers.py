@@ -0,0 +1,80 @@
+"""
+Rendering and parsing cost of a task list page per renderer.
+
+Run from the app directory:
+
+    python -m benchmarks.bench_renderers [--rows 1000] [--rounds 200]
+
+Builds the body of a `--rows` task page exactly as the list endpoint does
+(paginated envelope included) and times DRF's JSONRenderer/JSONParser
+against the orjson and MessagePack ones, reporting the best time per page
+and the body size.
+"""
+import argparse
+import gc
+import io
+import time
+
+from .utils import setup, test_database
+
+
+def best(fn, rounds):
+    gc.disable()
+    try:
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+    finally:
+        gc.enable()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.test import RequestFactory
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+
+    from core.pagination import KeysetPagination
+    from core.parsers import MessagePackParser, ORJSONParser
+    from core.renderers import MessagePackRenderer, ORJSONRenderer
+    from tasks.models import Task
+    from tasks.serializers import TaskValuesSerializer
+    from user.models import User
+
+    with test_database():
+        user = User.objects.create(email="bench@example.com", is_active=True)
+        Task.objects.bulk_create(
+            Task(user=user, title=f"Task {i}", description="lorem ipsum " * 8)
+            for i in range(args.rows))
+
+        request = Request(RequestFactory().get("/api/v1/tasks/", {"page_size": args.rows}))
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(
+            TaskValuesSerializer.values(Task.objects.filter(user=user)), request)
+        data = paginator.get_paginated_response(TaskValuesSerializer(page).data).data
+
+        cases = [
+            ("DRF json", JSONRenderer(), JSONParser()),
+            ("orjson", ORJSONRenderer(), ORJSONParser()),
+            ("msgpack", MessagePackRenderer(), MessagePackParser()),
+        ]
+        for label, renderer, body_parser in cases:
+            body = renderer.render(data)
+            render = best(lambda: renderer.render(data), args.rounds)
+            parse = best(lambda: body_parser.parse(io.BytesIO(body)), args.rounds)
+            print(f"{label:<10} render {render * 1000:>7.3f} ms  parse {parse * 1000:>7.3f} ms"
+                  f"  {len(body) / 1024:>8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
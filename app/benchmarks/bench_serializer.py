@@ -0,0 +1,69 @@
+"""
+Per-row cost of list serialization: TaskSerializer against the values() path.
+
+Run from the app directory:
+
+    python -m benchmarks.bench_serializer [--rows 1000] [--rounds 50]
+
+Serializes a page of `--rows` tasks (1000 is the largest page size) from a
+throwaway test database, timing the query plus serialization and the
+serialization alone, and reports microseconds per row.
+"""
+import argparse
+import gc
+import time
+
+from .utils import setup, test_database
+
+
+def per_row(fn, rows, rounds):
+    """ Best of `rounds`, with the garbage collector off as in timeit. """
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return best / rows * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+
+    from tasks.models import Task
+    from tasks.serializers import TaskSerializer, TaskValuesSerializer
+    from user.models import User
+
+    with test_database():
+        user = User.objects.create(email="bench@example.com", is_active=True)
+        Task.objects.bulk_create(
+            Task(user=user, title=f"Task {i}", description="lorem ipsum " * 8)
+            for i in range(args.rows))
+        queryset = Task.objects.filter(user=user)[:args.rows]
+        instances = list(queryset)
+        rows = list(TaskValuesSerializer.values(queryset))
+
+        cases = [
+            ("TaskSerializer, query + serialize",
+             lambda: TaskSerializer(list(queryset.all()), many=True).data),
+            ("values() path, query + serialize",
+             lambda: TaskValuesSerializer(list(TaskValuesSerializer.values(queryset))).data),
+            ("TaskSerializer, serialize only",
+             lambda: TaskSerializer(instances, many=True).data),
+            ("values() path, serialize only",
+             lambda: TaskValuesSerializer(rows).data),
+        ]
+        for label, fn in cases:
+            print(f"{label:<36} {per_row(fn, args.rows, args.rounds):>8.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
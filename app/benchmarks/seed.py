@@ -0,0 +1,65 @@
+"""
+Bulk seeding with the test factories.
+
+Objects are built with `UserFactory`/`TaskFactory` and written with
+`bulk_create`, so millions of tasks take minutes rather than hours. Every
+user shares one password hash computed up front instead of running the
+hasher per user.
+"""
+import random
+
+import factory
+
+BATCH_SIZE = 5000
+PASSWORD = "passer@@@111"
+# Titles draw from these so searches have a predictable share of matches.
+TITLE_WORDS = ("report", "groceries", "invoice", "meeting", "review", "dentist")
+
+
+def seed_users(count, password=PASSWORD):
+    from user.hashing import make_password
+    from user.models import User
+    from user.tests.factories import UserFactory
+
+    encoded = make_password(password)
+    users = []
+    for start in range(0, count, BATCH_SIZE):
+        batch = UserFactory.build_batch(
+            min(BATCH_SIZE, count - start),
+            # set_password(None) is cheap; the real hash is shared below.
+            password=None,
+            email=factory.Sequence(lambda n, start=start: f"bench{start + n}@example.com"),
+            is_active=True,
+        )
+        for user in batch:
+            user.password = encoded
+        users += User.objects.bulk_create(batch)
+    return users
+
+
+def seed_tasks(users, per_user, progress=None):
+    """ Give every user `per_user` tasks, calling `progress(written)` per batch. """
+    from tasks.models import Task
+    from tasks.tests.factories import TaskFactory
+
+    pending = []
+    written = 0
+    for user in users:
+        pending += TaskFactory.build_batch(
+            per_user,
+            user=user,
+            title=factory.LazyFunction(
+                lambda: f"{random.choice(TITLE_WORDS)} {random.randint(1, 10_000)}"),
+            description=factory.Faker("sentence"),
+            is_completed=factory.LazyFunction(lambda: random.random() < 0.3),
+        )
+        if len(pending) >= BATCH_SIZE:
+            Task.objects.bulk_create(pending, batch_size=BATCH_SIZE)
+            written += len(pending)
+            pending = []
+            if progress:
+                progress(written)
+    if pending:
+        Task.objects.bulk_create(pending, batch_size=BATCH_SIZE)
+        written += len(pending)
+    return written
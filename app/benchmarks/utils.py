@@ -0,0 +1,33 @@
+import os
+from contextlib import contextmanager
+
+import django
+from decouple import config
+
+
+def setup():
+    """ Configure Django the way manage.py does. """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.' + config('ENVIRONMENT'))
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """ Run against a throwaway test database on the configured backend. """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
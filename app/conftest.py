@@ -1,4 +1,5 @@
 import pytest
+from django.core.cache import caches
 from user.models import User
 from rest_framework.test import APIClient
 from django.urls import reverse
@@ -13,6 +14,13 @@ from tasks.tests.factories import TaskFactory
 register(UserFactory)
 register(TaskFactory)
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Each test rolls the database back, so cached data must go with it."""
+    for cache in caches.all():
+        cache.clear()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -58,3 +66,11 @@ def authenticate_user(api_client, active_user: User, auth_user_password):
 
     return _user
 
+
+@pytest.fixture
+def client(api_client, authenticate_user):
+    """ `api_client` logged in as an active user, who is `client.user_instance`. """
+    user = authenticate_user()
+    api_client.credentials(HTTP_AUTHORIZATION="Bearer " + user["token"])
+    api_client.user_instance = user["user_instance"]
+    return api_client
@@ -0,0 +1,12 @@
+from django.db.backends.mysql import base
+
+from core.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """ The MySQL backend with pooled connections, see `core.pool`. """
+
+    @staticmethod
+    def check_pooled_connection(connection):
+        # A protocol-level ping, cheaper than running a query.
+        connection.ping()
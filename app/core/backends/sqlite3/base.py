@@ -0,0 +1,11 @@
+from django.db.backends.sqlite3 import base
+
+from core.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """
+    The SQLite backend with pooled connections, for local runs and tests
+    of the pool (see `core.pool`). In-memory databases are never closed,
+    so they are never pooled either.
+    """
@@ -0,0 +1,57 @@
+"""
+Sparse fieldsets: `?fields=id,title` limits what GET responses contain.
+
+Views select only the requested columns (`only()`/`values()`), so large
+fields that were not asked for are neither read nor sent.
+"""
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_QUERY_PARAM = "fields"
+
+
+def get_requested_fields(request, allowed):
+    """
+    Return the requested subset of `allowed` in declaration order, or None
+    when the request does not ask for one.
+    """
+    raw = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not raw:
+        return None
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValidationError(
+            {FIELDS_QUERY_PARAM: [f"Unknown field(s): {', '.join(sorted(unknown))}."]})
+    return tuple(name for name in allowed if name in requested)
+
+
+class SparseFieldsSerializerMixin:
+    """ Accepts `fields=` to keep only those of the serializer's fields. """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class SparseFieldsViewMixin:
+    """
+    Passes `?fields=` to the serializer of read requests. Views push
+    `get_requested_fields()` down into their querysets.
+    """
+
+    def get_sparse_fields_allowed(self):
+        return self.serializer_class.Meta.fields
+
+    def get_requested_fields(self):
+        if self.request.method not in SAFE_METHODS:
+            return None
+        return get_requested_fields(self.request, self.get_sparse_fields_allowed())
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs.setdefault("fields", fields)
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,151 @@
+"""
+In-process request metrics in the Prometheus text format.
+
+`core.middleware.MetricsMiddleware` records every request here; the
+`metrics` view renders the totals for scraping. Counters live in the
+worker process, so each process is scraped (or labelled) separately.
+Apps add their own samples with `register_collector`.
+"""
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def samples(self, name, labels):
+        for bound, count in zip(self.buckets, self.counts):
+            yield f"{name}_bucket", {**labels, "le": _format_value(bound)}, count
+        yield f"{name}_bucket", {**labels, "le": "+Inf"}, self.count
+        yield f"{name}_sum", labels, self.sum
+        yield f"{name}_count", labels, self.count
+
+
+class RequestMetrics:
+    """ What one request spent, filled in while it runs. """
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.render_seconds = 0.0
+        self.render_started = None
+
+
+class MetricsRegistry:
+    histograms = {
+        "http_request_duration_seconds": ("Request latency.", LATENCY_BUCKETS),
+        "http_request_db_queries": ("SQL queries per request.", QUERY_BUCKETS),
+        "http_request_db_seconds": ("SQL time per request.", LATENCY_BUCKETS),
+        "http_request_render_seconds": ("Response rendering (serialization) time.", LATENCY_BUCKETS),
+        "http_response_size_bytes": ("Response body size.", SIZE_BUCKETS),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = defaultdict(dict)
+
+    def observe(self, route, method, status, duration, metrics, size=None):
+        labels = (("route", route), ("method", method), ("status", str(status)))
+        values = {
+            "http_request_duration_seconds": duration,
+            "http_request_db_queries": metrics.queries,
+            "http_request_db_seconds": metrics.query_seconds,
+            "http_request_render_seconds": metrics.render_seconds,
+            "http_response_size_bytes": size,
+        }
+        with self._lock:
+            for name, value in values.items():
+                if value is None:
+                    continue
+                series = self._series[name]
+                if labels not in series:
+                    series[labels] = Histogram(self.histograms[name][1])
+                series[labels].observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, (help_text, _) in self.histograms.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for labels, histogram in sorted(self._series[name].items()):
+                    for sample, sample_labels, value in histogram.samples(name, dict(labels)):
+                        lines.append(_format_sample(sample, sample_labels, value))
+        described = set()
+        for collector in _collectors:
+            for name, kind, help_text, value, *labels in collector():
+                if name not in described:
+                    described.add(name)
+                    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                lines.append(_format_sample(name, labels[0] if labels else {}, value))
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+_collectors = []
+
+
+def register_collector(collector):
+    """
+    Add `collector`, a callable returning (name, type, help, value) tuples,
+    to every scrape. A fifth item, a dict of labels, tells apart samples
+    of the same name, which must be returned together.
+    """
+    if collector not in _collectors:
+        _collectors.append(collector)
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _format_sample(name, labels, value):
+    if labels:
+        rendered = ",".join(
+            '{}="{}"'.format(key, str(val).replace("\\", "\\\\").replace('"', '\\"'))
+            for key, val in labels.items()
+        )
+        return f"{name}{{{rendered}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint, for bearers of METRICS_TOKEN. Without a
+    token it is only served with DEBUG on.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not constant_time_compare(supplied, token):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
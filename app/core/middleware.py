@@ -0,0 +1,97 @@
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .metrics import RequestMetrics, registry
+
+_current_metrics = ContextVar("request_metrics", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """ Execute wrapper timing every query run for a measured request. """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.query_seconds += time.perf_counter() - started
+
+
+def install_query_recorder(connection, **kwargs):
+    # Connections are per thread; async views query from executor threads.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class MetricsMiddleware:
+    """
+    Record latency, SQL query count and time, rendering time and response
+    size per route in `core.metrics.registry`, and report them to the
+    client in a Server-Timing header.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(install_query_recorder, dispatch_uid="core.metrics.record_query")
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    def process_template_response(self, request, response):
+        """ Time the render of DRF responses, i.e. their serialization. """
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            metrics.render_started = time.perf_counter()
+
+            def rendered(response):
+                metrics.render_seconds += time.perf_counter() - metrics.render_started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def start(self):
+        metrics = RequestMetrics()
+        return metrics, _current_metrics.set(metrics), time.perf_counter()
+
+    def finish(self, request, response, metrics, started):
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        route = match.view_name if match else "unmatched"
+        size = None if response.streaming else len(response.content)
+        registry.observe(route, request.method, response.status_code, duration, metrics, size)
+
+        if getattr(settings, "METRICS_SERVER_TIMING", True):
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={metrics.query_seconds * 1000:.1f};desc="{metrics.queries} queries"',
+                f"render;dur={metrics.render_seconds * 1000:.1f}",
+                f"total;dur={duration * 1000:.1f}",
+            ])
+        return response
@@ -1,14 +1,49 @@
+import json
 import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import partial
+from itertools import chain
 
-from rest_framework.pagination import PageNumberPagination
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 DEFAULT_PAGE = 1
 
 
+def get_view_count(view):
+    """
+    The row count `view.get_pagination_count()` knows without a COUNT(*),
+    e.g. from a counters table, or None to count the queryset.
+    """
+    get_count = getattr(view, "get_pagination_count", None)
+    return get_count() if get_count is not None else None
+
+
+class CountedPaginator(Paginator):
+    """ A Paginator that is given its `count` instead of querying it. """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+
+
 class CustomPagination(PageNumberPagination):
     page_size_query_param = "page_size"
 
+    def paginate_queryset(self, queryset, request, view=None, count=None):
+        if count is None:
+            count = get_view_count(view)
+        self.django_paginator_class = partial(CountedPaginator, count=count)
+        return super().paginate_queryset(queryset, request, view)
+
     def get_paginated_response(self, data):
         total_results = self.page.paginator.count
         total_pages = math.ceil(total_results / self.page_size)
@@ -39,3 +74,292 @@ class StandardResultsPagination(PageNumberPagination):
     page_size = 100
     page_size_query_param = "page_size"
     max_page_size = 1000
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination seeking on a unique ordering instead of LIMIT/OFFSET.
+
+    Every page is a single indexed range scan, so page N costs the same as
+    page 1. The response keeps the envelope of `CustomPagination`; `total`
+    and `total_pages` are only computed when asked for with `?total=exact`
+    (a COUNT(*)) or `?total=approx` (a COUNT capped at `max_count` rows),
+    unless the view knows the count already (see `get_view_count`).
+    Requests still sending `?page=` are served by `CustomPagination`.
+
+    Querysets already ordered by a filter (e.g. search relevance) are paged
+    on that ordering, with the primary key appended to keep it unique.
+
+    `paginate_querysets` pages over several querysets on different
+    databases, e.g. shards, as if they were one.
+    """
+    ordering = ("-created_at", "-id")
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    total_query_param = "total"
+    legacy_query_param = "page"
+    max_count = 10000
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_legacy(request):
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        page_queryset = self.get_page_queryset(queryset, request)
+        self.total = self.get_total(queryset, request, view)
+        return self.set_page(list(page_queryset))
+
+    def paginate_querysets(self, querysets, request, view=None):
+        """
+        `paginate_queryset` over the union of `querysets`. Each is paged
+        with the same cursor and the pages merged on the ordering, so a page
+        costs one range scan per queryset. Legacy `?page=N` requests merge
+        the first N pages of each instead.
+        """
+        if len(querysets) == 1:
+            return self.paginate_queryset(querysets[0], request, view)
+        if self.use_legacy(request):
+            return self.paginate_legacy_querysets(querysets, request, view)
+
+        pages = [list(self.get_page_queryset(queryset, request)) for queryset in querysets]
+        self.total = self.get_querysets_total(querysets, request, view)
+        reverse = self.cursor is not None and self.cursor["reverse"]
+        rows = self.merge(chain.from_iterable(pages), self.get_ordering(reverse))
+        return self.set_page(rows[:self.page_size + 1])
+
+    def paginate_legacy_querysets(self, querysets, request, view=None):
+        self.position_fields = self.get_position_fields(querysets[0])
+        try:
+            page_number = max(int(request.query_params[self.legacy_query_param]), 1)
+        except ValueError:
+            page_number = 1
+        limit = page_number * self.legacy.get_page_size(request)
+        rows = self.merge(
+            chain.from_iterable(queryset.order_by(*self.position_fields)[:limit] for queryset in querysets),
+            self.position_fields)
+        count = get_view_count(view)
+        if count is None:
+            count = sum(queryset.count() for queryset in querysets)
+        return self.legacy.paginate_queryset(rows, request, view, count=count)
+
+    def get_querysets_total(self, querysets, request, view=None):
+        if request.query_params.get(self.total_query_param) in ("exact", "approx"):
+            total = get_view_count(view)
+            if total is not None:
+                return total
+        totals = [self.get_total(queryset, request) for queryset in querysets]
+        return None if None in totals else sum(totals)
+
+    def merge(self, rows, ordering):
+        """ Sort rows of several pages on `ordering`, one stable sort per field. """
+        rows = list(rows)
+        for field in reversed(ordering):
+            name = field.lstrip("-")
+            rows.sort(
+                key=lambda row: row[name] if isinstance(row, dict) else getattr(row, name),
+                reverse=field.startswith("-"))
+        return rows
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """ `paginate_queryset` for async views, through the async ORM. """
+        if self.use_legacy(request):
+            return await sync_to_async(self.legacy.paginate_queryset)(queryset, request, view)
+
+        page_queryset = self.get_page_queryset(queryset, request)
+        self.total = await self.aget_total(queryset, request)
+        return self.set_page([obj async for obj in page_queryset])
+
+    def use_legacy(self, request):
+        self.legacy = None
+        if self.legacy_query_param in request.query_params:
+            self.legacy = CustomPagination()
+        return self.legacy is not None
+
+    def get_page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        self.position_fields = self.get_position_fields(queryset)
+        self.cursor = self.decode_cursor(request, queryset)
+        reverse = self.cursor is not None and self.cursor["reverse"]
+        ordering = self.get_ordering(reverse)
+
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_seek_filter(ordering, self.cursor["position"]))
+
+        # Fetch one extra row to find out whether there is a following page.
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.cursor is not None and self.cursor["reverse"]:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+
+        total_pages = None
+        if self.total is not None:
+            total_pages = math.ceil(self.total / self.page_size)
+
+        return Response(
+            {
+                "links": {
+                    "next": self.get_next_link(),
+                    "previous": self.get_previous_link(),
+                },
+                "total": self.total,
+                "total_pages": total_pages,
+                "current_page": None,
+                "page_size": len(data),
+                "results": data,
+            }
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_total(self, queryset, request, view=None):
+        mode = request.query_params.get(self.total_query_param)
+        if mode in ("exact", "approx"):
+            total = get_view_count(view)
+            if total is not None:
+                return total
+        if mode == "exact":
+            return queryset.count()
+        if mode == "approx":
+            return queryset.order_by()[:self.max_count].count()
+        return None
+
+    async def aget_total(self, queryset, request):
+        mode = request.query_params.get(self.total_query_param)
+        if mode == "exact":
+            return await queryset.acount()
+        if mode == "approx":
+            return await queryset.order_by()[:self.max_count].acount()
+        return None
+
+    def get_position_fields(self, queryset):
+        explicit = queryset.query.order_by
+        if not explicit or not all(isinstance(field, str) for field in explicit):
+            return tuple(self.ordering)
+        if not {"id", "-id", "pk", "-pk"} & set(explicit):
+            explicit = (*explicit, "-id")
+        return tuple(explicit)
+
+    def get_ordering(self, reverse=False):
+        if not reverse:
+            return self.position_fields
+        return tuple(
+            field[1:] if field.startswith("-") else "-" + field
+            for field in self.position_fields
+        )
+
+    def get_seek_filter(self, ordering, position):
+        """
+        Build `(a, b) > (x, y)` in the direction of `ordering` as
+        `a > x OR (a = x AND b > y)`, which every backend can range-scan.
+        """
+        seek = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            seek |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return seek
+
+    def get_position(self, instance):
+        """ Position of a model instance or of a `values()` row. """
+        position = []
+        for field in self.position_fields:
+            name = field.lstrip("-")
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            position.append(value.isoformat() if hasattr(value, "isoformat") else str(value))
+        return position
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({"p": position, "r": int(reverse)}, separators=(",", ":"))
+        encoded = urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode()))
+            raw_position = payload["p"]
+            if len(raw_position) != len(self.position_fields):
+                raise ValueError
+            position = [
+                self.get_output_field(queryset, field.lstrip("-")).to_python(value)
+                for field, value in zip(self.position_fields, raw_position)
+            ]
+            reverse = bool(payload.get("r"))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return {"position": position, "reverse": reverse}
+
+    def get_output_field(self, queryset, name):
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        if name == "pk":
+            return queryset.model._meta.pk
+        return queryset.model._meta.get_field(name)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.total_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Include the total: `exact` or `approx`.",
+                "schema": {"type": "string", "enum": ["exact", "approx"]},
+            },
+        ]
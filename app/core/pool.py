@@ -0,0 +1,326 @@
+"""
+Database connection pooling.
+
+With CONN_MAX_AGE=0 Django opens a connection per request; persistent
+connections keep one per thread instead, which under ASGI, where sync code
+runs on executor threads, means as many connections as threads. The
+backends in `core.backends` borrow raw connections from a process-wide
+`ConnectionPool` per database alias instead, and hand them back when
+Django closes them at the end of each request, so WSGI and ASGI workers
+both reuse a bounded set of connections.
+
+A database's POOL setting configures its pool:
+
+    MIN_SIZE        connections opened on first use and kept while idle
+    MAX_SIZE        most connections open at once
+    TIMEOUT         seconds to wait for a free connection before failing
+    MAX_LIFETIME    seconds after which a connection is replaced
+    MAX_IDLE        seconds an idle connection above MIN_SIZE is kept
+    CHECK_INTERVAL  idle seconds after which a connection is checked before reuse
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from django.utils.functional import cached_property
+
+from .metrics import register_collector
+
+DEFAULTS = {
+    "MIN_SIZE": 1,
+    "MAX_SIZE": 10,
+    "TIMEOUT": 30,
+    "MAX_LIFETIME": 3600,
+    "MAX_IDLE": 600,
+    "CHECK_INTERVAL": 30,
+}
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of DB-API connections. Connections are checked with
+    `check(connection)` when reused after CHECK_INTERVAL idle seconds, and
+    replaced once older than MAX_LIFETIME.
+    """
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self, check, params=None, **options):
+        options = {**DEFAULTS, **options}
+        self.min_size = options["MIN_SIZE"]
+        self.max_size = options["MAX_SIZE"]
+        self.timeout = options["TIMEOUT"]
+        self.max_lifetime = options["MAX_LIFETIME"]
+        self.max_idle = options["MAX_IDLE"]
+        self.check_interval = options["CHECK_INTERVAL"]
+        self.check = check
+        self.params = params
+        self.pid = os.getpid()
+
+        self._lock = threading.Condition()
+        self._idle = deque()  # (connection, created, released), most recent last
+        self._in_use = {}  # id(connection) -> created
+        self._reserved = 0  # being opened or checked
+        self.waiting = 0
+        self.acquired = 0
+        self.opened = 0
+        self.discarded = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+
+    @property
+    def size(self):
+        return len(self._idle) + len(self._in_use) + self._reserved
+
+    def acquire(self, connect):
+        """
+        Return an idle connection, or one opened with `connect()`, waiting
+        up to TIMEOUT for one to be released when MAX_SIZE are in use.
+        """
+        started = self.clock()
+        self.reset_after_fork()
+        while True:
+            entry = self._reserve(started + self.timeout)
+            waited = self.clock() - started
+            if entry is None:
+                connection, created = self._open(connect), self.clock()
+            else:
+                connection, created, released = entry
+                if self.clock() - released >= self.check_interval and not self._is_healthy(connection):
+                    self._close(connection, reserved=True)
+                    continue
+            with self._lock:
+                self._reserved -= 1
+                self._in_use[id(connection)] = created
+                self.acquired += 1
+                self.wait_seconds += waited
+            if entry is None:
+                self._fill(connect)
+            return connection
+
+    def release(self, connection, discard=False):
+        """ Take `connection` back, closing it when discarded or too old. """
+        with self._lock:
+            created = self._in_use.pop(id(connection), None)
+            if created is not None and not discard and self.clock() - created < self.max_lifetime:
+                self._idle.append((connection, created, self.clock()))
+                self._lock.notify()
+                return
+            self._lock.notify()
+        self._close(connection)
+
+    def close(self):
+        """ Close the idle connections; ones in use close when released. """
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+            self.max_lifetime = 0
+        for connection, _, _ in idle:
+            self._close(connection)
+
+    def reset_after_fork(self):
+        # Connections inherited from a parent process belong to it.
+        if self.pid != os.getpid():
+            with self._lock:
+                self._idle.clear()
+                self._in_use.clear()
+                self._reserved = 0
+                self.pid = os.getpid()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "waiting": self.waiting,
+                "max_size": self.max_size,
+                "acquired": self.acquired,
+                "opened": self.opened,
+                "discarded": self.discarded,
+                "timeouts": self.timeouts,
+                "wait_seconds": self.wait_seconds,
+            }
+
+    def _reserve(self, deadline):
+        """ Take an idle connection, or None to open one, or time out. """
+        expired = []
+        try:
+            with self._lock:
+                while True:
+                    expired += self._expire_idle()
+                    if self._idle:
+                        self._reserved += 1
+                        return self._idle.pop()
+                    if self.size < self.max_size:
+                        self._reserved += 1
+                        return None
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise PoolTimeout(
+                            f"No connection free within {self.timeout}s ({self.max_size} in use).")
+                    self.waiting += 1
+                    try:
+                        self._lock.wait(remaining)
+                    finally:
+                        self.waiting -= 1
+        finally:
+            for connection in expired:
+                self._close(connection)
+
+    def _expire_idle(self):
+        """ Remove idle connections past MAX_LIFETIME, or MAX_IDLE above MIN_SIZE. """
+        now = self.clock()
+        kept, expired = deque(), []
+        for connection, created, released in self._idle:
+            too_old = now - created >= self.max_lifetime
+            unused = now - released >= self.max_idle and self.size - len(expired) > self.min_size
+            if too_old or unused:
+                expired.append(connection)
+            else:
+                kept.append((connection, created, released))
+        self._idle = kept
+        return expired
+
+    def _open(self, connect):
+        try:
+            connection = connect()
+        except BaseException:
+            with self._lock:
+                self._reserved -= 1
+                self._lock.notify()
+            raise
+        with self._lock:
+            self.opened += 1
+        return connection
+
+    def _fill(self, connect):
+        """ Open idle connections up to MIN_SIZE, e.g. on first use. """
+        while True:
+            with self._lock:
+                if self.size >= self.min_size:
+                    return
+                self._reserved += 1
+            try:
+                connection = self._open(connect)
+            except Exception:
+                # The caller already has its connection; the next one retries.
+                return
+            with self._lock:
+                self._reserved -= 1
+                self._idle.appendleft((connection, self.clock(), self.clock()))
+                self._lock.notify()
+
+    def _is_healthy(self, connection):
+        try:
+            self.check(connection)
+        except Exception:
+            return False
+        return True
+
+    def _close(self, connection, reserved=False):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._lock:
+            self.discarded += 1
+            if reserved:
+                self._reserved -= 1
+            self._lock.notify()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, params, check, options):
+    """
+    The pool of `alias`, replaced when its connection parameters change
+    (e.g. when the test runner switches to the test database).
+    """
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.params != params:
+            if pool is not None:
+                pool.close()
+            pool = _pools[alias] = ConnectionPool(check, params, **options)
+        return pool
+
+
+def close_pool(alias):
+    """ Close `alias`'s idle connections and forget its pool. """
+    with _pools_lock:
+        pool = _pools.pop(alias, None)
+    if pool is not None:
+        pool.close()
+
+
+def collect_metrics():
+    """ Pool samples for `core.metrics`, labelled by database alias. """
+    samples = {
+        "db_pool_connections": ("gauge", "Open pooled connections.", "size"),
+        "db_pool_connections_in_use": ("gauge", "Pooled connections lent out.", "in_use"),
+        "db_pool_connections_max": ("gauge", "Pool size limit.", "max_size"),
+        "db_pool_waiting": ("gauge", "Threads waiting for a connection.", "waiting"),
+        "db_pool_acquired_total": ("counter", "Connections lent out.", "acquired"),
+        "db_pool_opened_total": ("counter", "Connections opened.", "opened"),
+        "db_pool_discarded_total": ("counter", "Connections closed as broken, old or idle.", "discarded"),
+        "db_pool_timeouts_total": ("counter", "Waits for a connection that timed out.", "timeouts"),
+        "db_pool_wait_seconds_total": ("counter", "Time spent waiting for connections.", "wait_seconds"),
+    }
+    with _pools_lock:
+        stats = {alias: pool.stats() for alias, pool in _pools.items()}
+    return [
+        (name, kind, help_text, pool_stats[key], {"alias": alias})
+        for name, (kind, help_text, key) in samples.items()
+        for alias, pool_stats in stats.items()
+    ]
+
+
+register_collector(collect_metrics)
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Makes a backend's DatabaseWrapper borrow its connection from the
+    alias's pool and return it on close. Use with CONN_MAX_AGE=0 so
+    connections go back at the end of every request.
+    """
+
+    @staticmethod
+    def check_pooled_connection(connection):
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        finally:
+            cursor.close()
+
+    @cached_property
+    def pool_options(self):
+        return self.settings_dict.get("POOL") or {}
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(
+            self.alias, repr(sorted(conn_params.items())), self.check_pooled_connection,
+            self.pool_options)
+        try:
+            return self.pool.acquire(lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params))
+        except PoolTimeout as exc:
+            # Raised as django.db.OperationalError by `wrap_database_errors`.
+            raise self.Database.OperationalError(str(exc)) from exc
+
+    def _close(self):
+        if self.connection is None:
+            return
+        discard = self.errors_occurred and not self.is_usable()
+        if not discard and (self.in_atomic_block or not self.autocommit):
+            try:
+                self.connection.rollback()
+            except self.Database.Error:
+                discard = True
+        self.pool.release(self.connection, discard=discard)
@@ -0,0 +1,44 @@
+"""
+Renderers backed by orjson and MessagePack.
+
+Both take whatever DRF's JSONRenderer takes: types they do not know
+natively (lazy translations, Decimals, QuerySets...) go through DRF's
+JSONEncoder, so every response keeps its shape.
+"""
+import msgpack
+import orjson
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+_fallback = JSONEncoder().default
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """ A drop-in `JSONRenderer` that encodes with orjson. """
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+
+        # Unlike JSONRenderer, U+2028/U+2029 are left unescaped: they are
+        # valid JSON (and JavaScript since ES2019), and scanning every body
+        # for them costs more than encoding it.
+        return orjson.dumps(data, default=_fallback, option=options)
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """ Renders to MessagePack, negotiated with `Accept: application/msgpack`. """
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_fallback, use_bin_type=True)
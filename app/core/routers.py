@@ -0,0 +1,123 @@
+"""
+Read replicas with read-your-writes stickiness.
+
+`ReplicaRouter` sends every write to the primary (`default`) and reads to
+the primary too, unless the current request opted in to a replica with
+`use_replica()`. `ReplicaReadsMixin` does that for the safe requests of a
+view, except for users who wrote within DATABASE_REPLICA_PIN_SECONDS: they
+are pinned to the primary so their own changes never seem to vanish while
+replicas catch up. Pins live in the default cache, which must be shared
+between processes for them to hold across workers: `check_pin_cache`
+warns when it is not.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_KEY = "db:pin:{}"
+
+# Cache backends whose entries only the process that set them can see.
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+_read_alias = ContextVar("replica_read_alias", default=None)
+
+
+def get_replicas():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def pin_to_primary(user_id):
+    """ Read `user_id`'s requests from the primary for the pin window. """
+    cache.set(PIN_KEY.format(user_id), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id) -> bool:
+    return bool(cache.get(PIN_KEY.format(user_id)))
+
+
+def check_pin_cache(app_configs=None, **kwargs):
+    """ Pins in a per-process cache do not follow users to other workers. """
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if get_replicas() and backend in LOCAL_CACHE_BACKENDS:
+        return [checks.Warning(
+            "Replica pins are kept in a cache other processes cannot see.",
+            hint="Set CACHE_BACKEND to a shared cache (e.g. Redis) when using MYSQL_REPLICA_HOSTS.",
+            obj="CACHES['default']",
+            id="core.W001",
+        )]
+    return []
+
+
+def use_replica(user_id=None):
+    """
+    Route the rest of this request's reads to a random replica, unless
+    there is none or `user_id` is pinned. Returns a token for `reset_replica`.
+    """
+    replicas = get_replicas()
+    alias = None
+    if replicas and not (user_id is not None and is_pinned(user_id)):
+        alias = random.choice(replicas)
+    return _read_alias.set(alias)
+
+
+def use_primary():
+    """
+    Route the rest of this request's reads to the primary, e.g. reads
+    whose results are cached as current. Returns a token for `reset_replica`.
+    """
+    return _read_alias.set(None)
+
+
+def reset_replica(token):
+    _read_alias.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        # Reads in a transaction on the primary (e.g. select_for_update) stay there.
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # A request that writes reads its own writes from then on.
+        _read_alias.set(None)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in get_replicas()
+
+
+class ReplicaReadsMixin:
+    """
+    Serves a view's safe requests from a replica, and pins the user to
+    the primary after their unsafe ones.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            self.replica_token = use_replica(request.user.pk)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "replica_token", None)
+        if token is not None:
+            reset_replica(token)
+            self.replica_token = None
+        if request.method not in SAFE_METHODS and request.user.is_authenticated:
+            pin_to_primary(request.user.pk)
+        return super().finalize_response(request, response, *args, **kwargs)
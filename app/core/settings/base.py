@@ -14,7 +14,7 @@ from pathlib import Path
 from datetime import timedelta
 
 
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -51,9 +51,12 @@ INSTALLED_APPS = [
     # My Apps.
     'user',
     'tasks',
+    'task_search',
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -90,17 +93,54 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Pooled connections (see `core.pool`) are handed back after every request.
+# Without the pool, connections persist per thread for CONN_MAX_AGE seconds
+# and are checked before reuse.
+DATABASE_POOL = config('DATABASE_POOL', default=True, cast=bool)
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': 'core.backends.mysql' if DATABASE_POOL else 'django.db.backends.mysql',
         'NAME': config('MYSQL_DB'),
         'USER': config('MYSQL_USER'),
         'PASSWORD': config('MYSQL_PASSWORD'),
         'HOST': config('MYSQL_HOST'),
         'PORT': config('MYSQL_PORT'),
+        'CONN_MAX_AGE': 0 if DATABASE_POOL else config('CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {
+            'MIN_SIZE': config('DATABASE_POOL_MIN_SIZE', default=1, cast=int),
+            'MAX_SIZE': config('DATABASE_POOL_MAX_SIZE', default=10, cast=int),
+            'TIMEOUT': config('DATABASE_POOL_TIMEOUT', default=30, cast=int),  # secs
+            'MAX_LIFETIME': config('DATABASE_POOL_MAX_LIFETIME', default=3600, cast=int),  # secs
+            'MAX_IDLE': 600,  # secs
+            'CHECK_INTERVAL': 30,  # secs
+        },
     }
 }
 
+# Read replicas of `default`, one per host, see `core.routers`.
+DATABASE_REPLICAS = []
+for index, host in enumerate(config('MYSQL_REPLICA_HOSTS', default='', cast=Csv())):
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+# Databases holding tasks besides `default`, one per host, see `tasks.shards`.
+# Users are re-hashed over all of them; run `reshard_tasks` after a change.
+TASK_SHARDS = ['default']
+for index, host in enumerate(config('MYSQL_SHARD_HOSTS', default='', cast=Csv())):
+    DATABASES[f'shard_{index}'] = {**DATABASES['default'], 'HOST': host}
+    TASK_SHARDS.append(f'shard_{index}')
+
+DATABASE_ROUTERS = ['tasks.shards.ShardRouter', 'core.routers.ReplicaRouter']
+
+# Users read from the primary for this long after a write.
+DATABASE_REPLICA_PIN_SECONDS = config('DATABASE_REPLICA_PIN_SECONDS', default=5, cast=int)
+
 LOGIN_URL = "rest_framework:login"
 LOGOUT_URL = "rest_framework:logout"
 
@@ -109,11 +149,27 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "core.pagination.CustomPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.BasicAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.ORJSONRenderer",
+        "core.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "core.parsers.ORJSONParser",
+        "core.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
+    "TEST_REQUEST_RENDERER_CLASSES": (
+        "rest_framework.renderers.MultiPartRenderer",
+        "rest_framework.renderers.JSONRenderer",
+        "core.renderers.MessagePackRenderer",
+    ),
 }
 
 SIMPLE_JWT = {
@@ -131,6 +187,68 @@ SIMPLE_JWT = {
 
 TOKEN_LIFESPAN = 24  # hrs
 
+# Serve task list/detail with native async views (for ASGI deployments).
+TASKS_ASYNC_VIEWS = config('TASKS_ASYNC_VIEWS', default=False, cast=bool)
+
+# Most tasks and tombstones returned by one delta-sync request.
+TASK_SYNC_MAX_BATCH = 500
+
+# Syncs send the changes of this many seconds before the previous sync
+# again: longer than any task write takes to commit.
+TASK_SYNC_WINDOW = 60  # secs
+
+# `archive_tasks` moves tasks completed at least this long ago to the archive.
+TASK_ARCHIVE_AFTER_DAYS = config('TASK_ARCHIVE_AFTER_DAYS', default=90, cast=int)
+
+# Background jobs (see jobs.queue): a claimed job is retried after the visibility
+# timeout unless its worker finishes it; failures retry with exponential backoff.
+JOBS_MAX_ATTEMPTS = config('JOBS_MAX_ATTEMPTS', default=5, cast=int)
+JOBS_VISIBILITY_TIMEOUT = config('JOBS_VISIBILITY_TIMEOUT', default=300, cast=int)  # secs
+JOBS_RETRY_BACKOFF = 10  # secs, doubled per attempt
+JOBS_RETRY_BACKOFF_MAX = 3600  # secs
+
+# Request metrics: scraped from /metrics with this bearer token. Unset, the
+# endpoint is only open with DEBUG on.
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_SERVER_TIMING = config('METRICS_SERVER_TIMING', default=True, cast=bool)
+
+LAST_LOGIN_UPDATE_INTERVAL = 60  # secs
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    # Holds authenticated users and replica pins, which every process must
+    # see: point at a shared cache (e.g. Redis) in production.
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    # Task list pages; point at a shared cache (e.g. Redis) in production.
+    'task_lists': {
+        'BACKEND': config(
+            'TASK_LIST_CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('TASK_LIST_CACHE_LOCATION', default='task-lists'),
+        'TIMEOUT': config('TASK_LIST_CACHE_TIMEOUT', default=300, cast=int),  # secs
+        'OPTIONS': {
+            'MAX_ENTRIES': config('TASK_LIST_CACHE_MAX_ENTRIES', default=5000, cast=int),
+        },
+    },
+}
+
+# Users are only dropped from the cache of the process that changed them:
+# with a per-process cache, other processes apply deactivations and admin
+# changes once their entry expires.
+AUTH_USER_CACHE_ALIAS = 'default'
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=30, cast=int)  # secs
+
+TASK_LIST_CACHE_ALIAS = 'task_lists'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -151,6 +269,12 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing runs in a pool of worker processes (0 hashes inline).
+PASSWORD_HASHING_WORKERS = 2
+PASSWORD_HASHING_MAX_PENDING = 32  # jobs waiting before answering 503
+PASSWORD_HASHING_TIMEOUT = 10  # secs
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
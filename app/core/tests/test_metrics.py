@@ -0,0 +1,90 @@
+import re
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..metrics import registry
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestRequestMetrics:
+    metrics_url = reverse("metrics")
+    list_task_url = reverse("task:task-list")
+
+    token = "secret"
+
+    @pytest.fixture(autouse=True)
+    def empty_registry(self):
+        registry.reset()
+
+    @pytest.fixture(autouse=True)
+    def metrics_token(self, settings):
+        settings.METRICS_TOKEN = self.token
+
+    def scrape(self):
+        # A client of its own: a logged-in client's credentials would win.
+        return APIClient().get(self.metrics_url, HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def sample(self, body, name, **labels):
+        rendered = ",".join(f'{key}="{value}"' for key, value in labels.items())
+        match = re.search(rf"^{name}{{{re.escape(rendered)}}} (\S+)$", body, re.MULTILINE)
+        assert match, f"{name}{{{rendered}}} not in metrics"
+        return float(match.group(1))
+
+    def test_server_timing_reports_queries_and_render(self, client, task_factory, django_assert_num_queries):
+        task_factory.create_batch(3)
+        client.get(self.list_task_url)
+
+        with django_assert_num_queries(2):
+            response = client.get(self.list_task_url, {"page_size": 2})
+
+        timing = response["Server-Timing"]
+        assert 'db;dur=' in timing and 'desc="2 queries"' in timing
+        assert re.search(r"render;dur=\d+\.\d", timing)
+        assert re.search(r"total;dur=\d+\.\d", timing)
+
+    def test_metrics_aggregate_per_route(self, client):
+        client.get(self.list_task_url)
+        client.get(self.list_task_url)
+        client.get("/api/v1/missing/")
+
+        response = self.scrape()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        body = response.content.decode()
+        route = {"route": "task:task-list", "method": "GET", "status": "200"}
+        assert self.sample(body, "http_request_duration_seconds_count", **route) == 2
+        assert self.sample(body, "http_request_db_queries_bucket", **route, le="+Inf") == 2
+        assert self.sample(body, "http_response_size_bytes_sum", **route) > 0
+        assert self.sample(
+            body, "http_request_duration_seconds_count", route="unmatched", method="GET", status="404") == 1
+
+    def test_metrics_include_app_collectors(self):
+        body = self.scrape().content.decode()
+
+        assert "# TYPE task_list_cache_hits_total counter" in body
+        assert "# TYPE password_hashing_pending gauge" in body
+
+    def test_metrics_require_token_when_configured(self, api_client, settings):
+        settings.METRICS_TOKEN = "secret"
+
+        assert api_client.get(self.metrics_url).status_code == status.HTTP_403_FORBIDDEN
+        response = api_client.get(self.metrics_url, HTTP_AUTHORIZATION="Bearer secret")
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_metrics_without_token_are_only_open_in_debug(self, api_client, settings):
+        settings.METRICS_TOKEN = ""
+
+        assert api_client.get(self.metrics_url).status_code == status.HTTP_403_FORBIDDEN
+        settings.DEBUG = True
+        assert api_client.get(self.metrics_url).status_code == status.HTTP_200_OK
+
+    def test_server_timing_can_be_disabled(self, settings):
+        settings.METRICS_SERVER_TIMING = False
+
+        assert not self.scrape().has_header("Server-Timing")
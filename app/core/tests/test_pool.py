@@ -0,0 +1,217 @@
+import threading
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+from ..metrics import registry
+from ..pool import ConnectionPool, PoolTimeout, close_pool
+
+POOLED = "pooled_test"
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def check(connection):
+    if connection.closed:
+        raise OSError("gone")
+
+
+@pytest.fixture
+def make_pool():
+    def _make_pool(**options):
+        pool = ConnectionPool(check, **{"MIN_SIZE": 0, **options})
+        pool.clock = Clock()
+        return pool
+    return _make_pool
+
+
+class TestConnectionPool:
+
+    def test_reuses_released_connections(self, make_pool):
+        pool = make_pool()
+
+        for _ in range(3):
+            connection = pool.acquire(FakeConnection)
+            pool.release(connection)
+
+        assert pool.stats()["opened"] == 1
+        assert pool.stats()["acquired"] == 3
+        assert pool.stats()["idle"] == 1
+
+    def test_opens_min_size_on_first_use(self, make_pool):
+        pool = make_pool(MIN_SIZE=3)
+
+        pool.acquire(FakeConnection)
+
+        stats = pool.stats()
+        assert (stats["in_use"], stats["idle"], stats["opened"]) == (1, 2, 3)
+
+    def test_times_out_when_exhausted(self, make_pool):
+        pool = make_pool(MAX_SIZE=2, TIMEOUT=0)
+        # Held, so their ids stay distinct.
+        held = [pool.acquire(FakeConnection), pool.acquire(FakeConnection)]
+
+        with pytest.raises(PoolTimeout):
+            pool.acquire(FakeConnection)
+
+        assert pool.stats()["timeouts"] == 1
+
+    def test_waiting_thread_gets_released_connection(self, make_pool):
+        # The clock stands still, so the wait cannot time out.
+        pool = make_pool(MAX_SIZE=1)
+        held = pool.acquire(FakeConnection)
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(FakeConnection)))
+        waiter.start()
+        while not pool.stats()["waiting"]:
+            pass
+
+        pool.release(held)
+        waiter.join(timeout=5)
+
+        assert acquired == [held]
+
+    def test_checks_connections_idle_past_the_interval(self, make_pool):
+        pool = make_pool(CHECK_INTERVAL=30)
+        broken = pool.acquire(FakeConnection)
+        pool.release(broken)
+        broken.closed = True
+
+        pool.clock.now = 10
+        assert pool.acquire(FakeConnection) is broken
+        pool.release(broken)
+
+        pool.clock.now = 40
+        replacement = pool.acquire(FakeConnection)
+
+        assert replacement is not broken
+        assert pool.stats()["discarded"] == 1
+
+    def test_replaces_connections_past_max_lifetime(self, make_pool):
+        pool = make_pool(MAX_LIFETIME=100)
+        first = pool.acquire(FakeConnection)
+        pool.clock.now = 150
+        pool.release(first)
+
+        assert first.closed
+        assert pool.acquire(FakeConnection) is not first
+
+    def test_closes_idle_connections_above_min_size(self, make_pool):
+        pool = make_pool(MIN_SIZE=1, MAX_IDLE=60)
+        connections = [pool.acquire(FakeConnection) for _ in range(3)]
+        for connection in connections:
+            pool.release(connection)
+
+        pool.clock.now = 100
+        pool.release(pool.acquire(FakeConnection))
+
+        assert pool.stats()["size"] == 1
+        assert sum(connection.closed for connection in connections) == 2
+
+    def test_discarded_connections_are_closed(self, make_pool):
+        pool = make_pool()
+        connection = pool.acquire(FakeConnection)
+
+        pool.release(connection, discard=True)
+
+        assert connection.closed
+        assert pool.stats()["size"] == 0
+
+    def test_forgets_connections_after_fork(self, make_pool):
+        pool = make_pool()
+        pool.release(pool.acquire(FakeConnection))
+        pool.pid = -1
+
+        pool.acquire(FakeConnection)
+
+        assert pool.stats()["opened"] == 2
+
+
+@pytest.fixture
+def pooled_db(tmp_path):
+    """ A file-backed SQLite database on the pooled backend. """
+    connections.settings[POOLED] = connections.configure_settings({
+        DEFAULT_DB_ALIAS: {
+            "ENGINE": "core.backends.sqlite3",
+            "NAME": str(tmp_path / "pooled.sqlite3"),
+            "POOL": {"MAX_SIZE": 1, "TIMEOUT": 0},
+        },
+    })[DEFAULT_DB_ALIAS]
+    yield connections[POOLED]
+    connections[POOLED].close()
+    close_pool(POOLED)
+    del connections[POOLED]
+    del connections.settings[POOLED]
+
+
+@pytest.mark.django_db
+class TestPooledBackend:
+
+    def query(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            return cursor.fetchone()[0]
+
+    def test_close_returns_the_connection_to_the_pool(self, pooled_db):
+        self.query(pooled_db)
+        raw = pooled_db.connection
+        pooled_db.close()
+
+        self.query(pooled_db)
+
+        assert pooled_db.connection is raw
+        assert pooled_db.pool.stats()["opened"] == 1
+
+    def test_closing_mid_transaction_rolls_back(self, pooled_db):
+        with pooled_db.cursor() as cursor:
+            cursor.execute("CREATE TABLE item (name TEXT)")
+        pooled_db.set_autocommit(False)
+        with pooled_db.cursor() as cursor:
+            cursor.execute("INSERT INTO item VALUES ('uncommitted')")
+        pooled_db.close()
+        pooled_db.set_autocommit(True)
+
+        with pooled_db.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM item")
+            assert cursor.fetchone()[0] == 0
+
+    def test_exhausted_pool_raises_operational_error(self, pooled_db):
+        self.query(pooled_db)
+        other_thread = []
+
+        def connect():
+            try:
+                self.query(connections[POOLED])
+            except OperationalError as exc:
+                other_thread.append(exc)
+            finally:
+                connections[POOLED].close()
+
+        thread = threading.Thread(target=connect)
+        thread.start()
+        thread.join()
+
+        assert len(other_thread) == 1
+
+    def test_pool_is_reported_in_metrics(self, pooled_db):
+        self.query(pooled_db)
+
+        body = registry.render()
+
+        assert f'db_pool_connections_in_use{{alias="{POOLED}"}} 1' in body
+        assert body.count("# TYPE db_pool_connections_in_use gauge") == 1
@@ -0,0 +1,87 @@
+import datetime
+import json
+import uuid
+from decimal import Decimal
+
+import msgpack
+import pytest
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+
+from ..renderers import ORJSONRenderer
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestORJSONRenderer:
+
+    def test_matches_json_renderer(self):
+        data = {
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "at": datetime.datetime(2024, 1, 2, 3, 4, 5, 600000, tzinfo=datetime.timezone.utc),
+            "amount": Decimal("1.50"),
+            "label": gettext_lazy("Ünïcode"),
+            "separator": "a b",
+            "nested": [{"none": None, "flag": True}],
+        }
+
+        rendered = ORJSONRenderer().render(data)
+
+        assert json.loads(rendered) == json.loads(JSONRenderer().render(data))
+
+    def test_indent_from_accept_header(self):
+        rendered = ORJSONRenderer().render({"a": 1}, "application/json; indent=4")
+
+        assert rendered == b'{\n  "a": 1\n}'
+
+    def test_none_renders_empty(self):
+        assert ORJSONRenderer().render(None) == b''
+
+
+class TestContentNegotiation:
+    list_task_url = reverse("task:task-list")
+
+    @pytest.fixture
+    def client(self, client, task_factory):
+        task_factory.create_batch(3, user=client.user_instance)
+        return client
+
+    def test_msgpack_list_has_the_json_shape(self, client):
+        as_json = client.get(self.list_task_url, {"page_size": 2}).json()
+
+        response = client.get(self.list_task_url, {"page_size": 2}, HTTP_ACCEPT="application/msgpack")
+
+        assert response["Content-Type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content) == as_json
+
+    def test_msgpack_request_body(self, client):
+        response = client.post(
+            self.list_task_url, {"title": "Packed", "is_completed": True},
+            format="msgpack", HTTP_ACCEPT="application/msgpack")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        body = msgpack.unpackb(response.content)
+        assert (body['title'], body['is_completed']) == ("Packed", True)
+
+    def test_malformed_bodies_are_rejected(self, client):
+        bad_json = client.generic("POST", self.list_task_url, b'{"title":', content_type="application/json")
+        bad_msgpack = client.generic(
+            "POST", self.list_task_url, b"\xc1", content_type="application/msgpack")
+
+        assert bad_json.status_code == status.HTTP_400_BAD_REQUEST
+        assert bad_json.json()['detail'].startswith("JSON parse error")
+        assert bad_msgpack.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize("body", [
+        b"\x81\x91\x01\x01",  # {[1]: 1}
+        b"\x81\x01\x01",  # {1: 1}
+        msgpack.packb({"title": msgpack.ExtType(5, b"x")}),
+    ])
+    def test_msgpack_beyond_json_is_rejected(self, client, body):
+        response = client.generic("POST", self.list_task_url, body, content_type="application/msgpack")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()['detail'].startswith("MessagePack parse error")
@@ -0,0 +1,128 @@
+from datetime import timedelta
+
+import pytest
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks.models import Task
+from ..routers import ReplicaRouter, check_pin_cache, pin_to_primary, reset_replica, use_replica
+
+REPLICA = "replica_test"
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """
+    A second SQLite database standing in for a replica of `default`. It
+    is only written to directly, so rows found there prove where a read went.
+    """
+    connections.settings[REPLICA] = connections.configure_settings({
+        DEFAULT_DB_ALIAS: {"ENGINE": "django.db.backends.sqlite3", "NAME": str(tmp_path / "replica.sqlite3")},
+    })[DEFAULT_DB_ALIAS]
+    with connections[REPLICA].schema_editor() as editor:
+        for model in apps.get_models():
+            editor.create_model(model)
+    settings.DATABASE_REPLICAS = [REPLICA]
+    yield REPLICA
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.settings[REPLICA]
+
+
+class TestReplicaRouter:
+    router = ReplicaRouter()
+
+    def test_reads_use_the_primary_by_default(self, settings):
+        settings.DATABASE_REPLICAS = [REPLICA]
+
+        assert self.router.db_for_read(Task) == DEFAULT_DB_ALIAS
+
+    def test_opted_in_reads_use_a_replica(self, settings):
+        settings.DATABASE_REPLICAS = [REPLICA]
+        token = use_replica()
+        try:
+            assert self.router.db_for_read(Task) == REPLICA
+            assert self.router.db_for_write(Task) == DEFAULT_DB_ALIAS
+            # Reads after a write see it.
+            assert self.router.db_for_read(Task) == DEFAULT_DB_ALIAS
+        finally:
+            reset_replica(token)
+
+    def test_pinned_users_read_the_primary(self, settings):
+        settings.DATABASE_REPLICAS = [REPLICA]
+        pin_to_primary("user-id")
+        token = use_replica("user-id")
+        try:
+            assert self.router.db_for_read(Task) == DEFAULT_DB_ALIAS
+        finally:
+            reset_replica(token)
+
+    def test_replicas_are_not_migrated(self, settings):
+        settings.DATABASE_REPLICAS = [REPLICA]
+
+        assert self.router.allow_migrate(DEFAULT_DB_ALIAS, "tasks")
+        assert not self.router.allow_migrate(REPLICA, "tasks")
+
+    def test_pins_in_a_local_cache_are_reported(self, settings):
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        settings.DATABASE_REPLICAS = []
+        assert check_pin_cache() == []
+
+        settings.DATABASE_REPLICAS = [REPLICA]
+        assert [warning.id for warning in check_pin_cache()] == ["core.W001"]
+
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        assert check_pin_cache() == []
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicaReads:
+    list_task_url = reverse("task:task-list")
+
+    @pytest.fixture
+    def client(self, client, replica):
+        client.user_instance.save(using=replica)
+        return client
+
+    def title(self, client, task_id):
+        response = client.get(reverse("task:task-detail", args=[task_id]))
+        if response.status_code == 404:
+            return None
+        assert response.status_code == 200, response.content
+        return response.json()["title"]
+
+    def test_safe_requests_read_the_replica(self, client):
+        task = Task(user=client.user_instance, title="On replica")
+        task.save(using=REPLICA)
+
+        assert self.title(client, task.id) == "On replica"
+
+    def test_writers_read_the_primary_until_the_pin_expires(self, client, settings, time_machine):
+        response = client.post(self.list_task_url, {"title": "Mine"})
+        task_id = response.json()["id"]
+
+        assert self.title(client, task_id) == "Mine"
+        time_machine.move_to(
+            timezone.now() + timedelta(seconds=settings.DATABASE_REPLICA_PIN_SECONDS + 1))
+        assert self.title(client, task_id) is None
+
+    def test_other_users_stay_on_the_replica(self, client, user_factory):
+        task = Task(user=client.user_instance, title="On replica")
+        task.save(using=REPLICA)
+        other_client = APIClient()
+        other_client.force_authenticate(user_factory(is_active=True))
+        other_client.post(self.list_task_url, {"title": "Theirs"})
+
+        assert self.title(client, task.id) == "On replica"
+
+    def test_cached_lists_are_read_from_the_primary(self, client, task_factory):
+        Task(user=client.user_instance, title="On replica").save(using=REPLICA)
+        task_factory(user=client.user_instance, title="On primary")
+
+        response = client.get(self.list_task_url)
+
+        assert response.status_code == 200, response.content
+        assert [task["title"] for task in response.json()["results"]] == ["On primary"]
@@ -0,0 +1,42 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs on a pool of threads until SIGTERM or SIGINT, "
+        "which let running jobs finish. Start as many workers as needed: they "
+        "never claim the same job."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=4, help="Jobs run at once.")
+        parser.add_argument(
+            "--batch-size", type=int, help="Most jobs claimed per query, by default --threads.")
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0, help="Seconds between polls of an empty queue.")
+        parser.add_argument(
+            "--visibility-timeout", type=int, default=settings.JOBS_VISIBILITY_TIMEOUT,
+            help="Seconds before a job claimed by a worker that died is run again.")
+        parser.add_argument(
+            "--once", action="store_true", help="Exit once no jobs are due, e.g. from cron.")
+
+    def handle(self, *args, threads, batch_size, poll_interval, visibility_timeout, once, **options):
+        worker = Worker(
+            threads=threads, batch_size=batch_size,
+            poll_interval=poll_interval, visibility_timeout=visibility_timeout)
+        handlers = {
+            signum: signal.signal(signum, lambda *args: worker.stop())
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            worker.serve(once=once)
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write(self.style.SUCCESS(f"Ran {worker.succeeded} jobs, {worker.failed} failed."))
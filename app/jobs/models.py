@@ -0,0 +1,36 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    A call of a registered job function, run by a `run_jobs` worker.
+
+    `run_after` is when the job is next due. Claiming a job moves it a
+    visibility timeout ahead, so a job whose worker died becomes due
+    again; failures move it ahead by the retry backoff. Finished jobs are
+    deleted and jobs out of attempts are kept as failed.
+    """
+    QUEUED = "queued"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (FAILED, "Failed")]
+
+    name = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True, default="")
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Workers claiming the next due jobs.
+            models.Index(fields=["status", "run_after", "id"], name="job_due_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} #{self.pk}"
@@ -0,0 +1,60 @@
+"""
+Deferred side effects, queued in the database.
+
+Apps declare jobs in a `jobs` module with the `job` decorator and queue
+calls with `.enqueue(**payload)`, which inserts a `Job` row in the current
+transaction: a job queued by a write that rolls back never runs. Workers
+started with `run_jobs` run them, retrying failures with backoff, so
+requests only pay for the insert.
+
+    @job(max_attempts=3)
+    def send_welcome_email(user_id):
+        ...
+
+    send_welcome_email.enqueue(user_id=user.id)
+
+Payloads are stored as JSON: ids, datetimes and UUIDs arrive as strings.
+Jobs can run more than once (after a worker dies mid-job, say), so they
+should be safe to repeat.
+"""
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Job
+
+registry = {}
+
+
+class JobFunction:
+    """ A registered job; calling it runs the function directly. """
+
+    def __init__(self, func, name, max_attempts):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, run_after=None, **payload):
+        """ Queue a call with `payload` as keyword arguments, due at `run_after`. """
+        return Job.objects.create(
+            name=self.name,
+            payload=payload,
+            max_attempts=self.max_attempts or settings.JOBS_MAX_ATTEMPTS,
+            run_after=run_after or timezone.now(),
+        )
+
+
+def job(func=None, *, name=None, max_attempts=None):
+    """
+    Register `func` as a job named `name`, by default its dotted path.
+    Use bare or with arguments.
+    """
+    def register(func):
+        job_function = JobFunction(func, name or f"{func.__module__}.{func.__qualname__}", max_attempts)
+        registry[job_function.name] = job_function
+        return job_function
+
+    return register(func) if func is not None else register
@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError
+from django.utils import timezone
+
+from ..models import Job
+from ..queue import job, registry
+from ..worker import Worker
+
+pytestmark = pytest.mark.django_db
+
+calls = []
+
+
+@job
+def record(value):
+    calls.append(value)
+
+
+@job(name="jobs.flaky", max_attempts=2)
+def flaky():
+    raise ValueError("try again")
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+
+class TestQueue:
+
+    def test_registers_jobs_by_name(self):
+        assert registry["jobs.tests.test_jobs.record"] is record
+        assert registry["jobs.flaky"] is flaky
+
+    def test_enqueue_runs_later(self):
+        record.enqueue(value=1)
+        record.enqueue(value=2, run_after=timezone.now() + timedelta(minutes=1))
+        assert calls == []
+
+        assert Worker().run_pending() == 1
+
+        assert calls == [1]
+        assert Job.objects.get().payload == {"value": 2}
+
+    def test_unknown_jobs_fail(self):
+        Job.objects.create(name="jobs.missing", max_attempts=1)
+
+        Worker().run_pending()
+
+        assert Job.objects.get().status == Job.FAILED
+        assert "No job named 'jobs.missing'" in Job.objects.get().last_error
+
+
+class TestWorker:
+
+    def test_retries_with_backoff_until_failed(self, time_machine, settings):
+        flaky.enqueue()
+
+        Worker().run_pending()
+
+        retry = Job.objects.get()
+        assert (retry.status, retry.attempts) == (Job.QUEUED, 1)
+        assert "ValueError: try again" in retry.last_error
+        delay = retry.run_after - timezone.now()
+        assert timedelta(seconds=settings.JOBS_RETRY_BACKOFF / 2) <= delay <= timedelta(
+            seconds=settings.JOBS_RETRY_BACKOFF)
+
+        time_machine.move_to(retry.run_after)
+        Worker().run_pending()
+
+        assert Job.objects.values_list("status", "attempts").get() == (Job.FAILED, 2)
+        time_machine.move_to(timezone.now() + timedelta(days=1))
+        assert Worker().run_pending() == 0
+
+    def test_claimed_jobs_reappear_after_the_visibility_timeout(self, time_machine):
+        record.enqueue(value=1)
+        worker = Worker(visibility_timeout=60)
+
+        [claimed] = worker.claim(10)
+
+        assert worker.claim(10) == []
+        time_machine.move_to(timezone.now() + timedelta(seconds=61))
+        [reclaimed] = Worker().claim(10)
+        assert reclaimed.attempts == 2
+
+        # The first worker's late result no longer applies to the job.
+        worker.run(claimed)
+        assert Job.objects.filter(id=reclaimed.id).exists()
+        Worker().run(reclaimed)
+        assert not Job.objects.exists()
+        assert calls == [1, 1]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_jobs_once(capsys):
+    for value in range(5):
+        record.enqueue(value=value)
+    flaky.enqueue()
+
+    # One thread: SQLite locks the table against concurrent writers.
+    call_command("run_jobs", "--once", "--threads", "1")
+
+    assert sorted(calls) == list(range(5))
+    assert Job.objects.get().name == "jobs.flaky"
+    assert "Ran 5 jobs, 1 failed." in capsys.readouterr().out
+
+
+@pytest.mark.django_db(transaction=True)
+def test_serve_survives_claim_errors(monkeypatch, caplog):
+    record.enqueue(value=1)
+    flaky.enqueue()
+    worker = Worker(threads=1, poll_interval=0.01)
+    claim = worker.claim
+    claims = []
+
+    def flaky_claim(limit):
+        # Down once, then one job per claim; stop once both ran.
+        claims.append(limit)
+        if len(claims) == 1:
+            raise OperationalError("gone away")
+        if len(claims) == 4:
+            worker.stop()
+        return claim(limit)
+
+    monkeypatch.setattr(worker, "claim", flaky_claim)
+    # Recording the failure fails too.
+    monkeypatch.setattr(worker, "fail", lambda job, exc: 1 / 0)
+
+    worker.serve()
+
+    assert calls == [1]
+    assert "Claiming jobs failed" in caplog.text
+    assert "Running a job failed" in caplog.text
@@ -0,0 +1,158 @@
+"""
+Workers running queued jobs, see `jobs.queue`.
+
+A worker claims due jobs in batches with SELECT ... FOR UPDATE SKIP LOCKED
+where the database supports it, so several workers share a queue without
+taking the same job. Claiming a job counts an attempt and hides it for
+JOBS_VISIBILITY_TIMEOUT seconds: if the worker dies the job becomes due
+again. The attempt count also fences a worker that outlived the timeout,
+so it cannot record the outcome of a job another worker took over.
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Job
+from .queue import registry
+
+logger = logging.getLogger(__name__)
+
+# Tail of the traceback kept on a failed job.
+MAX_ERROR_LENGTH = 4000
+
+# Most seconds between attempts to claim jobs while that fails.
+MAX_CLAIM_BACKOFF = 60
+
+
+def log_exception(future):
+    """ Log what escaped `Worker.run`, e.g. recording a failure in a lost database. """
+    exc = future.exception()
+    if exc is not None:
+        logger.error("Running a job failed", exc_info=exc)
+
+
+class Worker:
+
+    def __init__(self, threads=4, batch_size=None, poll_interval=1.0, visibility_timeout=None, name=None):
+        self.threads = threads
+        self.batch_size = batch_size or threads
+        self.poll_interval = poll_interval
+        self.visibility_timeout = timedelta(
+            seconds=visibility_timeout or settings.JOBS_VISIBILITY_TIMEOUT)
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = threading.Event()
+        self._lock = threading.Lock()
+        self.succeeded = 0
+        self.failed = 0
+
+    def claim(self, limit):
+        """ Take up to `limit` due jobs, oldest first. """
+        now = timezone.now()
+        with transaction.atomic():
+            due = Job.objects.filter(status=Job.QUEUED, run_after__lte=now).order_by("run_after", "id")
+            jobs = list(due.select_for_update(skip_locked=True)[:limit])
+            for job in jobs:
+                job.attempts += 1
+                job.run_after = now + self.visibility_timeout
+                job.locked_by = self.name
+            Job.objects.bulk_update(jobs, ["attempts", "run_after", "locked_by"])
+        return jobs
+
+    def run(self, job):
+        """ Run a claimed job, then delete it or schedule its retry. """
+        try:
+            function = registry.get(job.name)
+            if function is None:
+                raise LookupError(f"No job named {job.name!r} is registered.")
+            function(**job.payload)
+        except Exception as exc:
+            self.fail(job, exc)
+            return False
+        Job.objects.filter(id=job.id, attempts=job.attempts).delete()
+        with self._lock:
+            self.succeeded += 1
+        return True
+
+    def fail(self, job, exc):
+        changes = {"last_error": "".join(traceback.format_exception(exc))[-MAX_ERROR_LENGTH:]}
+        if job.attempts >= job.max_attempts:
+            changes["status"] = Job.FAILED
+            logger.error("Job %s failed after %d attempts: %r", job, job.attempts, exc)
+        else:
+            changes["run_after"] = timezone.now() + self.get_backoff(job.attempts)
+            logger.warning("Job %s failed, retrying: %r", job, exc)
+        Job.objects.filter(id=job.id, attempts=job.attempts).update(**changes)
+        with self._lock:
+            self.failed += 1
+
+    def get_backoff(self, attempts):
+        """ Exponential backoff with jitter, so failed jobs do not retry in lockstep. """
+        seconds = min(settings.JOBS_RETRY_BACKOFF * 2 ** (attempts - 1), settings.JOBS_RETRY_BACKOFF_MAX)
+        return timedelta(seconds=seconds * random.uniform(0.5, 1))
+
+    def run_pending(self):
+        """ Run due jobs in this thread until none are left, e.g. from tests or cron. """
+        ran = 0
+        while jobs := self.claim(self.batch_size):
+            for job in jobs:
+                self.run(job)
+            ran += len(jobs)
+        return ran
+
+    def serve(self, once=False):
+        """
+        Run jobs on `threads` threads until `stop()`, or with `once` until
+        none are due. Jobs are only claimed for free threads, so none waits
+        out its visibility timeout in a queue. Failures to claim are logged
+        and retried with backoff, or end a run with `once`.
+        """
+        running = set()
+        errors = 0
+        with ThreadPoolExecutor(self.threads, thread_name_prefix="job") as executor:
+            while not self.stopping.is_set():
+                free = self.threads - len(running)
+                try:
+                    jobs = self.claim(min(free, self.batch_size)) if free else []
+                except Exception:
+                    # E.g. the database went away: retry, backing off.
+                    logger.exception("Claiming jobs failed")
+                    close_old_connections()
+                    if once:
+                        break
+                    errors += 1
+                    self.stopping.wait(min(self.poll_interval * 2 ** errors, MAX_CLAIM_BACKOFF))
+                    continue
+                errors = 0
+                close_old_connections()
+                for job in jobs:
+                    future = executor.submit(self.run_in_thread, job)
+                    future.add_done_callback(log_exception)
+                    running.add(future)
+
+                if not running:
+                    if once:
+                        break
+                    self.stopping.wait(self.poll_interval)
+                elif not jobs or len(running) == self.threads:
+                    _, running = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+
+    def run_in_thread(self, job):
+        # Connections are handled as around a request.
+        close_old_connections()
+        try:
+            return self.run(job)
+        finally:
+            close_old_connections()
+
+    def stop(self):
+        """ Stop claiming jobs; running ones finish. """
+        self.stopping.set()
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class TaskSearchConfig(AppConfig):
+    """
+    Holds the migration creating the full-text index of `tasks.search`.
+    The tasks app's own migrations are generated on each install (see the
+    README), so they cannot carry it.
+    """
+    name = 'task_search'
@@ -0,0 +1,29 @@
+"""
+Create the full-text index of tasks once their table exists, with the SQL
+of each database's vendor, see `tasks.search.get_search_backend`.
+"""
+from django.db import migrations
+
+from tasks.search import get_search_backend
+
+
+def create_search_index(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    # Idempotent: databases migrated before this app already have it.
+    get_search_backend(alias).setup(alias)
+
+
+def drop_search_index(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    get_search_backend(alias).teardown(alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "__first__"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
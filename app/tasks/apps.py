@@ -1,6 +1,23 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_delete
 
 
 class TodoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from django.core import checks
+
+        from core.metrics import register_collector
+        from core.routers import check_pin_cache
+
+        from .cache import collect_metrics
+        from .signals import delete_sharded_tasks, drop_owner_task_lists
+
+        register_collector(collect_metrics)
+        checks.register(check_pin_cache, checks.Tags.caches)
+
+        post_delete.connect(drop_owner_task_lists, sender=settings.AUTH_USER_MODEL)
+        post_delete.connect(delete_sharded_tasks, sender=settings.AUTH_USER_MODEL)
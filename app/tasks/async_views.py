@@ -0,0 +1,247 @@
+"""
+Native async views for the task list and detail endpoints.
+
+DRF views are synchronous, so under ASGI every request to `TaskViewSets`
+holds a thread. These views serve the same URLs, payloads and status codes
+on the event loop through the async ORM, reusing the DRF serializer, search
+filter, paginator and JWT authentication. Reads are validated with the same
+ETags and lists cached in the same `task_list_cache` entries as there. They
+are mounted in front of the router when TASKS_ASYNC_VIEWS is enabled; the
+other task actions stay on `TaskViewSets`.
+"""
+from itertools import chain
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import classonlymethod
+from django.utils.http import http_date
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from core.fieldsets import get_requested_fields
+from core.pagination import KeysetPagination
+from core.renderers import MessagePackRenderer, ORJSONRenderer
+from core.routers import pin_to_primary
+from user.authentication import CachedJWTAuthentication
+from user.utils import is_admin_user
+
+from .cache import ALL_USERS, task_list_cache
+from .conditional import get_list_etag, get_not_modified, get_task_validators, list_state
+from .filters import TaskSearchFilter
+from .models import ArchivedTask, Task
+from .permissions import IsOwner
+from .serializers import TaskSerializer, TaskValuesSerializer, get_update_fields
+from .shards import for_shard, is_sharded, shard_querysets, user_tasks
+
+
+class AsyncAPIView(View):
+    """ Authenticates with JWT and renders JSON or MessagePack as DRF views do. """
+    authentication_class = CachedJWTAuthentication
+    renderer_classes = [ORJSONRenderer, MessagePackRenderer]
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Authentication is by bearer token only, as in DRF's APIView.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.request = Request(
+            request, parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES])
+        self.request.accepted_renderer, self.request.accepted_media_type = self.negotiate()
+        authenticator = self.authentication_class()
+        try:
+            result = await authenticator.aauthenticate(request)
+            if result is None:
+                raise exceptions.NotAuthenticated()
+            self.request.user, self.request.auth = result
+            response = await super().dispatch(self.request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            response = self.handle_exception(exc, authenticator)
+        finally:
+            # As `ReplicaReadsMixin`: the viewset's reads after a write see it.
+            if request.method not in SAFE_METHODS and self.request.user.is_authenticated:
+                await sync_to_async(pin_to_primary)(self.request.user.pk)
+        # Bodies and ETags depend on the negotiated renderer.
+        patch_vary_headers(response, ["Accept"])
+        return response
+
+    def negotiate(self):
+        renderers = [renderer() for renderer in self.renderer_classes]
+        try:
+            return DefaultContentNegotiation().select_renderer(self.request, renderers)
+        except exceptions.NotAcceptable:
+            return renderers[0], renderers[0].media_type
+
+    def http_method_not_allowed(self, request, *args, **kwargs):
+        raise exceptions.MethodNotAllowed(request.method)
+
+    def handle_exception(self, exc, authenticator):
+        response = self.render(
+            exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail},
+            exc.status_code,
+        )
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            response.status_code = status.HTTP_401_UNAUTHORIZED
+            response["WWW-Authenticate"] = authenticator.authenticate_header(self.request)
+        return response
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        if status_code == status.HTTP_204_NO_CONTENT:
+            return HttpResponse(status=status_code)
+        renderer = self.request.accepted_renderer
+        return HttpResponse(
+            renderer.render(data, self.request.accepted_media_type),
+            status=status_code, content_type=renderer.media_type)
+
+
+class TaskQuerysetMixin:
+    include_archived_param = "include_archived"
+
+    def get_queryset(self):
+        """ Users can list only their tasks and admins can list all. """
+        user = self.request.user
+        if is_admin_user(user):
+            return Task.objects.all()
+        return user_tasks(user.id)
+
+    def get_querysets(self):
+        """ As `TaskViewSets.get_querysets`, for reads. """
+        user = self.request.user
+        if is_sharded() and is_admin_user(user):
+            querysets = shard_querysets(Task)
+        else:
+            querysets = [self.get_queryset()]
+
+        if self.request.query_params.get(self.include_archived_param) in ("1", "true"):
+            if self.request.query_params.get(TaskSearchFilter.search_param):
+                raise exceptions.ValidationError(
+                    {self.include_archived_param: ["Archived tasks cannot be searched."]})
+            if is_admin_user(user):
+                querysets += shard_querysets(ArchivedTask)
+            else:
+                querysets.append(for_shard(ArchivedTask, user.id).filter(user_id=user.id))
+        return querysets
+
+
+class TaskListAsyncView(TaskQuerysetMixin, AsyncAPIView):
+    """ Async list and create, equivalent to `TaskViewSets.list`/`create`. """
+    pagination_class = KeysetPagination
+    search_fields = ["title", "description"]
+
+    async def get(self, request):
+        """ As `TaskViewSets.list`: cached pages, then If-None-Match, then the page. """
+        is_admin = is_admin_user(request.user)
+        cache_key, entry = await sync_to_async(self.get_cached)(ALL_USERS if is_admin else request.user.id)
+        if entry is not None:
+            return self.render_cached(entry)
+
+        etag = None
+        if not is_admin:
+            queryset = self.filter_queryset(self.get_queryset())
+            etag = get_list_etag(request, await queryset.order_by().aaggregate(**list_state()))
+            not_modified = get_not_modified(request, etag)
+            if not_modified is not None:
+                return not_modified
+
+        data = await self.get_page()
+        await sync_to_async(task_list_cache.set)(cache_key, {"etag": etag, "data": data})
+        response = self.render(data)
+        if etag:
+            response["ETag"] = etag
+        return response
+
+    def filter_queryset(self, queryset):
+        return TaskSearchFilter().filter_queryset(self.request, queryset, self)
+
+    async def get_page(self):
+        paginator = self.pagination_class()
+        fields = get_requested_fields(self.request, TaskSerializer.Meta.fields)
+        querysets = [
+            TaskValuesSerializer.values(self.filter_queryset(queryset), fields)
+            for queryset in self.get_querysets()
+        ]
+        if len(querysets) == 1:
+            page = await paginator.apaginate_queryset(querysets[0], self.request, self)
+        else:
+            page = await sync_to_async(paginator.paginate_querysets)(querysets, self.request, self)
+        serializer = TaskValuesSerializer(page, fields)
+        return paginator.get_paginated_response(serializer.data).data
+
+    def get_cached(self, scope):
+        cache_key = task_list_cache.make_key(self.request, scope)
+        return cache_key, task_list_cache.get(cache_key)
+
+    def render_cached(self, entry):
+        etag = entry["etag"]
+        if etag is None:
+            return self.render(entry["data"])
+        not_modified = get_not_modified(self.request, etag)
+        if not_modified is not None:
+            return not_modified
+        response = self.render(entry["data"])
+        response["ETag"] = etag
+        return response
+
+    async def post(self, request):
+        serializer = TaskSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        task = await for_shard(Task, request.user.id).acreate(user=request.user, **serializer.validated_data)
+        return self.render(TaskSerializer(task).data, status.HTTP_201_CREATED)
+
+
+class TaskDetailAsyncView(AsyncAPIView):
+    """ Async retrieve, update and delete, authorized like `TaskViewSets`. """
+
+    async def get_object(self, id, models=(Task,), fields=None):
+        """ As `TaskViewSets.get_task`, reading only `fields` when given. """
+        querysets = chain.from_iterable(
+            shard_querysets(model, self.request.user.id) for model in models)
+        for queryset in querysets:
+            if fields is not None:
+                queryset = queryset.only(*fields, "user", "updated_at")
+            try:
+                task = await queryset.aget(id=id)
+                break
+            except queryset.model.DoesNotExist:
+                continue
+        else:
+            raise exceptions.NotFound()
+        if not IsOwner().has_object_permission(self.request, self, task):
+            raise exceptions.PermissionDenied()
+        return task
+
+    async def get(self, request, id):
+        models = (Task,)
+        if request.query_params.get(TaskQuerysetMixin.include_archived_param) in ("1", "true"):
+            models = (Task, ArchivedTask)
+        fields = get_requested_fields(request, TaskSerializer.Meta.fields)
+        task = await self.get_object(id, models, fields)
+        etag, last_modified = get_task_validators(request, task, fields)
+        not_modified = get_not_modified(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = self.render(TaskSerializer(task, fields=fields).data)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    async def patch(self, request, id):
+        task = await self.get_object(id)
+        serializer = TaskSerializer(task, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        for attr, value in serializer.validated_data.items():
+            setattr(task, attr, value)
+        await task.asave(update_fields=get_update_fields(serializer.validated_data))
+        return self.render(TaskSerializer(task).data)
+
+    async def delete(self, request, id):
+        task = await self.get_object(id)
+        await task.adelete()
+        return self.render(None, status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,89 @@
+"""
+Versioned cache of task list responses.
+
+Every user has a list version token, and admin listings share one for all
+users. Cached pages are keyed by that token, so a write only has to drop
+the version tokens of the users it touched (and the admin one) to make
+every cached page of theirs unreachable; stale entries then age out of the
+size-bounded cache. Tokens are dropped again once the transaction commits,
+so a page read mid-transaction is never cached under the fresh token.
+"""
+import threading
+from hashlib import md5
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+ALL_USERS = "all"
+
+
+class TaskListCache:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "TASK_LIST_CACHE_ALIAS", "default")]
+
+    def version_key(self, scope) -> str:
+        return f"tasks:list-version:{scope}"
+
+    def get_version(self, scope) -> str:
+        key = self.version_key(scope)
+        version = self.cache.get(key)
+        if version is None:
+            # A random token rather than a counter: an evicted version can
+            # never come back and revive old entries.
+            self.cache.add(key, uuid4().hex, timeout=None)
+            version = self.cache.get(key)
+        return version
+
+    def make_key(self, request, scope) -> str:
+        # Entries hold the ETag of the negotiated encoding.
+        path = f"{request.accepted_renderer.media_type}:{request.get_full_path()}"
+        query = md5(path.encode(), usedforsecurity=False).hexdigest()
+        return f"tasks:list:{scope}:{self.get_version(scope)}:{query}"
+
+    def get(self, key):
+        entry = self.cache.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(self, key, entry) -> None:
+        self.cache.set(key, entry)
+
+    def invalidate(self, user_ids) -> None:
+        scopes = {str(user_id) for user_id in user_ids} | {ALL_USERS}
+        self.cache.delete_many([self.version_key(scope) for scope in scopes])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+task_list_cache = TaskListCache()
+
+
+def invalidate_task_lists(user_ids) -> None:
+    """ Drop cached task lists of `user_ids` now and again after commit. """
+    user_ids = set(user_ids)
+    task_list_cache.invalidate(user_ids)
+    transaction.on_commit(lambda: task_list_cache.invalidate(user_ids))
+
+
+def collect_metrics():
+    """ List cache samples for `core.metrics`. """
+    stats = task_list_cache.stats()
+    return [
+        ("task_list_cache_hits_total", "counter", "Task lists served from cache.", stats["hits"]),
+        ("task_list_cache_misses_total", "counter", "Task lists rendered and cached.", stats["misses"]),
+    ]
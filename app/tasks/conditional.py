@@ -0,0 +1,45 @@
+"""
+Validators for conditional GETs of tasks, shared by `TaskViewSets` and the
+async views so both answer If-None-Match the same way.
+
+ETags cover everything that shapes a body: the tasks' ids and `updated_at`,
+the requested fields, the URL and the negotiated encoding.
+"""
+from hashlib import md5
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+
+def make_etag(*parts) -> str:
+    digest = md5(":".join(str(part) for part in parts).encode(), usedforsecurity=False)
+    return quote_etag(digest.hexdigest())
+
+
+def get_not_modified(request, etag, last_modified=None):
+    """ A 304 (or 412) response when the request's validators match, else None. """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        response["ETag"] = etag
+    return response
+
+
+def get_task_validators(request, task, fields):
+    """ The ETag and Last-Modified timestamp of `task` rendered with `fields`. """
+    etag = make_etag(
+        task.id, task.updated_at.isoformat(), fields, request.accepted_renderer.media_type)
+    return etag, int(task.updated_at.timestamp())
+
+
+def list_state():
+    """ Aggregates of a list's queryset its ETag is made from. """
+    return {"latest": Max("updated_at"), "count": Count("id")}
+
+
+def get_list_etag(request, state) -> str:
+    latest = state["latest"].isoformat() if state["latest"] else ""
+    # The page, search and ordering parameters and the encoding shape the body too.
+    return make_etag(
+        request.user.id, request.get_full_path(), request.accepted_renderer.media_type,
+        latest, state["count"])
@@ -0,0 +1,13 @@
+from rest_framework import filters
+
+from .search import get_search_backend
+
+
+class TaskSearchFilter(filters.SearchFilter):
+    """ `?search=` over title and description through the full-text backend. """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return get_search_backend(queryset.db).search(queryset, terms)
@@ -0,0 +1,135 @@
+"""
+Streaming import of tasks from CSV or NDJSON uploads.
+
+The upload is read line by line (Django spools large uploads to disk), each
+row is validated with the `TaskSerializer` rules and valid rows are written
+with one `bulk_create` transaction per batch. Invalid rows are skipped and
+reported by line number; only the first MAX_REPORTED_ERRORS are kept, so
+memory stays bounded whatever the file size. A failing row does not undo
+the batches already written. The whole upload is checked to be UTF-8 before
+the first row is read, so a badly encoded file writes nothing.
+"""
+import codecs
+import csv
+import io
+import json
+
+from django.db import transaction
+from rest_framework import serializers
+
+from .models import Task
+from .serializers import TaskSerializer
+from .shards import for_shard, shard_for_user
+
+IMPORT_FORMATS = ("ndjson", "csv")
+IMPORT_EXTENSIONS = {
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".csv": "csv",
+}
+MAX_REPORTED_ERRORS = 100
+
+
+def iter_ndjson_rows(stream):
+    """ Yield (line number, row or None when not a JSON object). """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def iter_csv_rows(stream):
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+ROW_READERS = {
+    "ndjson": iter_ndjson_rows,
+    "csv": iter_csv_rows,
+}
+
+
+def check_utf8(upload):
+    """ Decode the upload chunk by chunk, raising a 400 on the first invalid byte. """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for chunk in upload.chunks():
+            decoder.decode(chunk)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise serializers.ValidationError({"file": ["The file must be UTF-8 encoded."]})
+
+
+class TaskImporter:
+    """ Validate and insert rows for `user`, `batch_size` at a time. """
+
+    def __init__(self, user, batch_size):
+        self.user = user
+        self.batch_size = batch_size
+        # One serializer validates every row; its fields are built once.
+        self.serializer = TaskSerializer()
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def run(self, upload, import_format):
+        check_utf8(upload)
+        upload.seek(0)
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        batch = []
+        try:
+            for line_number, row in ROW_READERS[import_format](stream):
+                task = self.build(line_number, row)
+                if task is None:
+                    continue
+                batch.append(task)
+                if len(batch) >= self.batch_size:
+                    self.write(batch)
+                    batch = []
+        finally:
+            stream.detach()
+        self.write(batch)
+        return {"created": self.created, "failed": self.failed, "errors": self.errors}
+
+    def build(self, line_number, row):
+        if row is None:
+            self.fail(line_number, {"non_field_errors": ["Each line must be a JSON object."]})
+            return None
+        try:
+            validated = self.serializer.run_validation(row)
+        except serializers.ValidationError as exc:
+            self.fail(line_number, exc.detail)
+            return None
+        return Task(user=self.user, **validated)
+
+    def fail(self, line_number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_number, "errors": errors})
+
+    def write(self, batch):
+        if not batch:
+            return
+        with transaction.atomic(using=shard_for_user(self.user.id)):
+            for_shard(Task, self.user.id).bulk_create(batch)
+        self.created += len(batch)
+
+
+class TaskImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    type = serializers.ChoiceField(choices=IMPORT_FORMATS, required=False)
+
+    def validate(self, attrs):
+        if "type" not in attrs:
+            name = attrs["file"].name.lower()
+            extension = name[name.rfind("."):] if "." in name else ""
+            if extension not in IMPORT_EXTENSIONS:
+                raise serializers.ValidationError(
+                    {"type": ["Pass the type or upload a .csv or .ndjson file."]})
+            attrs["type"] = IMPORT_EXTENSIONS[extension]
+        return attrs
@@ -0,0 +1,15 @@
+from django.db import models
+
+from jobs.queue import job
+
+from .models import ArchivedTask, Task, TaskStats, TaskTombstone
+from .shards import for_shard
+
+
+@job
+def delete_user_tasks(user_id):
+    """ Remove a deleted user's tasks, archived tasks, counters and tombstones from their shard. """
+    # A plain QuerySet.delete(): the user needs no tombstones or counters.
+    models.QuerySet.delete(for_shard(Task, user_id).filter(user_id=user_id))
+    for model in (ArchivedTask, TaskStats, TaskTombstone):
+        for_shard(model, user_id).filter(user_id=user_id).delete()
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.shards import get_shards
+
+
+class Command(BaseCommand):
+    help = (
+        "Move tasks completed more than TASK_ARCHIVE_AFTER_DAYS ago to the archive, "
+        "one small transaction per batch. Safe to interrupt and rerun: every batch "
+        "commits on its own and archived tasks are not looked at again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.TASK_ARCHIVE_AFTER_DAYS,
+            help="Archive tasks completed and unchanged for this many days.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Tasks per transaction.")
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only count the tasks that would be archived.")
+
+    def handle(self, *args, days, batch_size, dry_run, **options):
+        cutoff = timezone.now() - timedelta(days=days)
+        archived = 0
+        for alias in get_shards():
+            # Completed tasks last changed before the cutoff, on (updated_at, id).
+            candidates = Task.objects.using(alias).filter(
+                is_completed=True, updated_at__lt=cutoff).order_by("updated_at", "id")
+            if dry_run:
+                archived += candidates.count()
+                continue
+            archived += self.archive(candidates, batch_size)
+
+        action = "Would archive" if dry_run else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{action} {archived} tasks completed before {cutoff:%Y-%m-%d}."))
+
+    def archive(self, candidates, batch_size):
+        archived = 0
+        batch = candidates
+        while rows := list(batch.values_list("id", "updated_at")[:batch_size]):
+            # Filtered again under lock: a task edited meanwhile stays.
+            archived += candidates.filter(id__in=[task_id for task_id, _ in rows]).archive()
+            updated_at, task_id = rows[-1][1], rows[-1][0]
+            batch = candidates.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=task_id))
+        return archived
@@ -0,0 +1,53 @@
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import TaskStats
+from tasks.shards import shard_for_user
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount every user's tasks and correct drifted TaskStats counters. "
+        "Run once after deploying the counters to backfill existing users."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify", action="store_true",
+            help="Only report drifted counters; exit with an error if there are any.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Users per transaction.")
+
+    def handle(self, *args, verify, batch_size, **options):
+        user_ids = get_user_model().objects.order_by("pk").values_list("pk", flat=True)
+        checked = drifted = 0
+        batch = []
+        for user_id in user_ids.iterator(chunk_size=batch_size):
+            batch.append(user_id)
+            if len(batch) == batch_size:
+                drifted += self.rebuild(batch, verify)
+                checked += len(batch)
+                batch = []
+        if batch:
+            drifted += self.rebuild(batch, verify)
+            checked += len(batch)
+
+        if verify and drifted:
+            raise CommandError(f"{drifted} of {checked} users have drifted task stats.")
+        action = "Found" if verify else "Corrected"
+        self.stdout.write(self.style.SUCCESS(f"{action} {drifted} drifted of {checked} users."))
+
+    def rebuild(self, user_ids, verify):
+        by_shard = defaultdict(list)
+        for user_id in user_ids:
+            by_shard[shard_for_user(user_id)].append(user_id)
+        drifted = [
+            row
+            for alias, shard_user_ids in by_shard.items()
+            for row in TaskStats.objects.db_manager(alias).rebuild(shard_user_ids, verify_only=verify)
+        ]
+        for user_id, stored, counted in drifted:
+            self.stdout.write(
+                f"{user_id}: stored total/completed {stored[0]}/{stored[1]}, counted {counted[0]}/{counted[1]}")
+        return len(drifted)
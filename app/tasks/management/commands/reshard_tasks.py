@@ -0,0 +1,104 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, models, transaction
+
+from tasks.cache import invalidate_task_lists
+from tasks.models import ArchivedTask, Task, TaskStats, TaskTombstone
+from tasks.shards import get_shards, shard_for_user
+
+
+class Command(BaseCommand):
+    help = (
+        "Move every user's tasks, archived tasks, counters and tombstones to the "
+        "shard their id hashes to, e.g. after adding a database to TASK_SHARDS. "
+        "Safe to rerun: rows already copied are skipped, so an interrupted run resumes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source", action="append", default=[],
+            help="Also drain this database, e.g. a shard removed from TASK_SHARDS.")
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only report the users that would move.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Tasks per transaction.")
+
+    def handle(self, *args, source, dry_run, batch_size, **options):
+        unknown = set(source) - set(connections)
+        if unknown:
+            raise CommandError(f"Unknown databases: {', '.join(sorted(unknown))}.")
+
+        users = tasks = 0
+        for alias in dict.fromkeys([*get_shards(), *source]):
+            for user_id in self.get_user_ids(alias):
+                target = shard_for_user(user_id)
+                if target == alias:
+                    continue
+                count = Task.objects.using(alias).filter(user_id=user_id).count()
+                self.stdout.write(f"{user_id}: {count} tasks from {alias} to {target}")
+                if not dry_run:
+                    self.move(user_id, alias, target, batch_size)
+                users += 1
+                tasks += count
+
+        action = "Would move" if dry_run else "Moved"
+        self.stdout.write(self.style.SUCCESS(f"{action} {tasks} tasks of {users} users."))
+
+    def get_user_ids(self, alias):
+        """ Users with any rows on `alias`. """
+        user_ids = set()
+        for model in (Task, ArchivedTask, TaskStats, TaskTombstone):
+            user_ids.update(
+                model._default_manager.using(alias).order_by().values_list("user_id", flat=True).distinct())
+        return sorted(user_ids)
+
+    def move(self, user_id, source, target, batch_size):
+        """
+        Copy the user's rows to `target`, then delete them from `source`.
+        Tasks deleted on `target` meanwhile are not copied back.
+        """
+        source_tasks = Task.objects.using(source).filter(user_id=user_id).order_by("created_at", "id")
+        target_tasks = Task.objects.using(target).filter(user_id=user_id)
+        target_tombstones = TaskTombstone.objects.using(target).filter(user_id=user_id)
+
+        batch = source_tasks
+        while rows := list(batch[:batch_size]):
+            with transaction.atomic(using=target):
+                ids = [task.id for task in rows]
+                skipped = set(target_tasks.filter(id__in=ids).values_list("id", flat=True))
+                skipped.update(target_tombstones.filter(task_id__in=ids).values_list("task_id", flat=True))
+                Task.objects.using(target).bulk_insert([task for task in rows if task.id not in skipped])
+            last = rows[-1]
+            batch = source_tasks.filter(
+                models.Q(created_at__gt=last.created_at) | models.Q(created_at=last.created_at, id__gt=last.id))
+
+        with transaction.atomic(using=target):
+            copied = set(ArchivedTask.objects.using(target).filter(user_id=user_id).values_list("id", flat=True))
+            ArchivedTask.objects.using(target).bulk_create([
+                task for task in ArchivedTask.objects.using(source).filter(user_id=user_id)
+                if task.id not in copied
+            ], batch_size=batch_size)
+
+            copied = set(target_tombstones.values_list("task_id", flat=True))
+            tombstones = [
+                tombstone
+                for tombstone in TaskTombstone.objects.using(source).filter(user_id=user_id).order_by("id")
+                if tombstone.task_id not in copied
+            ]
+            TaskTombstone.objects.db_manager(target).record(
+                (tombstone.task_id, user_id) for tombstone in tombstones)
+            # `deleted_at` is set on insert; restore it with one UPDATE per batch,
+            # by task id since MySQL returns no ids from bulk inserts.
+            for start in range(0, len(tombstones), batch_size):
+                batch = tombstones[start:start + batch_size]
+                target_tombstones.filter(task_id__in=[tombstone.task_id for tombstone in batch]).update(
+                    deleted_at=models.Case(*(
+                        models.When(task_id=tombstone.task_id, then=models.Value(tombstone.deleted_at))
+                        for tombstone in batch
+                    )))
+            TaskStats.objects.db_manager(target).rebuild([user_id])
+
+        with transaction.atomic(using=source):
+            # A plain QuerySet.delete(): the tasks were moved, not deleted.
+            models.QuerySet.delete(Task.objects.using(source).filter(user_id=user_id))
+            for model in (ArchivedTask, TaskStats, TaskTombstone):
+                model._default_manager.using(source).filter(user_id=user_id).delete()
+        invalidate_task_lists({user_id})
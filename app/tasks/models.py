@@ -1,19 +1,345 @@
+from collections import defaultdict
 from uuid import uuid4
 
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .cache import invalidate_task_lists
+
+# Fields whose changes move a task between users' counters.
+STATS_FIELDS = {"user", "user_id", "is_completed"}
+
+
+def tally(rows, sign=1, deltas=None):
+    """
+    Add `sign` per (user id, is_completed) row to per-user
+    [total, completed] `deltas`.
+    """
+    if deltas is None:
+        deltas = defaultdict(lambda: [0, 0])
+    for user_id, is_completed in rows:
+        deltas[user_id][0] += sign
+        if is_completed:
+            deltas[user_id][1] += sign
+    return deltas
+
+
+class TaskQuerySet(models.QuerySet):
+    """
+    Keeps `TaskStats` counters and cached task lists in step with writes
+    that skip `Task.save`/`delete`.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db, savepoint=False):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            TaskStats.objects.db_manager(self.db).apply(
+                tally((obj.user_id, obj.is_completed) for obj in objs))
+        invalidate_task_lists({obj.user_id for obj in objs})
+        return objs
+
+    def update(self, **kwargs):
+        # Also reached by bulk_update().
+        if not STATS_FIELDS & kwargs.keys():
+            user_ids = set(self.values_list("user_id", flat=True).distinct())
+            rows = super().update(**kwargs)
+            invalidate_task_lists(user_ids)
+            return rows
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            before = list(self.select_for_update().values_list("id", "user_id", "is_completed"))
+            rows = super().update(**kwargs)
+            # The new values may be expressions, so read back what was written.
+            after = Task.objects.using(self.db).filter(
+                id__in=[task_id for task_id, _, _ in before]).values_list("user_id", "is_completed")
+            deltas = tally((row[1:] for row in before), -1)
+            TaskStats.objects.db_manager(self.db).apply(tally(after, deltas=deltas))
+        invalidate_task_lists(set(deltas))
+        return rows
+
+    def delete(self):
+        with transaction.atomic(using=self.db, savepoint=False):
+            rows = list(self.select_for_update().values_list("id", "user_id", "is_completed"))
+            deleted = super().delete()
+            TaskTombstone.objects.db_manager(self.db).record([row[:2] for row in rows])
+            TaskStats.objects.db_manager(self.db).apply(tally((row[1:] for row in rows), -1))
+        invalidate_task_lists({user_id for _, user_id, _ in rows})
+        return deleted
+
+    def bulk_insert(self, tasks):
+        """
+        `bulk_create` keeping the tasks' `created_at` and `updated_at`,
+        which auto_now would reset, for tasks moved from elsewhere.
+        """
+        timestamps = [(task.created_at, task.updated_at) for task in tasks]
+        tasks = self.bulk_create(tasks)
+        for task, (created_at, updated_at) in zip(tasks, timestamps):
+            task.created_at, task.updated_at = created_at, updated_at
+        self.bulk_update(tasks, ["created_at", "updated_at"])
+        return tasks
+
+    def archive(self):
+        """
+        Move the tasks to `ArchivedTask` in one transaction, returning how
+        many moved. No tombstones are left: the tasks were not deleted.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            tasks = list(self.select_for_update())
+            ArchivedTask.objects.using(self.db).bulk_create(
+                [ArchivedTask.from_task(task) for task in tasks])
+            models.QuerySet.delete(Task.objects.using(self.db).filter(id__in=[task.id for task in tasks]))
+            deltas = tally(((task.user_id, task.is_completed) for task in tasks), -1)
+            TaskStats.objects.db_manager(self.db).apply(deltas)
+        invalidate_task_lists(set(deltas))
+        return len(tasks)
 
 
 # Create your models here.
 class Task(models.Model):
     """ A model representation of a Todo. """
     id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # Tasks may live on another database than users, see `tasks.shards`.
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_constraint=False)
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     is_completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        ordering = ("-created_at", "-id")
+        indexes = [
+            # Per-user listing and keyset pagination.
+            models.Index(fields=["user", "created_at", "id"], name="task_user_created_idx"),
+            # Per-user listing filtered on completion.
+            models.Index(fields=["user", "is_completed", "created_at"], name="task_user_completed_idx"),
+            # Admin listing across every user.
+            models.Index(fields=["created_at", "id"], name="task_created_idx"),
+            # Clients syncing changes since a point in time.
+            models.Index(fields=["updated_at", "id"], name="task_updated_idx"),
+            # Per-user newest change, for list ETags and sync.
+            models.Index(fields=["user", "updated_at", "id"], name="task_user_updated_idx"),
+        ]
     
     def __str__(self) -> str:
-        return self.title
\ No newline at end of file
+        return self.title
+
+    def save(self, *args, **kwargs):
+        """
+        Save and move the task's `TaskStats` counts. The stored row is read
+        under lock first, so concurrent edits cannot count a change twice.
+        Saves go to the shard of the task's user.
+        """
+        using = kwargs["using"] = kwargs.get("using") or router.db_for_write(Task, instance=self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not STATS_FIELDS & set(update_fields):
+            super().save(*args, **kwargs)
+            invalidate_task_lists({self.user_id})
+            return
+
+        with transaction.atomic(using=using, savepoint=False):
+            previous = []
+            if not self._state.adding:
+                previous = Task.objects.using(using).select_for_update().filter(
+                    pk=self.pk).values_list("user_id", "is_completed")
+            deltas = tally(previous, -1)
+            super().save(*args, **kwargs)
+            TaskStats.objects.db_manager(using).apply(
+                tally([(self.user_id, self.is_completed)], deltas=deltas))
+        invalidate_task_lists(set(deltas))
+
+    def delete(self, *args, **kwargs):
+        using = kwargs["using"] = kwargs.get("using") or router.db_for_write(Task, instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            tombstones = [(self.id, self.user_id)]
+            rows = list(Task.objects.using(using).select_for_update().filter(
+                pk=self.pk).values_list("user_id", "is_completed"))
+            deleted = super().delete(*args, **kwargs)
+            TaskTombstone.objects.db_manager(using).record(tombstones)
+            TaskStats.objects.db_manager(using).apply(tally(rows, -1))
+        invalidate_task_lists({self.user_id})
+        return deleted
+
+
+class ArchivedTaskQuerySet(models.QuerySet):
+
+    def restore(self):
+        """
+        Move the archived tasks back to `Task` in one transaction, returning
+        the restored tasks. They are as they were when archived, except for
+        `updated_at`: to delta sync they are new changes.
+        """
+        now = timezone.now()
+        with transaction.atomic(using=self.db, savepoint=False):
+            tasks = [task.to_task() for task in self.select_for_update()]
+            for task in tasks:
+                task.updated_at = now
+            Task.objects.using(self.db).bulk_insert(tasks)
+            ArchivedTask.objects.using(self.db).filter(id__in=[task.id for task in tasks]).delete()
+        return tasks
+
+
+class ArchivedTask(models.Model):
+    """
+    A task moved out of the `Task` table by `archive_tasks`, so old
+    completed tasks stop weighing on its indexes. Has the fields of `Task`,
+    kept as they were, and is not counted in `TaskStats`.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="archived_tasks",
+        db_constraint=False)
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True, null=True)
+    is_completed = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    # Not auto_now_add, so copies between shards keep it.
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    objects = ArchivedTaskQuerySet.as_manager()
+
+    # Copied to and from `Task`.
+    task_fields = ("id", "user_id", "title", "description", "is_completed", "created_at", "updated_at")
+
+    class Meta:
+        ordering = ("-created_at", "-id")
+        indexes = [
+            # Per-user listing and keyset pagination.
+            models.Index(fields=["user", "created_at", "id"], name="archived_user_created_idx"),
+            # Admin listing across every user.
+            models.Index(fields=["created_at", "id"], name="archived_created_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return self.title
+
+    @classmethod
+    def from_task(cls, task):
+        return cls(**{name: getattr(task, name) for name in cls.task_fields})
+
+    def to_task(self):
+        return Task(**{name: getattr(self, name) for name in self.task_fields})
+
+
+class TaskTombstoneManager(models.Manager):
+
+    def record(self, rows):
+        """ Leave a tombstone for every deleted (task id, user id) pair. """
+        return self.bulk_create(
+            [self.model(task_id=task_id, user_id=user_id) for task_id, user_id in rows])
+
+
+class TaskTombstone(models.Model):
+    """
+    A deleted task, kept so delta syncs can tell clients to drop it. The
+    auto-incrementing id orders tombstones in deletion order.
+    """
+    task_id = models.UUIDField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="task_tombstones",
+        db_constraint=False)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    objects = TaskTombstoneManager()
+
+    class Meta:
+        indexes = [
+            # Per-user deletions since a sync token.
+            models.Index(fields=["user", "id"], name="tombstone_user_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return str(self.task_id)
+
+class TaskStatsManager(models.Manager):
+
+    def apply(self, deltas):
+        """
+        Add per-user [total, completed] `deltas` to the counters, creating
+        the rows of users counted for the first time.
+        """
+        for user_id, (total, completed) in deltas.items():
+            if not total and not completed:
+                continue
+            increments = {"total": F("total") + total, "completed": F("completed") + completed}
+            if self.filter(user_id=user_id).update(**increments):
+                continue
+            try:
+                with transaction.atomic(using=self.db):
+                    self.create(user_id=user_id, total=total, completed=completed)
+            except IntegrityError:
+                # Created concurrently since the update above.
+                self.filter(user_id=user_id).update(**increments)
+
+    def for_user(self, user_id):
+        """ The user's counts, as the `stats` action returns them. """
+        total, completed = self.filter(user_id=user_id).values_list(
+            "total", "completed").first() or (0, 0)
+        return {"total": total, "completed": completed, "pending": total - completed}
+
+    def count_tasks(self, user_ids):
+        """ Per-user (total, completed) counted from the task table. """
+        counts = Task.objects.using(self.db).filter(user_id__in=user_ids).order_by().values(
+            "user_id").annotate(total=Count("id"), completed=Count("id", filter=Q(is_completed=True)))
+        return {row["user_id"]: (row["total"], row["completed"]) for row in counts}
+
+    def rebuild(self, user_ids, verify_only=False):
+        """
+        Recount the tasks of `user_ids` and correct counters that drifted.
+        Returns (user id, stored, counted) for each of them; with
+        `verify_only` nothing is written.
+
+        Stored rows are locked before counting, so writes committing
+        meanwhile wait and then add to the recounted values.
+        """
+        with transaction.atomic(using=self.db):
+            stored = self.filter(user_id__in=user_ids)
+            if not verify_only:
+                stored = stored.select_for_update()
+            stored = {stats.user_id: stats for stats in stored}
+            counted = self.count_tasks(user_ids)
+
+            drifted, created, updated = [], [], []
+            for user_id in user_ids:
+                total, completed = counted.get(user_id, (0, 0))
+                stats = stored.get(user_id)
+                current = (stats.total, stats.completed) if stats else (0, 0)
+                if current == (total, completed):
+                    continue
+                drifted.append((user_id, current, (total, completed)))
+                if stats is None:
+                    created.append(self.model(user_id=user_id, total=total, completed=completed))
+                else:
+                    stats.total, stats.completed = total, completed
+                    updated.append(stats)
+            if not verify_only:
+                self.bulk_create(created)
+                self.bulk_update(updated, ["total", "completed"])
+        return drifted
+
+
+class TaskStats(models.Model):
+    """
+    Per-user task counts, moved in the same transaction as every task
+    write so dashboards and paginator totals read one row instead of
+    counting tasks. `rebuild_task_stats` recounts them.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True,
+        related_name="task_stats", db_constraint=False)
+    # Signed, so a drifted counter going below zero cannot fail task writes.
+    total = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+
+    objects = TaskStatsManager()
+
+    class Meta:
+        verbose_name_plural = "task stats"
+
+    def __str__(self) -> str:
+        return f"{self.completed}/{self.total}"
@@ -1,9 +1,13 @@
 from rest_framework import permissions, status
 
+from user.utils import is_admin_user
+
+
 class IsOwner(permissions.BasePermission):
     """
-    Custom permission to only allow owners of an object to edit it.
+    Custom permission to only allow owners of an object, or admins, to edit it.
     """
 
     def has_object_permission(self, request, view, obj):
-        return obj.user == request.user
\ No newline at end of file
+        # Compare ids so the owner row is never loaded.
+        return is_admin_user(request.user) or obj.user_id == request.user.id
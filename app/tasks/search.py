@@ -0,0 +1,196 @@
+import re
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+SEARCH_FIELDS = ("title", "description")
+
+
+class BaseSearchBackend:
+    """
+    Full-text search over task titles and descriptions.
+
+    `search` narrows a task queryset to the matching rows, annotates each row
+    with a `search_rank` (higher is more relevant) and orders by it. Every
+    term is matched as a prefix so partially typed words already match.
+    """
+    rank_annotation = "search_rank"
+
+    def setup(self, using=DEFAULT_DB_ALIAS) -> None:
+        """ Create whatever the backend needs in the `using` database. """
+
+    def teardown(self, using=DEFAULT_DB_ALIAS) -> None:
+        """ Drop what `setup` created. """
+
+    def search(self, queryset, terms):
+        raise NotImplementedError
+
+    def order(self, queryset):
+        return queryset.order_by(f"-{self.rank_annotation}", "-created_at", "-id")
+
+
+class ContainsSearchBackend(BaseSearchBackend):
+    """ Fallback for databases without full-text support: LIKE '%term%'. """
+
+    def search(self, queryset, terms):
+        for term in terms:
+            condition = Q()
+            for field in SEARCH_FIELDS:
+                condition |= Q(**{f"{field}__icontains": term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+class MySQLFullTextSearchBackend(BaseSearchBackend):
+    """
+    Search through an InnoDB FULLTEXT index on (title, description).
+
+    InnoDB maintains the index itself on every write, bulk ones included.
+    Terms shorter than the index's minimum word length are matched with
+    LIKE instead.
+    """
+    index_name = "task_search_ft"
+    # innodb_ft_min_token_size: shorter words are never indexed.
+    min_token_size = 3
+    operators = re.compile(r'[+\-<>()~*"@]')
+
+    def setup(self, using=DEFAULT_DB_ALIAS) -> None:
+        table = Task._meta.db_table
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SHOW INDEX FROM {connection.ops.quote_name(table)} WHERE Key_name = %s",
+                [self.index_name],
+            )
+            if cursor.fetchone():
+                return
+            columns = ", ".join(connection.ops.quote_name(field) for field in SEARCH_FIELDS)
+            cursor.execute(
+                f"CREATE FULLTEXT INDEX {self.index_name} "
+                f"ON {connection.ops.quote_name(table)} ({columns})"
+            )
+
+    def teardown(self, using=DEFAULT_DB_ALIAS) -> None:
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DROP INDEX {self.index_name} ON {connection.ops.quote_name(Task._meta.db_table)}")
+
+    def search(self, queryset, terms):
+        words, short = [], []
+        for term in terms:
+            word = self.operators.sub("", term)
+            if len(word) >= self.min_token_size:
+                words.append(word)
+            else:
+                short.append(term)
+        queryset = ContainsSearchBackend().search(queryset, short)
+        if not words:
+            return queryset
+
+        against = " ".join(f"+{word}*" for word in words)
+        connection = connections[queryset.db]
+        table = connection.ops.quote_name(Task._meta.db_table)
+        columns = ", ".join(f"{table}.{connection.ops.quote_name(field)}" for field in SEARCH_FIELDS)
+        match = f"MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)"
+
+        queryset = queryset.filter(RawSQL(match, (against,), output_field=BooleanField()))
+        queryset = queryset.annotate(**{
+            self.rank_annotation: RawSQL(match, (against,), output_field=FloatField()),
+        })
+        return self.order(queryset)
+
+
+class SQLiteFTS5SearchBackend(BaseSearchBackend):
+    """
+    Search through an FTS5 external-content table mirroring tasks_task.
+
+    Triggers keep the index in step with every INSERT, UPDATE and DELETE on
+    the task table, so bulk writes that skip model signals stay searchable.
+    """
+    fts_table = "tasks_task_fts"
+
+    def setup(self, using=DEFAULT_DB_ALIAS) -> None:
+        table = Task._meta.db_table
+        fts = self.fts_table
+        columns = ", ".join(SEARCH_FIELDS)
+        new_values = ", ".join(f"new.{field}" for field in SEARCH_FIELDS)
+        old_values = ", ".join(f"old.{field}" for field in SEARCH_FIELDS)
+
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [fts])
+            if cursor.fetchone():
+                return
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, "
+                f"content='{table}', content_rowid='rowid', prefix='2 3')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.rowid, {new_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values}); "
+                f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.rowid, {new_values}); END"
+            )
+            self.rebuild(cursor)
+
+    def teardown(self, using=DEFAULT_DB_ALIAS) -> None:
+        fts = self.fts_table
+        with connections[using].cursor() as cursor:
+            for trigger in ("ai", "ad", "au"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{trigger}")
+            cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+    def rebuild(self, cursor) -> None:
+        """ Re-read every task into the index, e.g. after a VACUUM renumbered rowids. """
+        cursor.execute(f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')")
+
+    def search(self, queryset, terms):
+        fts = self.fts_table
+        table = connections[queryset.db].ops.quote_name(Task._meta.db_table)
+        # Quote every term so FTS5 syntax in user input is matched literally.
+        match = " AND ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+        queryset = queryset.filter(RawSQL(
+            f"{table}.rowid IN (SELECT rowid FROM {fts} WHERE {fts} MATCH %s)",
+            (match,),
+            output_field=BooleanField(),
+        ))
+        # bm25() is lower for better matches; negate it so higher ranks first.
+        queryset = queryset.annotate(**{
+            self.rank_annotation: RawSQL(
+                f"(SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND rowid = {table}.rowid)",
+                (match,),
+                output_field=FloatField(),
+            ),
+        })
+        return self.order(queryset)
+
+
+VENDOR_BACKENDS = {
+    "mysql": MySQLFullTextSearchBackend,
+    "sqlite": SQLiteFTS5SearchBackend,
+}
+
+
+def get_search_backend(using=DEFAULT_DB_ALIAS) -> BaseSearchBackend:
+    """
+    Return the backend named by the `TASK_SEARCH_BACKEND` setting, or the
+    one matching the vendor of the `using` database when the setting is
+    not defined.
+    """
+    path = getattr(settings, "TASK_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    return VENDOR_BACKENDS.get(connections[using].vendor, ContainsSearchBackend)()
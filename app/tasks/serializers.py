@@ -1,11 +1,75 @@
-from rest_framework import serializers
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from core.fieldsets import SparseFieldsSerializerMixin
 
 from .models import Task
+from .shards import for_shard
+
+BULK_MAX_ITEMS = 1000
+
+
+class TaskListSerializer(serializers.ListSerializer):
+    """
+    Writes a list of tasks with bulk queries instead of one per item, one
+    per user or shard.
+    """
+
+    def create(self, validated_data):
+        by_user = defaultdict(list)
+        for item in validated_data:
+            task = Task(**item)
+            by_user[task.user_id].append(task)
+        return [
+            task
+            for user_id, tasks in by_user.items()
+            for task in for_shard(Task, user_id).bulk_create(tasks)
+        ]
+
+    def validate(self, attrs):
+        # Updates apply each item on its own, so a repeated id would be
+        # counted, and answered, twice.
+        counts = Counter(item["id"] for item in attrs if "id" in item)
+        duplicates = sorted(str(task_id) for task_id, count in counts.items() if count > 1)
+        if duplicates:
+            raise serializers.ValidationError(f"Duplicate id(s): {', '.join(duplicates)}.")
+        return attrs
+
+    def update(self, instance, validated_data):
+        """ Apply each item to the task in `instance` with the same id. """
+        tasks = {task.id: task for task in instance}
+        fields = {"updated_at"}
+        now = timezone.now()
+        updated = []
+        by_shard = defaultdict(list)
 
-class TaskSerializer(serializers.ModelSerializer):
+        for item in validated_data:
+            task = tasks.get(item.pop("id"))
+            if task is None:
+                continue
+            for attr, value in item.items():
+                setattr(task, attr, value)
+                fields.add(attr)
+            # bulk_update() does not run auto_now.
+            task.updated_at = now
+            updated.append(task)
+            by_shard[task._state.db].append(task)
+
+        for alias, tasks in by_shard.items():
+            Task.objects.using(alias).bulk_update(tasks, fields)
+        return updated
+
+
+class TaskSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     
     class Meta:
         model = Task
+        list_serializer_class = TaskListSerializer
         fields = [
             "id",
             "title",
@@ -18,4 +82,104 @@ class TaskSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             "created_at": {"read_only": True},
             "updated_at": {"read_only": True},
-        }
\ No newline at end of file
+        }
+
+    def create(self, validated_data):
+        # On the shard of the task's user, see `tasks.shards`.
+        return for_shard(Task, validated_data["user"].id).create(**validated_data)
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=get_update_fields(validated_data))
+        return instance
+
+
+def get_update_fields(validated_data):
+    """
+    The columns an edit writes. Edits leaving `is_completed` alone then
+    skip the locked `TaskStats` path of `Task.save`.
+    """
+    return [*validated_data, "updated_at"]
+
+
+class TaskValuesSerializer:
+    """
+    Read-only stand-in for `TaskSerializer(many=True)` on list pages.
+
+    Works on `values()` rows instead of model instances and formats each
+    field with a plain function picked once per serializer, skipping DRF's
+    per-row field machinery. Output is identical to `TaskSerializer`.
+    """
+    fields = TaskSerializer.Meta.fields
+    # Always selected: the paginator reads cursor positions from them.
+    position_fields = ("id", "created_at")
+
+    def __init__(self, rows, fields=None):
+        self.rows = rows
+        self.output_fields = self.fields if fields is None else fields
+
+    @classmethod
+    def values(cls, queryset, fields=None):
+        """
+        Select the declared fields, or only `fields` and the position
+        fields, keeping annotations used for ordering.
+        """
+        if fields is not None:
+            fields = [name for name in cls.fields if name in fields or name in cls.position_fields]
+        return queryset.values(*(fields or cls.fields), *queryset.query.annotations)
+
+    @cached_property
+    def data(self):
+        formatters = [
+            (name, self.get_formatter(field))
+            for name, field in TaskSerializer().fields.items()
+            if name in self.output_fields
+        ]
+        return [
+            {
+                name: None if row[name] is None else formatter(row[name])
+                for name, formatter in formatters
+            }
+            for row in self.rows
+        ]
+
+    @staticmethod
+    def get_formatter(field):
+        if isinstance(field, (serializers.UUIDField, serializers.CharField)):
+            return str
+        if isinstance(field, serializers.BooleanField):
+            return bool
+        if isinstance(field, serializers.DateTimeField):
+            return _datetime_formatter(field)
+        return field.to_representation
+
+
+def _datetime_formatter(field):
+    """ `DateTimeField.to_representation` for aware datetimes in ISO 8601. """
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if not settings.USE_TZ or output_format is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+    current = timezone.get_current_timezone()
+
+    def format_datetime(value):
+        value = value.astimezone(current).isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    return format_datetime
+
+
+class BulkUpdateTaskSerializer(TaskSerializer):
+    """ A task patch in a bulk update, addressed by its id. """
+    id = serializers.UUIDField()
+
+    def validate(self, attrs):
+        # Bulk updates are partial, which would otherwise let `id` be omitted.
+        if "id" not in attrs:
+            raise serializers.ValidationError({"id": "This field is required."})
+        return attrs
+
+
+class BulkDeleteTaskSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=BULK_MAX_ITEMS)
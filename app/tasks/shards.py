@@ -0,0 +1,96 @@
+"""
+Sharding tasks by user.
+
+TASK_SHARDS lists the database aliases holding tasks, the default one
+first: it keeps the users too. Each user's tasks, counters and tombstones
+live together on one shard, picked by rendezvous hashing of the user id,
+so adding a shard moves only the users that now hash to it;
+`reshard_tasks` moves their rows.
+
+Task querysets find their shard through router hints: `user_tasks()` and
+`for_shard()` pass the user id to `ShardRouter`, and saving a task passes
+the task itself. Admin views read every shard with `shard_querysets()`.
+With the single default shard the router steps aside, so the replica
+router keeps serving task reads.
+"""
+from hashlib import md5
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# `task_search` indexes the task table of each shard.
+SHARDED_APPS = {"tasks", "task_search"}
+
+
+def get_shards():
+    return getattr(settings, "TASK_SHARDS", [DEFAULT_DB_ALIAS])
+
+
+def is_sharded() -> bool:
+    return len(get_shards()) > 1
+
+
+def shard_for_user(user_id) -> str:
+    """ The alias of the shard holding `user_id`'s tasks. """
+    shards = get_shards()
+    if len(shards) == 1:
+        return shards[0]
+    return max(shards, key=lambda alias: md5(f"{alias}:{user_id}".encode(), usedforsecurity=False).digest())
+
+
+def for_shard(model, user_id):
+    """ `model`'s default manager, routed to `user_id`'s shard. """
+    return model._default_manager.db_manager(hints={"user_id": user_id})
+
+
+def user_tasks(user_id):
+    from .models import Task
+
+    return for_shard(Task, user_id).filter(user_id=user_id)
+
+
+def shard_querysets(model, user_id=None):
+    """
+    One queryset over `model` per shard, for admin fan-out and lookups by
+    id, with `user_id`'s shard first.
+    """
+    if not is_sharded():
+        return [model._default_manager.all()]
+    shards = get_shards()
+    if user_id is not None:
+        first = shard_for_user(user_id)
+        shards = [first, *(alias for alias in shards if alias != first)]
+    return [model._default_manager.using(alias) for alias in shards]
+
+
+class ShardRouter:
+    """
+    Routes the tasks app's models to their owner's shard when a query is
+    hinted with a `user_id` or an instance with one.
+    """
+
+    def get_shard(self, model, hints):
+        if model._meta.app_label not in SHARDED_APPS or not is_sharded():
+            return None
+        user_id = hints.get("user_id")
+        if user_id is None and hints.get("instance") is not None:
+            user_id = getattr(hints["instance"], "user_id", None)
+        if user_id is None:
+            return None
+        return shard_for_user(user_id)
+
+    def db_for_read(self, model, **hints):
+        return self.get_shard(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self.get_shard(model, hints)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if not is_sharded():
+            return None
+        if app_label in SHARDED_APPS:
+            return db in get_shards()
+        # Shards other than the default hold only tasks.
+        if db != DEFAULT_DB_ALIAS and db in get_shards():
+            return False
+        return None
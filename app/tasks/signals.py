@@ -0,0 +1,20 @@
+from .cache import invalidate_task_lists
+from .jobs import delete_user_tasks
+from .shards import get_shards, shard_for_user
+
+
+def drop_owner_task_lists(sender, instance, **kwargs):
+    """ A deleted user's tasks are cascaded without `Task.delete`. """
+    invalidate_task_lists({instance.pk})
+
+
+def delete_sharded_tasks(sender, instance, **kwargs):
+    """
+    Deletions only cascade within the user's database, so queue the removal
+    of a deleted user's rows from a shard of their own. The job commits with
+    the user's deletion, and retries if the shard is unavailable.
+    """
+    alias = shard_for_user(instance.pk)
+    if alias == instance._state.db or len(get_shards()) == 1:
+        return
+    delete_user_tasks.enqueue(user_id=instance.pk)
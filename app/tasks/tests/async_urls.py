@@ -0,0 +1,10 @@
+""" Root URLconf serving the tasks API through the async views. """
+from django.urls import include, path
+
+from tasks.urls.tasks import async_urlpatterns, urlpatterns
+
+urlpatterns = [
+    path('api/v1/tasks/', include((async_urlpatterns + urlpatterns, 'task'))),
+    path('api/v1/users/', include('user.urls.user')),
+    path('api/v1/auth/', include('user.urls.auth')),
+]
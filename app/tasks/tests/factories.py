@@ -3,6 +3,7 @@ import factory
 from django.utils import timezone
 
 from ..models import Task
+from ..shards import for_shard
 from user.tests.factories import UserFactory
 
 
@@ -17,3 +18,8 @@ class TaskFactory(factory.django.DjangoModelFactory):
 
     
     
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        # On the shard of the task's user, as the API creates them.
+        return for_shard(model_class, kwargs["user"].id).create(*args, **kwargs)
@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import ArchivedTask, Task, TaskStats
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def client(user_factory):
+    client = APIClient()
+    client.user = user_factory(is_active=True)
+    client.force_authenticate(client.user)
+    return client
+
+
+@pytest.fixture
+def old_tasks(client, task_factory, time_machine, settings):
+    """ Two old completed tasks and an old pending one, then a recent completed one. """
+    old = [
+        task_factory(user=client.user, title="old 1"),
+        task_factory(user=client.user, title="old 2"),
+        task_factory(user=client.user, title="old pending", is_completed=False),
+    ]
+    time_machine.move_to(timezone.now() + timedelta(days=settings.TASK_ARCHIVE_AFTER_DAYS + 1))
+    task_factory(user=client.user, title="recent")
+    return old
+
+
+def titles(response):
+    assert response.status_code == 200, response.content
+    return [task["title"] for task in response.json()["results"]]
+
+
+class TestArchiveTasks:
+
+    def test_moves_old_completed_tasks(self, client, old_tasks, capsys):
+        call_command("archive_tasks", "--batch-size", "1")
+
+        assert set(ArchivedTask.objects.values_list("title", flat=True)) == {"old 1", "old 2"}
+        assert set(Task.objects.values_list("title", flat=True)) == {"old pending", "recent"}
+        archived = ArchivedTask.objects.get(id=old_tasks[0].id)
+        assert (archived.created_at, archived.updated_at) == (old_tasks[0].created_at, old_tasks[0].updated_at)
+        assert TaskStats.objects.for_user(client.user.id) == {"total": 2, "completed": 1, "pending": 1}
+        assert "Archived 2 tasks" in capsys.readouterr().out
+
+    def test_rerun_and_dry_run_move_nothing(self, old_tasks, capsys):
+        call_command("archive_tasks", "--dry-run")
+        assert "Would archive 2 tasks" in capsys.readouterr().out
+        assert not ArchivedTask.objects.exists()
+
+        call_command("archive_tasks")
+        call_command("archive_tasks")
+
+        assert "Archived 0 tasks" in capsys.readouterr().out.splitlines()[-1]
+
+
+class TestArchivedTasksApi:
+    list_task_url = reverse("task:task-list")
+
+    @pytest.fixture(autouse=True)
+    def archived(self, old_tasks):
+        call_command("archive_tasks")
+
+    def detail_url(self, task, action="task-detail"):
+        return reverse(f"task:{action}", args=[task.id])
+
+    def test_lists_include_archived_tasks_on_request(self, client):
+        assert titles(client.get(self.list_task_url)) == ["recent", "old pending"]
+
+        response = client.get(self.list_task_url, {"include_archived": 1, "total": "exact"})
+
+        assert titles(response) == ["recent", "old pending", "old 2", "old 1"]
+        assert response.json()["total"] == 4
+
+    def test_archived_tasks_are_read_only(self, client, old_tasks):
+        url = self.detail_url(old_tasks[0])
+
+        assert client.get(url).status_code == 404
+        assert client.get(url, {"include_archived": 1}).json()["title"] == "old 1"
+        assert client.patch(f"{url}?include_archived=1", {"title": "new"}).status_code == 404
+
+    def test_restore(self, client, old_tasks):
+        task = old_tasks[0]
+
+        response = client.post(self.detail_url(task, "task-restore"))
+
+        assert response.status_code == 200
+        assert response.json()["title"] == "old 1"
+        restored = Task.objects.get(id=task.id)
+        assert restored.created_at == task.created_at
+        assert restored.updated_at > task.updated_at
+        assert not ArchivedTask.objects.filter(id=task.id).exists()
+        assert TaskStats.objects.for_user(client.user.id)["completed"] == 2
+        assert client.post(self.detail_url(task, "task-restore")).status_code == 404
+
+    def test_restored_tasks_are_synced(self, client, old_tasks):
+        since = client.get(reverse("task:task-changes")).json()["since"]
+        client.post(self.detail_url(old_tasks[0], "task-restore"))
+
+        response = client.get(reverse("task:task-changes"), {"since": since})
+
+        assert str(old_tasks[0].id) in [task["id"] for task in response.json()["results"]]
+
+    def test_only_owners_restore(self, old_tasks, user_factory):
+        other = APIClient()
+        other.force_authenticate(user_factory(is_active=True))
+
+        assert other.post(self.detail_url(old_tasks[0], "task-restore")).status_code == 403
+
+    def test_archived_tasks_cannot_be_searched(self, client):
+        response = client.get(self.list_task_url, {"include_archived": 1, "search": "old"})
+
+        assert response.status_code == 400
@@ -0,0 +1,156 @@
+import msgpack
+import pytest
+from rest_framework import status
+from django.urls import resolve, reverse
+
+from core.routers import is_pinned
+from .conftest import api_client_with_credentials
+from ..async_views import TaskDetailAsyncView, TaskListAsyncView
+from ..models import Task
+
+
+pytestmark = [pytest.mark.django_db, pytest.mark.urls("tasks.tests.async_urls")]
+
+
+class TestTasksAsyncEndPoints:
+
+    def list_url(self):
+        return reverse("task:task-list")
+
+    def detail_url(self, task):
+        return reverse("task:task-detail", args=[task.id])
+
+    def test_list_and_detail_resolve_to_async_views(self, task_factory):
+        task = task_factory()
+
+        assert resolve(self.list_url()).func.view_class is TaskListAsyncView
+        assert resolve(self.detail_url(task)).func.view_class is TaskDetailAsyncView
+
+    def test_list_only_user_owned_tasks(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory()
+        task_factory.create_batch(3, user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        response = api_client.get(self.list_url(), {"page_size": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert len(body['results']) == 2
+        assert len(api_client.get(body['links']['next']).json()['results']) == 1
+
+    def test_list_negotiates_msgpack(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(2, user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        as_json = api_client.get(self.list_url()).json()
+        response = api_client.get(self.list_url(), HTTP_ACCEPT="application/msgpack")
+
+        assert response["Content-Type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content) == as_json
+
+    def test_list_search(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory(user=user['user_instance'], title="Groceries")
+        task_factory(user=user['user_instance'], title="Rent")
+        api_client_with_credentials(user['token'], api_client)
+
+        response = api_client.get(self.list_url(), {"search": "groc"})
+
+        assert [task['title'] for task in response.json()['results']] == ["Groceries"]
+
+    def test_list_page_number(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(3, user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        body = api_client.get(self.list_url(), {"page": 1}).json()
+
+        assert body['total'] == 3
+        assert body['current_page'] == 1
+
+    def test_create(self, api_client, authenticate_user):
+        user = authenticate_user()
+        api_client_with_credentials(user['token'], api_client)
+
+        response = api_client.post(self.list_url(), {"title": "Test", "description": "Some info"})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()['title'] == "Test"
+        assert Task.objects.get().user == user['user_instance']
+
+    def test_writes_pin_the_user_to_the_primary(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        api_client_with_credentials(user['token'], api_client)
+        task = task_factory(user=user['user_instance'])
+
+        api_client.get(self.detail_url(task))
+        assert not is_pinned(user['user_instance'].pk)
+        api_client.patch(self.detail_url(task), {"title": "Edited"})
+        assert is_pinned(user['user_instance'].pk)
+
+    def test_create_validates_payload(self, api_client, authenticate_user):
+        api_client_with_credentials(authenticate_user()['token'], api_client)
+
+        response = api_client.post(self.list_url(), {"description": "No title"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'title' in response.json()
+
+    def test_unauthenticated_requests_are_rejected(self, task_factory, api_client):
+        task = task_factory()
+
+        assert api_client.get(self.list_url()).status_code == status.HTTP_401_UNAUTHORIZED
+        assert api_client.get(self.detail_url(task)).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_invalid_token_is_rejected(self, api_client):
+        api_client_with_credentials("not-a-token", api_client)
+
+        response = api_client.get(self.list_url())
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response["WWW-Authenticate"].startswith("Bearer")
+
+    def test_owner_can_retrieve_update_and_delete(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task = task_factory(user=user['user_instance'], title="Before")
+        api_client_with_credentials(user['token'], api_client)
+
+        assert api_client.get(self.detail_url(task)).json()['title'] == "Before"
+
+        response = api_client.patch(self.detail_url(task), {"title": "After"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['title'] == "After"
+
+        response = api_client.delete(self.detail_url(task))
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not Task.objects.exists()
+
+    def test_non_owner_is_forbidden(self, task_factory, api_client, authenticate_user):
+        task = task_factory()
+        api_client_with_credentials(authenticate_user()['token'], api_client)
+
+        assert api_client.get(self.detail_url(task)).status_code == status.HTTP_403_FORBIDDEN
+        assert api_client.delete(self.detail_url(task)).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_unknown_task_is_not_found(self, task_factory, api_client, authenticate_user):
+        task = task_factory.build()
+        api_client_with_credentials(authenticate_user()['token'], api_client)
+
+        assert api_client.get(self.detail_url(task)).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_unsupported_method(self, task_factory, api_client, authenticate_user):
+        task = task_factory()
+        api_client_with_credentials(authenticate_user()['token'], api_client)
+
+        response = api_client.put(self.detail_url(task), {"title": "x"})
+
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+    def test_other_actions_stay_on_the_viewset(self, api_client, authenticate_user):
+        api_client_with_credentials(authenticate_user()['token'], api_client)
+
+        response = api_client.post(reverse("task:task-bulk"), [{"title": "Task"}])
+
+        assert response.status_code == status.HTTP_201_CREATED
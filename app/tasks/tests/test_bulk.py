@@ -0,0 +1,124 @@
+import pytest
+from rest_framework import status
+from django.urls import reverse
+
+from .conftest import api_client_with_credentials
+from ..models import Task
+from ..serializers import BULK_MAX_ITEMS
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTasksBulkEndPoints:
+    bulk_url = reverse("task:task-bulk")
+
+    def test_bulk_create_tasks(self, api_client, authenticate_user):
+        user = authenticate_user()
+        api_client_with_credentials(user['token'], api_client)
+        data = [{"title": f"Task {i}", "description": "info"} for i in range(50)]
+
+        response = api_client.post(self.bulk_url, data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        results = response.json()['results']
+        assert len(results) == 50
+        assert all(item['status'] == status.HTTP_201_CREATED for item in results)
+        assert [item['data']['title'] for item in results] == [item['title'] for item in data]
+        assert Task.objects.filter(user=user['user_instance']).count() == 50
+
+    def test_bulk_create_uses_a_constant_number_of_queries(
+            self, api_client, authenticate_user, django_assert_max_num_queries):
+        api_client_with_credentials(authenticate_user()['token'], api_client)
+        data = [{"title": f"Task {i}"} for i in range(500)]
+
+        with django_assert_max_num_queries(11):
+            response = api_client.post(self.bulk_url, data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_bulk_create_rejects_whole_batch_on_invalid_item(self, api_client, authenticate_user):
+        api_client_with_credentials(authenticate_user()['token'], api_client)
+        data = [{"title": "Valid"}, {"description": "missing title"}]
+
+        response = api_client.post(self.bulk_url, data)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        errors = response.json()
+        assert errors[0] == {}
+        assert 'title' in errors[1]
+        assert Task.objects.count() == 0
+
+    def test_bulk_create_limits_batch_size(self, api_client, authenticate_user):
+        api_client_with_credentials(authenticate_user()['token'], api_client)
+        data = [{"title": "Task"}] * (BULK_MAX_ITEMS + 1)
+
+        response = api_client.post(self.bulk_url, data)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Task.objects.count() == 0
+
+    def test_bulk_update_own_tasks(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        own = task_factory.create_batch(3, user=user['user_instance'], is_completed=False)
+        other = task_factory(is_completed=False)
+        api_client_with_credentials(user['token'], api_client)
+        data = [{"id": str(task.id), "is_completed": True} for task in own + [other]]
+
+        response = api_client.patch(self.bulk_url, data)
+
+        assert response.status_code == status.HTTP_200_OK
+        statuses = [item['status'] for item in response.json()['results']]
+        assert statuses == [200, 200, 200, 404]
+        assert Task.objects.filter(is_completed=True).count() == 3
+        other.refresh_from_db()
+        assert other.is_completed is False
+
+    def test_bulk_update_refreshes_updated_at(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task = task_factory(user=user['user_instance'], title="Before")
+        api_client_with_credentials(user['token'], api_client)
+
+        api_client.patch(self.bulk_url, [{"id": str(task.id), "title": "After"}])
+
+        updated = Task.objects.get(id=task.id)
+        assert updated.title == "After"
+        assert updated.updated_at > task.updated_at
+
+    def test_bulk_update_requires_ids(self, api_client, authenticate_user):
+        api_client_with_credentials(authenticate_user()['token'], api_client)
+
+        response = api_client.patch(self.bulk_url, [{"title": "No id"}])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_bulk_update_rejects_duplicate_ids(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task = task_factory(user=user['user_instance'], title="Before")
+        api_client_with_credentials(user['token'], api_client)
+        data = [{"id": str(task.id), "title": "First"}, {"id": str(task.id), "is_completed": True}]
+
+        response = api_client.patch(self.bulk_url, data)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert str(task.id) in response.json()['non_field_errors'][0]
+        assert Task.objects.get(id=task.id).title == "Before"
+
+    def test_bulk_delete_only_removes_own_tasks(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        own = task_factory.create_batch(2, user=user['user_instance'])
+        other = task_factory()
+        api_client_with_credentials(user['token'], api_client)
+        data = {"ids": [str(task.id) for task in own + [other]]}
+
+        response = api_client.delete(self.bulk_url, data)
+
+        assert response.status_code == status.HTTP_200_OK
+        statuses = [item['status'] for item in response.json()['results']]
+        assert statuses == [204, 204, 404]
+        assert list(Task.objects.all()) == [other]
+
+    def test_unauthenticated_user_cannot_use_bulk(self, api_client):
+        response = api_client.post(self.bulk_url, [{"title": "Task"}])
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
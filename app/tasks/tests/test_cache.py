@@ -0,0 +1,130 @@
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .conftest import api_client_with_credentials
+from ..cache import task_list_cache
+from ..models import Task
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTaskListCache:
+    list_task_url = reverse("task:task-list")
+
+    def authenticate(self, client, user):
+        client.force_authenticate(user)
+
+    @pytest.fixture
+    def admin_client(self, user_factory):
+        admin_client = APIClient()
+        self.authenticate(admin_client, user_factory(is_active=True, is_admin=True))
+        return admin_client
+
+    def titles(self, client, **params):
+        response = client.get(self.list_task_url, params)
+        assert response.status_code == status.HTTP_200_OK
+        return sorted(task['title'] for task in response.json()['results'])
+
+    def test_repeated_list_is_served_from_cache(self, client, task_factory, django_assert_num_queries):
+        task_factory.create_batch(3, user=client.user_instance)
+        first = client.get(self.list_task_url)
+        before = task_list_cache.stats()
+
+        with django_assert_num_queries(0):
+            second = client.get(self.list_task_url)
+
+        assert second.json() == first.json()
+        assert second["ETag"] == first["ETag"]
+        after = task_list_cache.stats()
+        assert after["hits"] == before["hits"] + 1
+        assert after["misses"] == before["misses"]
+
+    def test_cache_is_keyed_by_query(self, client, task_factory):
+        task_factory.create_batch(3, user=client.user_instance)
+
+        assert len(self.titles(client, page_size=1)) == 1
+        assert len(self.titles(client, page_size=2)) == 2
+
+    def test_cache_is_per_user(self, client, task_factory, user_factory):
+        task_factory(user=client.user_instance, title="Mine")
+        other = user_factory(is_active=True)
+        task_factory(user=other, title="Theirs")
+        assert self.titles(client) == ["Mine"]
+
+        self.authenticate(client, other)
+
+        assert self.titles(client) == ["Theirs"]
+
+    def test_api_writes_invalidate(self, client):
+        task_id = client.post(self.list_task_url, {"title": "First"}).json()['id']
+        assert self.titles(client) == ["First"]
+
+        client.patch(reverse('task:task-detail', args=[task_id]), {"title": "Edited"})
+        assert self.titles(client) == ["Edited"]
+
+        client.delete(reverse('task:task-detail', args=[task_id]))
+        assert self.titles(client) == []
+
+    def test_bulk_writes_invalidate(self, client):
+        bulk_url = reverse("task:task-bulk")
+        created = client.post(bulk_url, [{"title": "A"}, {"title": "B"}], format="json").json()
+        ids = [result['id'] for result in created['results']]
+        assert self.titles(client) == ["A", "B"]
+
+        client.patch(bulk_url, [{"id": ids[0], "title": "C"}], format="json")
+        assert self.titles(client) == ["B", "C"]
+
+        client.delete(bulk_url, {"ids": ids}, format="json")
+        assert self.titles(client) == []
+
+    def test_admin_edit_invalidates_owner_list(self, client, admin_client, task_factory):
+        task = task_factory(user=client.user_instance, title="Before")
+        assert self.titles(client) == ["Before"]
+
+        admin_client.patch(reverse('task:task-detail', args=[task.id]), {"title": "After"})
+
+        assert self.titles(client) == ["After"]
+
+    def test_owner_write_invalidates_admin_list(self, client, admin_client):
+        before = admin_client.get(self.list_task_url).json()['results']
+
+        client.post(self.list_task_url, {"title": "New"})
+
+        assert len(admin_client.get(self.list_task_url).json()['results']) == len(before) + 1
+
+    def test_orm_writes_invalidate(self, client, task_factory):
+        task = task_factory(user=client.user_instance, title="Old")
+        assert self.titles(client) == ["Old"]
+
+        Task.objects.filter(id=task.id).update(title="New")
+        assert self.titles(client) == ["New"]
+
+        Task.objects.bulk_create([Task(user=client.user_instance, title="Other")])
+        assert self.titles(client) == ["New", "Other"]
+
+        Task.objects.filter(id=task.id).delete()
+        assert self.titles(client) == ["Other"]
+
+
+@pytest.mark.urls("tasks.tests.async_urls")
+class TestAsyncTaskListCache(TestTaskListCache):
+    """ The async list view reads and fills the same cache entries. """
+
+    def authenticate(self, client, user):
+        # The async views authenticate bearer tokens only.
+        api_client_with_credentials(str(AccessToken.for_user(user)), client)
+
+    def test_entries_are_shared_with_the_viewset(self, client, task_factory, django_assert_num_queries):
+        task_factory(user=client.user_instance, title="Cached")
+        with override_settings(ROOT_URLCONF="core.urls"):
+            etag = client.get(self.list_task_url)["ETag"]
+
+        with django_assert_num_queries(0):
+            response = client.get(self.list_task_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
@@ -0,0 +1,129 @@
+import pytest
+from rest_framework import status
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .conftest import api_client_with_credentials
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTasksConditionalGet:
+    list_task_url = reverse("task:task-list")
+
+    def detail_url(self, task):
+        return reverse('task:task-detail', args=[task.id])
+
+    def authenticate(self, client, user):
+        client.force_authenticate(user)
+
+    def test_unchanged_list_is_not_modified(self, client, task_factory, django_assert_num_queries):
+        task_factory.create_batch(3, user=client.user_instance)
+        etag = client.get(self.list_task_url)["ETag"]
+
+        # Answered from the list cache without touching the database.
+        with django_assert_num_queries(0):
+            response = client.get(self.list_task_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert response.content == b""
+
+    def test_list_etag_changes_on_create_update_and_delete(self, client, task_factory):
+        tasks = task_factory.create_batch(2, user=client.user_instance)
+        etags = [client.get(self.list_task_url)["ETag"]]
+
+        client.post(self.list_task_url, {"title": "New"})
+        etags.append(client.get(self.list_task_url)["ETag"])
+
+        client.patch(self.detail_url(tasks[0]), {"title": "Edited"})
+        etags.append(client.get(self.list_task_url)["ETag"])
+
+        client.delete(self.detail_url(tasks[1]))
+        etags.append(client.get(self.list_task_url)["ETag"])
+
+        assert len(set(etags)) == 4
+        response = client.get(self.list_task_url, HTTP_IF_NONE_MATCH=etags[0])
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_list_etag_depends_on_query(self, client, task_factory):
+        task_factory.create_batch(3, user=client.user_instance)
+
+        first = client.get(self.list_task_url, {"page_size": 1})["ETag"]
+        second = client.get(self.list_task_url, {"page_size": 2})["ETag"]
+
+        assert first != second
+
+    @pytest.mark.parametrize("url", ["list", "detail"])
+    def test_etag_depends_on_encoding(self, client, task_factory, url):
+        task = task_factory(user=client.user_instance)
+        url = self.list_task_url if url == "list" else self.detail_url(task)
+        json_response = client.get(url)
+
+        # Twice, so the list is also served from its cache.
+        for _ in range(2):
+            response = client.get(
+                url, HTTP_ACCEPT="application/msgpack", HTTP_IF_NONE_MATCH=json_response["ETag"])
+
+            assert response.status_code == status.HTTP_200_OK
+            assert response["Content-Type"] == "application/msgpack"
+            assert response["ETag"] != json_response["ETag"]
+        assert "Accept" in response["Vary"]
+        assert "Accept" in json_response["Vary"]
+
+    def test_list_etag_is_per_user(self, api_client, authenticate_user, user_factory):
+        user = authenticate_user()
+        api_client_with_credentials(user['token'], api_client)
+        etag = api_client.get(self.list_task_url)["ETag"]
+
+        other = user_factory(is_active=True)
+        self.authenticate(api_client, other)
+
+        assert api_client.get(self.list_task_url)["ETag"] != etag
+
+    def test_unchanged_task_is_not_modified(self, client, task_factory, django_assert_num_queries):
+        task = task_factory(user=client.user_instance)
+        response = client.get(self.detail_url(task))
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        with django_assert_num_queries(1):
+            by_etag = client.get(self.detail_url(task), HTTP_IF_NONE_MATCH=etag)
+        by_date = client.get(self.detail_url(task), HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert by_etag.status_code == status.HTTP_304_NOT_MODIFIED
+        assert by_date.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_edited_task_is_sent_again(self, client, task_factory):
+        task = task_factory(user=client.user_instance)
+        etag = client.get(self.detail_url(task))["ETag"]
+
+        client.patch(self.detail_url(task), {"title": "Edited"})
+        response = client.get(self.detail_url(task), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['title'] == "Edited"
+
+    def test_non_owner_gets_403_not_304(self, client, task_factory):
+        task = task_factory()
+
+        response = client.get(self.detail_url(task), HTTP_IF_NONE_MATCH="*")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_admin_list_is_not_validated(self, api_client, authenticate_user):
+        api_client_with_credentials(authenticate_user(is_admin=True)['token'], api_client)
+
+        response = api_client.get(self.list_task_url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not response.has_header("ETag")
+
+
+@pytest.mark.urls("tasks.tests.async_urls")
+class TestAsyncConditionalGet(TestTasksConditionalGet):
+    """ The same validators, through the async list and detail views. """
+
+    def authenticate(self, client, user):
+        # The async views authenticate bearer tokens only.
+        api_client_with_credentials(str(AccessToken.for_user(user)), client)
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import tracemalloc
+
+import pytest
+from rest_framework import status
+from django.urls import reverse
+
+from ..models import Task
+from ..serializers import TaskSerializer
+from ..views import TaskViewSets
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTaskExport:
+    export_url = reverse("task:task-export")
+
+    def export(self, client, **params):
+        response = client.get(self.export_url, params)
+        assert response.status_code == status.HTTP_200_OK
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_ndjson_matches_task_serializer(self, client, task_factory, monkeypatch):
+        monkeypatch.setattr(TaskViewSets, "export_chunk_size", 2)
+        tasks = task_factory.create_batch(5, user=client.user_instance)
+        tasks[0].description = None
+        tasks[0].save()
+        task_factory()
+
+        response, body = self.export(client)
+
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert "tasks.ndjson" in response["Content-Disposition"]
+        rows = [json.loads(line) for line in body.splitlines()]
+        expected = TaskSerializer(
+            Task.objects.filter(user=client.user_instance).order_by("created_at", "id"), many=True).data
+        assert rows == json.loads(json.dumps(expected))
+
+    def test_csv_has_header_and_every_row(self, client, task_factory, monkeypatch):
+        monkeypatch.setattr(TaskViewSets, "export_chunk_size", 2)
+        tasks = task_factory.create_batch(3, user=client.user_instance)
+
+        response, body = self.export(client, type="csv")
+
+        assert response["Content-Type"] == "text/csv"
+        rows = list(csv.DictReader(io.StringIO(body)))
+        assert list(rows[0]) == TaskSerializer.Meta.fields
+        assert sorted(row['id'] for row in rows) == sorted(str(task.id) for task in tasks)
+
+    def test_export_can_be_searched(self, client, task_factory):
+        task_factory(user=client.user_instance, title="Groceries", description="")
+        task_factory(user=client.user_instance, title="Rent", description="")
+
+        _, body = self.export(client, search="groceries")
+
+        assert [json.loads(line)['title'] for line in body.splitlines()] == ["Groceries"]
+
+    def test_unknown_type_is_rejected(self, client):
+        response = client.get(self.export_url, {"type": "xml"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_memory_stays_flat_as_rows_grow(self, client, monkeypatch):
+        """
+        Peak memory while streaming 10x the rows stays within the same
+        bound; `benchmarks.bench_export` runs the same check on 1M tasks.
+        """
+        monkeypatch.setattr(TaskViewSets, "export_chunk_size", 500)
+
+        def peak_while_streaming(count):
+            Task.objects.all().delete()
+            Task.objects.bulk_create(
+                Task(user=client.user_instance, title=f"Task {i}", description="x" * 100)
+                for i in range(count))
+            response = client.get(self.export_url)
+            tracemalloc.start()
+            try:
+                lines = sum(chunk.count(b"\n") for chunk in response.streaming_content)
+                return lines, tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        small_lines, small_peak = peak_while_streaming(2000)
+        large_lines, large_peak = peak_while_streaming(20000)
+
+        assert (small_lines, large_lines) == (2000, 20000)
+        assert large_peak < small_peak * 1.5
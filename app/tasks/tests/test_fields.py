@@ -0,0 +1,105 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .conftest import api_client_with_credentials
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestSparseFieldsets:
+    list_task_url = reverse("task:task-list")
+
+    def detail_url(self, task):
+        return reverse("task:task-detail", kwargs={"id": task.id})
+
+    def test_list_returns_requested_fields_only(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(3, user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        response = api_client.get(self.list_task_url, {"fields": "title,id"})
+
+        assert response.status_code == 200
+        assert [list(task) for task in response.json()['results']] == [["id", "title"]] * 3
+
+    def test_list_does_not_select_other_columns(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(2, user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(self.list_task_url, {"fields": "title"})
+
+        page_query = queries.captured_queries[-1]['sql']
+        assert '"title"' in page_query
+        assert '"description"' not in page_query
+
+    def test_list_cursor_pages_keep_fields(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(5, user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        first = api_client.get(self.list_task_url, {"fields": "title", "page_size": 3}).json()
+        second = api_client.get(first['links']['next']).json()
+
+        assert len(first['results'] + second['results']) == 5
+        assert all(list(task) == ["title"] for task in second['results'])
+
+    def test_unknown_field_is_rejected(self, api_client, authenticate_user):
+        user = authenticate_user()
+        api_client_with_credentials(user['token'], api_client)
+
+        response = api_client.get(self.list_task_url, {"fields": "title,password"})
+
+        assert response.status_code == 400
+        assert "password" in response.json()['fields'][0]
+
+    def test_retrieve_returns_requested_fields_only(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task = task_factory(user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(self.detail_url(task), {"fields": "is_completed"})
+
+        assert response.json() == {"is_completed": task.is_completed}
+        assert '"description"' not in queries.captured_queries[-1]['sql']
+
+    def test_retrieve_etag_depends_on_fields(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task = task_factory(user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        full = api_client.get(self.detail_url(task))["ETag"]
+        sparse = api_client.get(self.detail_url(task), {"fields": "title"})["ETag"]
+
+        assert full != sparse
+
+    def test_retrieve_still_checks_owner(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task = task_factory()
+        api_client_with_credentials(user['token'], api_client)
+
+        response = api_client.get(self.detail_url(task), {"fields": "title"})
+
+        assert response.status_code == 403
+
+    def test_fields_are_ignored_when_writing(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task = task_factory(user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        response = api_client.patch(
+            self.detail_url(task) + "?fields=title", {"is_completed": True}, format="json")
+
+        assert response.status_code == 200
+        assert response.json()['is_completed'] is True
+        assert "description" in response.json()
+
+
+@pytest.mark.urls("tasks.tests.async_urls")
+class TestAsyncSparseFieldsets(TestSparseFieldsets):
+    """ The async list and detail views select only the requested columns too. """
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+from rest_framework import status
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from ..models import Task
+from ..views import TaskViewSets
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTaskImport:
+    import_url = reverse("task:task-import")
+    export_url = reverse("task:task-export")
+
+    def upload(self, client, name, content, **data):
+        data["file"] = SimpleUploadedFile(name, content.encode())
+        return client.post(self.import_url, data, format="multipart")
+
+    def test_ndjson_import_creates_tasks_for_user(self, client):
+        lines = [
+            json.dumps({"title": "First", "description": "one"}),
+            "",
+            json.dumps({"title": "Second", "is_completed": True}),
+        ]
+
+        response = self.upload(client, "tasks.ndjson", "\n".join(lines))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"created": 2, "failed": 0, "errors": []}
+        tasks = Task.objects.filter(user=client.user_instance)
+        assert sorted(tasks.values_list("title", "is_completed")) == [("First", False), ("Second", True)]
+
+    def test_invalid_rows_are_reported_and_skipped(self, client):
+        lines = [
+            json.dumps({"title": "Good"}),
+            json.dumps({"description": "no title"}),
+            "not json",
+            json.dumps({"title": "x" * 300}),
+        ]
+
+        body = self.upload(client, "tasks.ndjson", "\n".join(lines)).json()
+
+        assert body['created'] == 1
+        assert body['failed'] == 3
+        assert [error['line'] for error in body['errors']] == [2, 3, 4]
+        assert "title" in body['errors'][0]['errors']
+        assert Task.objects.filter(user=client.user_instance).count() == 1
+
+    def test_csv_import_writes_in_batches(self, client, monkeypatch, django_assert_max_num_queries):
+        monkeypatch.setattr(TaskViewSets, "import_batch_size", 10)
+        rows = "\n".join(f"Task {i},desc,{'true' if i % 2 else 'false'}" for i in range(25))
+
+        with django_assert_max_num_queries(16):
+            response = self.upload(client, "tasks.csv", "title,description,is_completed\n" + rows)
+
+        assert response.json()['created'] == 25
+        assert Task.objects.filter(user=client.user_instance, is_completed=True).count() == 12
+
+    def test_export_round_trips(self, client, task_factory):
+        task_factory.create_batch(3, user=client.user_instance)
+        exported = b"".join(client.get(self.export_url, {"type": "csv"}).streaming_content).decode()
+
+        response = self.upload(client, "backup.csv", exported)
+
+        assert response.json()['created'] == 3
+        assert Task.objects.filter(user=client.user_instance).count() == 6
+
+    def test_type_overrides_extension(self, client):
+        response = self.upload(client, "tasks.txt", "title\nFrom text\n", type="csv")
+
+        assert response.json()['created'] == 1
+
+    def test_unknown_type_is_rejected(self, client):
+        response = self.upload(client, "tasks.txt", "title\nx\n")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "type" in response.json()
+
+    def test_non_utf8_file_is_rejected(self, client):
+        data = {"file": SimpleUploadedFile("tasks.csv", "title\ncafé\n".encode("latin-1"))}
+
+        response = client.post(self.import_url, data, format="multipart")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Task.objects.filter(user=client.user_instance).count() == 0
+
+    def test_late_encoding_error_writes_nothing(self, client, monkeypatch):
+        monkeypatch.setattr(TaskViewSets, "import_batch_size", 2)
+        content = "title\n" + "".join(f"Task {i}\n" for i in range(5))
+        data = {"file": SimpleUploadedFile("tasks.csv", content.encode() + "café\n".encode("latin-1"))}
+
+        response = client.post(self.import_url, data, format="multipart")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Task.objects.filter(user=client.user_instance).exists()
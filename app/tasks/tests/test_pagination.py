@@ -0,0 +1,81 @@
+import pytest
+from rest_framework import status
+from django.urls import reverse
+
+from .conftest import api_client_with_credentials
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTasksKeysetPagination:
+    list_task_url = reverse("task:task-list")
+
+    def test_cursor_pages_cover_every_task_once(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(7, user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        seen = []
+        url = self.list_task_url + "?page_size=3"
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            body = response.json()
+            seen.extend(task['id'] for task in body['results'])
+            url = body['links']['next']
+
+        assert len(seen) == 7
+        assert len(set(seen)) == 7
+
+    def test_results_are_ordered_newest_first(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(4, user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        results = api_client.get(self.list_task_url).json()['results']
+        created = [task['created_at'] for task in results]
+
+        assert created == sorted(created, reverse=True)
+
+    def test_previous_link_returns_to_the_previous_page(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(5, user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        first = api_client.get(self.list_task_url + "?page_size=2").json()
+        second = api_client.get(first['links']['next']).json()
+        back = api_client.get(second['links']['previous']).json()
+
+        assert first['links']['previous'] is None
+        assert [t['id'] for t in back['results']] == [t['id'] for t in first['results']]
+
+    def test_total_is_only_counted_on_request(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(3, user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        plain = api_client.get(self.list_task_url).json()
+        exact = api_client.get(self.list_task_url + "?total=exact&page_size=2").json()
+
+        assert plain['total'] is None
+        assert exact['total'] == 3
+        assert exact['total_pages'] == 2
+
+    def test_invalid_cursor_is_rejected(self, api_client, authenticate_user):
+        api_client_with_credentials(authenticate_user()['token'], api_client)
+
+        response = api_client.get(self.list_task_url + "?cursor=not-a-cursor")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_page_number_requests_keep_offset_pagination(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(3, user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        body = api_client.get(self.list_task_url + "?page=1").json()
+
+        assert body['total'] == 3
+        assert body['current_page'] == 1
+        assert len(body['results']) == 3
@@ -0,0 +1,168 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTasksQueryBudget:
+    """
+    Exact number of SQL statements per tasks endpoint once the
+    authenticated user is cached. Savepoints count: tests run in a transaction.
+    Lists include the aggregate query computing their ETag. Queryset updates
+    and deletes first read the owners whose cached task lists they drop, and
+    deletes record tombstones for delta sync. Writes that change a user's
+    task counts lock the rows they change and update `TaskStats`; the tests
+    give the user a counters row first, as after their first task.
+    """
+    list_create_task_url = reverse("task:task-list")
+    bulk_url = reverse("task:task-bulk")
+
+    @pytest.fixture
+    def client(self, client):
+        def _client(is_admin=False):
+            if is_admin:
+                client.user_instance.is_admin = True
+                client.user_instance.save()
+            # Warm the authentication cache.
+            client.get(self.list_create_task_url)
+            return client
+        return _client
+
+    def detail_url(self, task):
+        return reverse('task:task-detail', args=[task.id])
+
+    def test_list(self, client, task_factory, django_assert_num_queries):
+        api_client = client()
+        task_factory.create_batch(5, user=api_client.user_instance)
+
+        with django_assert_num_queries(2):
+            response = api_client.get(self.list_create_task_url)
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_list_with_total(self, client, django_assert_num_queries):
+        api_client = client()
+
+        with django_assert_num_queries(3):
+            response = api_client.get(self.list_create_task_url, {"total": "exact"})
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_list_page_number(self, client, task_factory, django_assert_num_queries):
+        api_client = client()
+        task_factory.create_batch(5, user=api_client.user_instance)
+
+        with django_assert_num_queries(3):
+            response = api_client.get(self.list_create_task_url, {"page": 1})
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_search(self, client, task_factory, django_assert_num_queries):
+        api_client = client()
+        task_factory.create_batch(5, user=api_client.user_instance)
+
+        with django_assert_num_queries(2):
+            response = api_client.get(self.list_create_task_url, {"search": "task"})
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_admin_list(self, client, task_factory, django_assert_num_queries):
+        api_client = client(is_admin=True)
+        task_factory.create_batch(5)
+
+        with django_assert_num_queries(1):
+            response = api_client.get(self.list_create_task_url)
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_create(self, client, task_factory, django_assert_num_queries):
+        api_client = client()
+        task_factory(user=api_client.user_instance)
+
+        with django_assert_num_queries(2):
+            response = api_client.post(self.list_create_task_url, {"title": "Task"})
+
+        assert response.status_code == status.HTTP_201_CREATED, response.content
+
+    def test_retrieve(self, client, task_factory, django_assert_num_queries):
+        api_client = client()
+        task = task_factory(user=api_client.user_instance)
+
+        with django_assert_num_queries(1):
+            response = api_client.get(self.detail_url(task))
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_retrieve_forbidden(self, client, task_factory, django_assert_num_queries):
+        api_client = client()
+        task = task_factory()
+
+        with django_assert_num_queries(1):
+            response = api_client.get(self.detail_url(task))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN, response.content
+
+    def test_admin_retrieve(self, client, task_factory, django_assert_num_queries):
+        api_client = client(is_admin=True)
+        task = task_factory()
+
+        with django_assert_num_queries(1):
+            response = api_client.get(self.detail_url(task))
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_update(self, client, task_factory, django_assert_num_queries):
+        api_client = client()
+        task = task_factory(user=api_client.user_instance)
+
+        with django_assert_num_queries(2):
+            response = api_client.patch(self.detail_url(task), {"title": "Updated"})
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_complete(self, client, task_factory, django_assert_num_queries):
+        api_client = client()
+        task = task_factory(user=api_client.user_instance, is_completed=False)
+
+        with django_assert_num_queries(4):
+            response = api_client.patch(self.detail_url(task), {"is_completed": True})
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_delete(self, client, task_factory, django_assert_num_queries):
+        api_client = client()
+        task = task_factory(user=api_client.user_instance)
+
+        with django_assert_num_queries(5):
+            response = api_client.delete(self.detail_url(task))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT, response.content
+
+    def test_bulk_create(self, client, task_factory, django_assert_num_queries):
+        api_client = client()
+        task_factory(user=api_client.user_instance)
+
+        with django_assert_num_queries(4):
+            response = api_client.post(self.bulk_url, [{"title": f"Task {i}"} for i in range(100)])
+
+        assert response.status_code == status.HTTP_201_CREATED, response.content
+
+    def test_bulk_update(self, client, task_factory, django_assert_num_queries):
+        api_client = client()
+        tasks = task_factory.create_batch(100, user=api_client.user_instance)
+
+        with django_assert_num_queries(7):
+            response = api_client.patch(self.bulk_url, [{"id": str(t.id), "is_completed": False} for t in tasks])
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_bulk_delete(self, client, task_factory, django_assert_num_queries):
+        api_client = client()
+        tasks = task_factory.create_batch(100, user=api_client.user_instance)
+
+        with django_assert_num_queries(7):
+            response = api_client.delete(self.bulk_url, {"ids": [str(t.id) for t in tasks]})
+
+        assert response.status_code == status.HTTP_200_OK, response.content
@@ -0,0 +1,138 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .conftest import api_client_with_credentials
+from ..models import Task
+
+
+pytestmark = pytest.mark.django_db
+
+
+def explain(sql: str) -> str:
+    """ Return the backend query plan for a raw SELECT as plain text. """
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+        cursor.execute("EXPLAIN " + sql)
+        columns = [col[0] for col in cursor.description]
+        return "\n".join(str(dict(zip(columns, row))) for row in cursor.fetchall())
+
+
+def assert_uses_index(sql: str, allow_sort: bool = False) -> None:
+    """
+    Fail when the plan for `sql` full-scans the task table, or sorts it
+    without an index unless `allow_sort` (e.g. ordering by search relevance).
+    """
+    plan = explain(sql)
+    table = Task._meta.db_table
+
+    if connection.vendor == "sqlite":
+        for line in plan.splitlines():
+            if line.startswith(f"SCAN {table}") and "INDEX" not in line:
+                pytest.fail(f"Full table scan:\n{sql}\n{plan}")
+        if not allow_sort:
+            assert "TEMP B-TREE" not in plan, f"Sort without index:\n{sql}\n{plan}"
+    else:
+        assert "'type': 'ALL'" not in plan, f"Full table scan:\n{sql}\n{plan}"
+        if not allow_sort:
+            assert "filesort" not in plan, f"Sort without index:\n{sql}\n{plan}"
+
+
+def task_selects(queries) -> list:
+    table = Task._meta.db_table
+    return [
+        query["sql"] for query in queries
+        if query["sql"].startswith("SELECT") and f"FROM \"{table}\"" in query["sql"].replace("`", "\"")
+    ]
+
+
+class TestTaskQueryPlans:
+    list_task_url = reverse("task:task-list")
+
+    @pytest.fixture
+    def seeded_client(self, task_factory, user_factory, api_client, authenticate_user):
+        def _client(is_admin=False):
+            user = authenticate_user(is_admin=is_admin)
+            task_factory.create_batch(30, user=user['user_instance'])
+            for owner in user_factory.create_batch(3):
+                task_factory.create_batch(10, user=owner)
+            with connection.cursor() as cursor:
+                if connection.vendor == "sqlite":
+                    cursor.execute("ANALYZE")
+                else:
+                    cursor.execute(f"ANALYZE TABLE {Task._meta.db_table}")
+            api_client_with_credentials(user['token'], api_client)
+            return api_client
+        return _client
+
+    @pytest.mark.parametrize("query", [
+        "",
+        "?page_size=5",
+        "?total=exact",
+        "?page=2&page_size=5",
+    ])
+    def test_owner_list_queries_use_an_index(self, seeded_client, query):
+        client = seeded_client()
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(self.list_task_url + query)
+        assert response.status_code == 200
+
+        selects = task_selects(ctx.captured_queries)
+        assert selects
+        for sql in selects:
+            assert_uses_index(sql)
+
+    @pytest.mark.parametrize("query", ["?search=a", "?search=lorem ipsum"])
+    def test_search_queries_use_an_index(self, seeded_client, query):
+        client = seeded_client()
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(self.list_task_url + query)
+        assert response.status_code == 200
+
+        selects = task_selects(ctx.captured_queries)
+        assert selects
+        for sql in selects:
+            assert_uses_index(sql, allow_sort=True)
+
+    def test_following_cursor_page_uses_an_index(self, seeded_client):
+        client = seeded_client()
+        next_url = client.get(self.list_task_url + "?page_size=5").json()['links']['next']
+
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(next_url)
+
+        for sql in task_selects(ctx.captured_queries):
+            assert_uses_index(sql)
+
+    def test_admin_list_uses_an_index(self, seeded_client):
+        client = seeded_client(is_admin=True)
+
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(self.list_task_url)
+
+        for sql in task_selects(ctx.captured_queries):
+            assert_uses_index(sql)
+
+    def test_completion_filter_uses_an_index(self, seeded_client, active_user):
+        seeded_client()
+        queryset = Task.objects.filter(user=active_user, is_completed=False)
+
+        with CaptureQueriesContext(connection) as ctx:
+            list(queryset[:20])
+
+        assert_uses_index(ctx.captured_queries[0]["sql"])
+
+    def test_changes_since_uses_an_index(self, seeded_client):
+        seeded_client()
+        latest = Task.objects.order_by("-updated_at").values_list("updated_at", flat=True)[5]
+        queryset = Task.objects.filter(updated_at__gt=latest).order_by("updated_at")
+
+        with CaptureQueriesContext(connection) as ctx:
+            list(queryset[:20])
+
+        assert_uses_index(ctx.captured_queries[0]["sql"])
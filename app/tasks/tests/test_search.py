@@ -0,0 +1,127 @@
+import pytest
+from rest_framework import status
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import reverse
+
+from .conftest import api_client_with_credentials
+from ..models import Task
+from ..search import MySQLFullTextSearchBackend, SQLiteFTS5SearchBackend, get_search_backend
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTaskSearch:
+    list_task_url = reverse("task:task-list")
+
+    def search(self, api_client, term, **params):
+        query = {"search": term, **params}
+        response = api_client.get(self.list_task_url, query)
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+
+    def test_search_matches_title_and_description(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        owner = user['user_instance']
+        task_factory(user=owner, title="Groceries", description="milk and eggs")
+        task_factory(user=owner, title="Pay rent", description="before friday")
+        task_factory(user=owner, title="Call mom", description="about groceries")
+        api_client_with_credentials(user['token'], api_client)
+
+        titles = {task['title'] for task in self.search(api_client, "groceries")['results']}
+
+        assert titles == {"Groceries", "Call mom"}
+
+    def test_search_matches_word_prefixes(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory(user=user['user_instance'], title="Dentist appointment", description="")
+        api_client_with_credentials(user['token'], api_client)
+
+        results = self.search(api_client, "appoi")['results']
+
+        assert [task['title'] for task in results] == ["Dentist appointment"]
+
+    def test_every_term_must_match(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        owner = user['user_instance']
+        task_factory(user=owner, title="Buy paint", description="blue for the kitchen")
+        task_factory(user=owner, title="Buy bread", description="")
+        api_client_with_credentials(user['token'], api_client)
+
+        results = self.search(api_client, "buy kitchen")['results']
+
+        assert [task['title'] for task in results] == ["Buy paint"]
+
+    def test_more_relevant_tasks_rank_first(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        owner = user['user_instance']
+        task_factory(user=owner, title="Report", description="send the quarterly report")
+        task_factory(user=owner, title="Holiday", description="ask about the report")
+        api_client_with_credentials(user['token'], api_client)
+
+        results = self.search(api_client, "report")['results']
+
+        assert [task['title'] for task in results] == ["Report", "Holiday"]
+
+    def test_search_only_returns_own_tasks(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory(user=user['user_instance'], title="Laundry")
+        task_factory(title="Laundry")
+        api_client_with_credentials(user['token'], api_client)
+
+        assert len(self.search(api_client, "laundry")['results']) == 1
+
+    def test_index_follows_updates_and_deletes(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task = task_factory(user=user['user_instance'], title="Old title", description="")
+        api_client_with_credentials(user['token'], api_client)
+
+        task.title = "Renamed"
+        task.save()
+        assert self.search(api_client, "old")['results'] == []
+        assert len(self.search(api_client, "renamed")['results']) == 1
+
+        Task.objects.filter(id=task.id).delete()
+        assert self.search(api_client, "renamed")['results'] == []
+
+    def test_search_syntax_is_matched_literally(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory(user=user['user_instance'], title="Fix bug", description="")
+        api_client_with_credentials(user['token'], api_client)
+
+        assert self.search(api_client, 'bug" OR "x')['results'] == []
+
+    def test_search_results_page_with_cursors(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(5, user=user['user_instance'], title="Errand", description="")
+        api_client_with_credentials(user['token'], api_client)
+
+        first = self.search(api_client, "errand", page_size=3)
+        second = api_client.get(first['links']['next']).json()
+
+        ids = [task['id'] for task in first['results'] + second['results']]
+        assert len(set(ids)) == 5
+
+
+class TestSearchBackends:
+
+    def test_backend_follows_the_database_vendor(self, settings):
+        settings.TASK_SEARCH_BACKEND = None
+
+        assert isinstance(get_search_backend(DEFAULT_DB_ALIAS), SQLiteFTS5SearchBackend)
+
+    def test_index_can_be_dropped_and_rebuilt(self, task_factory):
+        task = task_factory(title="Reindexed", description="")
+        backend = SQLiteFTS5SearchBackend()
+
+        backend.teardown()
+        backend.setup()
+
+        assert list(backend.search(Task.objects.all(), ["reindexed"])) == [task]
+
+    def test_mysql_matches_short_terms_with_like(self):
+        queryset = MySQLFullTextSearchBackend().search(Task.objects.all(), ["to", "groceries"])
+
+        sql = str(queryset.query)
+        assert "+groceries*" in sql
+        assert "%to%" in sql
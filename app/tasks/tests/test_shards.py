@@ -0,0 +1,212 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jobs.worker import Worker
+
+from ..models import ArchivedTask, Task, TaskStats, TaskTombstone
+from ..shards import ShardRouter, shard_for_user
+
+SHARD = "shard_test"
+
+
+@pytest.fixture
+def shard(settings, tmp_path):
+    """ A second SQLite database holding only the tasks app, as a shard does. """
+    connections.settings[SHARD] = connections.configure_settings({
+        DEFAULT_DB_ALIAS: {"ENGINE": "django.db.backends.sqlite3", "NAME": str(tmp_path / "shard.sqlite3")},
+    })[DEFAULT_DB_ALIAS]
+    with connections[SHARD].schema_editor() as editor:
+        for model in apps.get_app_config("tasks").get_models():
+            editor.create_model(model)
+    settings.TASK_SHARDS = [DEFAULT_DB_ALIAS, SHARD]
+    yield SHARD
+    connections[SHARD].close()
+    del connections[SHARD]
+    del connections.settings[SHARD]
+
+
+@pytest.fixture
+def user_on(user_factory):
+    """ Make an active user whose tasks hash to the given shard. """
+    def _user_on(alias, **kwargs):
+        while True:
+            user = user_factory(is_active=True, **kwargs)
+            if shard_for_user(user.id) == alias:
+                return user
+    return _user_on
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+class TestShardRouter:
+    router = ShardRouter()
+
+    def test_single_shard_leaves_routing_alone(self, settings):
+        settings.TASK_SHARDS = [DEFAULT_DB_ALIAS]
+
+        assert shard_for_user("user-id") == DEFAULT_DB_ALIAS
+        assert self.router.db_for_read(Task, user_id="user-id") is None
+
+    def test_users_spread_over_shards(self, settings):
+        settings.TASK_SHARDS = [DEFAULT_DB_ALIAS, SHARD]
+        placed = {shard_for_user(f"user-{i}") for i in range(50)}
+
+        assert placed == {DEFAULT_DB_ALIAS, SHARD}
+        assert shard_for_user("user-1") == shard_for_user("user-1")
+
+    def test_only_hinted_task_queries_are_routed(self, settings):
+        settings.TASK_SHARDS = [DEFAULT_DB_ALIAS, SHARD]
+        user_id = next(f"user-{i}" for i in range(50) if shard_for_user(f"user-{i}") == SHARD)
+
+        assert self.router.db_for_read(Task, user_id=user_id) == SHARD
+        assert self.router.db_for_write(TaskStats, instance=Task(user_id=user_id)) == SHARD
+        assert self.router.db_for_read(Task) is None
+        assert self.router.db_for_read(apps.get_model("user", "User"), user_id=user_id) is None
+
+    def test_shards_hold_only_tasks(self, settings):
+        settings.TASK_SHARDS = [DEFAULT_DB_ALIAS, SHARD]
+
+        assert self.router.allow_migrate(SHARD, "tasks")
+        assert not self.router.allow_migrate(SHARD, "user")
+        assert self.router.allow_migrate(DEFAULT_DB_ALIAS, "user") is None
+
+
+@pytest.mark.django_db(transaction=True)
+class TestShardedTasks:
+    list_task_url = reverse("task:task-list")
+
+    def detail_url(self, task):
+        return reverse("task:task-detail", args=[task.id])
+
+    def test_user_tasks_live_on_their_shard(self, shard, user_on):
+        user = user_on(shard)
+        client = client_for(user)
+
+        response = client.post(self.list_task_url, {"title": "Sharded"})
+        task = Task.objects.using(shard).get(id=response.json()["id"])
+
+        assert not Task.objects.filter(id=task.id).exists()
+        assert [row["title"] for row in client.get(self.list_task_url).json()["results"]] == ["Sharded"]
+        assert client.get(reverse("task:task-stats")).json()["total"] == 1
+
+        assert client.patch(self.detail_url(task), {"is_completed": True}).status_code == 200
+        assert TaskStats.objects.using(shard).get(user=user).completed == 1
+        assert client.delete(self.detail_url(task)).status_code == 204
+        assert TaskTombstone.objects.using(shard).filter(task_id=task.id).exists()
+
+    def test_other_users_are_forbidden_across_shards(self, shard, user_on, task_factory):
+        task = task_factory(user=user_on(shard))
+        other = client_for(user_on(DEFAULT_DB_ALIAS))
+
+        assert other.get(self.detail_url(task)).status_code == 403
+        assert other.get(reverse("task:task-detail", args=["9f0e1d2c-0000-4000-8000-000000000000"])).status_code == 404
+
+    def test_bulk_writes_use_the_shard(self, shard, user_on):
+        client = client_for(user_on(shard))
+        url = reverse("task:task-bulk")
+
+        created = client.post(url, [{"title": "a"}, {"title": "b"}], format="json").json()["results"]
+        ids = [item["id"] for item in created]
+        client.patch(url, [{"id": ids[0], "title": "A"}], format="json")
+        client.delete(url, {"ids": [ids[1]]}, format="json")
+
+        assert list(Task.objects.using(shard).values_list("title", flat=True)) == ["A"]
+
+    def test_admin_list_merges_shards(self, shard, user_on, task_factory):
+        admin = client_for(user_on(DEFAULT_DB_ALIAS, is_admin=True))
+        users = [user_on(DEFAULT_DB_ALIAS), user_on(shard)]
+        for number in range(6):
+            task_factory(user=users[number % 2], title=str(number))
+        expected = [str(number) for number in reversed(range(6))]
+
+        titles = []
+        url, params = self.list_task_url, {"page_size": 4, "total": "exact"}
+        while url:
+            body = admin.get(url, params).json()
+            assert body["total"] == 6
+            titles += [row["title"] for row in body["results"]]
+            url, params = body["links"]["next"], None
+
+        assert titles == expected
+        legacy = admin.get(self.list_task_url, {"page": 2, "page_size": 4}).json()
+        assert [row["title"] for row in legacy["results"]] == expected[4:]
+        export = admin.get(reverse("task:task-export"))
+        lines = b"".join(export.streaming_content).decode().splitlines()
+        assert [json.loads(line)["title"] for line in lines] == expected[::-1]
+
+    def test_admins_cannot_sync_across_shards(self, shard, user_on):
+        admin = client_for(user_on(DEFAULT_DB_ALIAS, is_admin=True))
+
+        assert admin.get(reverse("task:task-changes")).status_code == 400
+
+    def test_deleting_a_user_deletes_their_sharded_tasks(self, shard, user_on, task_factory):
+        user = user_on(shard)
+        task_factory(user=user)
+
+        user.delete()
+        Worker().run_pending()
+
+        assert not Task.objects.using(shard).exists()
+        assert not TaskStats.objects.using(shard).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReshardTasks:
+
+    def test_moves_users_to_their_new_shard(self, shard, settings, user_on, task_factory):
+        user, staying = user_on(shard), user_on(DEFAULT_DB_ALIAS)
+        settings.TASK_SHARDS = [DEFAULT_DB_ALIAS]
+        tasks = [task_factory(user=user, is_completed=False) for _ in range(3)]
+        task_factory(user=staying)
+        tasks.pop().delete()
+        Task.objects.filter(id=task_factory(user=user).id).archive()
+        settings.TASK_SHARDS = [DEFAULT_DB_ALIAS, shard]
+
+        call_command("reshard_tasks", "--batch-size", "1")
+
+        moved = Task.objects.using(shard).order_by("created_at")
+        assert [(task.id, task.created_at) for task in moved] == [(task.id, task.created_at) for task in tasks]
+        assert TaskStats.objects.using(shard).get(user=user).total == 2
+        assert TaskTombstone.objects.using(shard).filter(user=user).count() == 1
+        assert ArchivedTask.objects.using(shard).filter(user=user).count() == 1
+        assert list(Task.objects.values_list("user_id", flat=True)) == [staying.id]
+        assert not TaskStats.objects.filter(user=user).exists()
+
+    def test_tombstones_keep_their_deletion_times(self, shard, settings, user_on, task_factory, time_machine):
+        user = user_on(shard)
+        settings.TASK_SHARDS = [DEFAULT_DB_ALIAS]
+        for task in [task_factory(user=user) for _ in range(3)]:
+            time_machine.move_to(timezone.now() + timedelta(minutes=1))
+            task.delete()
+        deleted = dict(TaskTombstone.objects.values_list("task_id", "deleted_at"))
+        settings.TASK_SHARDS = [DEFAULT_DB_ALIAS, shard]
+        time_machine.move_to(timezone.now() + timedelta(days=1))
+
+        call_command("reshard_tasks", "--batch-size", "2")
+
+        assert dict(TaskTombstone.objects.using(shard).values_list("task_id", "deleted_at")) == deleted
+
+    def test_rerun_moves_nothing(self, shard, settings, user_on, task_factory, capsys):
+        user = user_on(shard)
+        settings.TASK_SHARDS = [DEFAULT_DB_ALIAS]
+        task_factory(user=user)
+        settings.TASK_SHARDS = [DEFAULT_DB_ALIAS, shard]
+        call_command("reshard_tasks")
+        capsys.readouterr()
+
+        call_command("reshard_tasks")
+
+        assert "Moved 0 tasks of 0 users." in capsys.readouterr().out
+        assert Task.objects.using(shard).count() == 1
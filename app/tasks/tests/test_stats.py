@@ -0,0 +1,169 @@
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+from .conftest import api_client_with_credentials
+from ..models import Task, TaskStats
+
+
+pytestmark = pytest.mark.django_db
+
+
+def counts(user):
+    return TaskStats.objects.for_user(user.id)
+
+
+def counted(user):
+    tasks = Task.objects.filter(user=user)
+    total, completed = tasks.count(), tasks.filter(is_completed=True).count()
+    return {"total": total, "completed": completed, "pending": total - completed}
+
+
+class TestTaskStatsCounters:
+
+    def test_create_complete_and_delete(self, task_factory, user_factory):
+        user = user_factory()
+        task = task_factory(user=user, is_completed=False)
+        task_factory(user=user, is_completed=True)
+        assert counts(user) == {"total": 2, "completed": 1, "pending": 1}
+
+        task.is_completed = True
+        task.save()
+        assert counts(user) == {"total": 2, "completed": 2, "pending": 0}
+
+        task.is_completed = False
+        task.save()
+        task.save()
+        assert counts(user) == {"total": 2, "completed": 1, "pending": 1}
+
+        task.delete()
+        assert counts(user) == {"total": 1, "completed": 1, "pending": 0}
+
+    def test_stale_instance_is_not_counted_twice(self, task_factory, user_factory):
+        user = user_factory()
+        task = task_factory(user=user, is_completed=False)
+        stale = Task.objects.get(id=task.id)
+
+        task.is_completed = True
+        task.save()
+        stale.is_completed = True
+        stale.save()
+        stale.delete()
+
+        assert counts(user) == counted(user)
+
+    def test_bulk_paths(self, task_factory, user_factory):
+        user, other = user_factory(), user_factory()
+        tasks = Task.objects.bulk_create(
+            [Task(user=user, title=str(i), is_completed=i % 2 == 0) for i in range(6)])
+        assert counts(user) == counted(user)
+
+        Task.objects.filter(user=user, is_completed=False).update(is_completed=True)
+        assert counts(user) == {"total": 6, "completed": 6, "pending": 0}
+
+        for task in tasks[:2]:
+            task.is_completed = False
+        Task.objects.bulk_update(tasks[:2], ["is_completed"])
+        assert counts(user) == counted(user)
+
+        Task.objects.filter(id__in=[task.id for task in tasks[:3]]).update(user=other)
+        assert counts(user) == counted(user)
+        assert counts(other) == counted(other)
+
+        Task.objects.filter(user=user).delete()
+        assert counts(user) == {"total": 0, "completed": 0, "pending": 0}
+        assert counts(other) == counted(other)
+
+    def test_updates_of_other_fields_skip_counters(self, task_factory, django_assert_num_queries):
+        task = task_factory()
+
+        # Only the owners' lookup for the list cache and the update itself.
+        with django_assert_num_queries(2):
+            Task.objects.filter(id=task.id).update(title="Renamed")
+
+    def test_api_edits_count_completions(self, client, task_factory):
+        task = task_factory(user=client.user_instance, is_completed=False)
+        detail_url = reverse("task:task-detail", args=[task.id])
+
+        client.patch(detail_url, {"title": "Renamed"})
+        assert counts(client.user_instance) == {"total": 1, "completed": 0, "pending": 1}
+        client.patch(detail_url, {"is_completed": True})
+        assert counts(client.user_instance) == {"total": 1, "completed": 1, "pending": 0}
+
+    def test_user_deletion_drops_counters(self, task_factory, user_factory):
+        user = user_factory()
+        task_factory(user=user)
+
+        user.delete()
+
+        assert not TaskStats.objects.exists()
+
+
+class TestStatsEndpoint:
+    stats_url = reverse("task:task-stats")
+
+    def test_own_stats(self, task_factory, api_client, authenticate_user, django_assert_num_queries):
+        user = authenticate_user()
+        task_factory.create_batch(3, user=user['user_instance'], is_completed=False)
+        task_factory(user=user['user_instance'], is_completed=True)
+        task_factory()
+        api_client_with_credentials(user['token'], api_client)
+        api_client.get(self.stats_url)
+
+        with django_assert_num_queries(1):
+            response = api_client.get(self.stats_url)
+
+        assert response.json() == {"total": 4, "completed": 1, "pending": 3}
+
+    def test_admin_reads_any_user(self, task_factory, user_factory, api_client):
+        admin = user_factory(is_active=True, is_admin=True)
+        owner = user_factory()
+        task_factory.create_batch(2, user=owner)
+        api_client.force_authenticate(admin)
+
+        response = api_client.get(self.stats_url, {"user": str(owner.id)})
+
+        assert response.json()["total"] == 2
+
+    def test_user_parameter_ignored_for_non_admins(self, task_factory, user_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(2, user=user_factory())
+        api_client_with_credentials(user['token'], api_client)
+
+        response = api_client.get(self.stats_url, {"user": "not-checked"})
+
+        assert response.json()["total"] == 0
+
+    def test_page_number_total_uses_counter(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(3, user=user['user_instance'])
+        TaskStats.objects.filter(user=user['user_instance']).update(total=42)
+        api_client_with_credentials(user['token'], api_client)
+
+        paged = api_client.get(reverse("task:task-list"), {"page": 1}).json()
+        exact = api_client.get(reverse("task:task-list"), {"total": "exact"}).json()
+        searched = api_client.get(
+            reverse("task:task-list"), {"page": 1, "search": "task"}).json()
+
+        assert paged["total"] == exact["total"] == 42
+        assert searched["total"] != 42
+
+
+class TestRebuildTaskStats:
+
+    def test_verify_and_rebuild(self, task_factory, user_factory):
+        user, untouched = user_factory(), user_factory()
+        task_factory.create_batch(2, user=user, is_completed=True)
+        task_factory(user=untouched)
+        TaskStats.objects.filter(user=user).update(total=7, completed=0)
+        TaskStats.objects.filter(user=untouched).delete()
+
+        with pytest.raises(CommandError):
+            call_command("rebuild_task_stats", "--verify", batch_size=1)
+        assert counts(user)["total"] == 7
+
+        call_command("rebuild_task_stats", batch_size=1)
+
+        assert counts(user) == counted(user)
+        assert counts(untouched) == counted(untouched)
+        call_command("rebuild_task_stats", "--verify")
@@ -0,0 +1,172 @@
+import json
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+
+import pytest
+from rest_framework import status
+from django.db import models
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Task, TaskTombstone
+from ..sync import INVALID_TOKEN_MESSAGE
+
+
+def encode(payload):
+    return urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+pytestmark = pytest.mark.django_db
+
+
+class SyncClient:
+    changes_url = reverse("task:task-changes")
+
+    def sync(self, client, since=None, **params):
+        if since:
+            params["since"] = since
+        response = client.get(self.changes_url, params)
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+
+
+class TestTaskChanges(SyncClient):
+
+    @pytest.fixture(autouse=True)
+    def no_window(self, settings):
+        # Only changes since the previous sync, see TestSyncWindow.
+        settings.TASK_SYNC_WINDOW = 0
+
+    def test_first_sync_returns_every_task(self, client, task_factory):
+        tasks = task_factory.create_batch(3, user=client.user_instance)
+        task_factory()
+
+        body = self.sync(client)
+
+        assert {task['id'] for task in body['results']} == {str(task.id) for task in tasks}
+        assert body['deleted'] == []
+        assert body['has_more'] is False
+
+    def test_sync_returns_only_changes_since_token(self, client, task_factory, django_assert_max_num_queries):
+        tasks = task_factory.create_batch(20, user=client.user_instance)
+        since = self.sync(client)['since']
+
+        tasks[3].title = "Edited"
+        tasks[3].save()
+        created = client.post(reverse("task:task-list"), {"title": "New"}).json()
+        client.delete(reverse("task:task-detail", args=[tasks[5].id]))
+
+        with django_assert_max_num_queries(3):
+            body = self.sync(client, since)
+
+        assert [task['id'] for task in body['results']] == [str(tasks[3].id), created['id']]
+        assert body['results'][0]['title'] == "Edited"
+        assert body['deleted'] == [str(tasks[5].id)]
+        assert body['has_more'] is False
+
+    def test_sync_without_changes_is_empty(self, client, task_factory):
+        task_factory.create_batch(3, user=client.user_instance)
+        since = self.sync(client)['since']
+
+        body = self.sync(client, since)
+
+        assert body['results'] == []
+        assert body['deleted'] == []
+
+    def test_sync_pages_through_batches(self, client, task_factory):
+        tasks = task_factory.create_batch(5, user=client.user_instance)
+        since = self.sync(client)['since']
+        for task in tasks:
+            task.save()
+
+        seen = []
+        has_more = True
+        while has_more:
+            body = self.sync(client, since, limit=2)
+            assert len(body['results']) <= 2
+            seen += [task['id'] for task in body['results']]
+            since, has_more = body['since'], body['has_more']
+
+        assert sorted(seen) == sorted(str(task.id) for task in tasks)
+
+    def test_bulk_and_orm_deletes_leave_tombstones(self, client, task_factory):
+        tasks = task_factory.create_batch(3, user=client.user_instance)
+        since = self.sync(client)['since']
+
+        client.delete(reverse("task:task-bulk"), {"ids": [str(tasks[0].id)]}, format="json")
+        Task.objects.filter(id=tasks[1].id).delete()
+
+        assert self.sync(client, since)['deleted'] == [str(tasks[0].id), str(tasks[1].id)]
+
+    def test_sync_only_reports_own_tasks(self, client, task_factory):
+        since = self.sync(client)['since']
+        other = task_factory(title="Theirs")
+        other_id = other.id
+        other.delete()
+        task_factory(title="Also theirs")
+
+        body = self.sync(client, since)
+
+        assert body['results'] == []
+        assert body['deleted'] == []
+        assert TaskTombstone.objects.filter(task_id=other_id).exists()
+
+    @pytest.mark.parametrize("since", [
+        "not-a-token",
+        encode({"u": "2024-01-01T00:00:00+00:00", "t": "garbage", "d": 0}),
+        encode({"u": "2024-01-01T00:00:00+00:00", "t": None, "d": 0}),
+        encode({"u": "2024-01-01T00:00:00+00:00", "t": 1, "d": 0}),
+        encode([]),
+    ])
+    def test_invalid_token_is_rejected(self, client, since):
+        response = client.get(self.changes_url, {"since": since})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {"since": [INVALID_TOKEN_MESSAGE]}
+
+
+class TestSyncWindow(SyncClient):
+    """
+    Writes that commit after a sync read past their `updated_at` or
+    tombstone id, simulated by backdating rows created after the sync.
+    """
+
+    def test_late_commits_are_sent_by_the_next_sync(self, client, task_factory, time_machine):
+        first, second, third = task_factory.create_batch(3, user=client.user_instance)
+        freed = TaskTombstone.objects.filter(task_id=first.id)
+        first.delete()
+        second.delete()
+        freed_id = freed.get().id
+        freed.delete()
+        started = timezone.now()
+        time_machine.move_to(started + timedelta(seconds=5))
+        since = self.sync(client)['since']
+
+        # Began before the sync, committed after it.
+        late = task_factory(user=client.user_instance, title="Late")
+        third.refresh_from_db()
+        Task.objects.filter(id=late.id).update(updated_at=third.updated_at - timedelta(milliseconds=1))
+        TaskTombstone.objects.create(id=freed_id, task_id=third.id, user=client.user_instance)
+        TaskTombstone.objects.filter(id=freed_id).update(deleted_at=started)
+        models.QuerySet.delete(Task.objects.filter(id=third.id))
+        time_machine.move_to(started + timedelta(seconds=10))
+
+        body = self.sync(client, since)
+
+        assert str(late.id) in [task['id'] for task in body['results']]
+        assert str(third.id) in body['deleted']
+
+    def test_window_is_sent_once_per_sync(self, client, task_factory, time_machine):
+        tasks = task_factory.create_batch(5, user=client.user_instance)
+        since = self.sync(client)['since']
+        time_machine.move_to(timezone.now() + timedelta(seconds=120))
+
+        seen = []
+        has_more = True
+        while has_more:
+            body = self.sync(client, since, limit=2)
+            seen += [task['id'] for task in body['results']]
+            since, has_more = body['since'], body['has_more']
+
+        assert sorted(seen) == sorted(str(task.id) for task in tasks)
+        assert self.sync(client, since)['results'] == []
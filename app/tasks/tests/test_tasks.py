@@ -185,3 +185,14 @@ class TestTasksEndPoints:
         response = api_client.get(retrieve_task_url)
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_admin_can_retrieve_any_task(self, task_factory, api_client, authenticate_user):
+        token = authenticate_user(is_admin=True)['token']
+        task = task_factory()
+
+        api_client_with_credentials(token, api_client)
+        retrieve_task_url = reverse('task:task-detail', args=[task.id])
+        response = api_client.get(retrieve_task_url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['title'] == task.title
@@ -0,0 +1,58 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .conftest import api_client_with_credentials
+from ..models import Task
+from ..serializers import TaskSerializer, TaskValuesSerializer
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTaskValuesSerializer:
+
+    def render_both(self, queryset):
+        slow = JSONRenderer().render(TaskSerializer(queryset, many=True).data)
+        fast = JSONRenderer().render(TaskValuesSerializer(TaskValuesSerializer.values(queryset)).data)
+        return slow, fast
+
+    def test_output_is_byte_identical(self, task_factory):
+        task_factory.create_batch(3)
+        task_factory(description=None, is_completed=False)
+        task_factory(title="Ünïcode ✓", description="")
+
+        slow, fast = self.render_both(Task.objects.all())
+
+        assert fast == slow
+
+    def test_output_follows_current_timezone(self, task_factory):
+        task_factory.create_batch(2)
+
+        with timezone.override("Asia/Kolkata"):
+            slow, fast = self.render_both(Task.objects.all())
+
+        assert fast == slow
+        assert b"+05:30" in fast
+
+    def test_list_endpoint_uses_identical_output(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(5, user=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        results = api_client.get(reverse("task:task-list")).json()['results']
+
+        expected = TaskSerializer(Task.objects.filter(user=user['user_instance']), many=True).data
+        assert results == [dict(task) for task in expected]
+
+    def test_search_pages_follow_cursors(self, task_factory, api_client, authenticate_user):
+        user = authenticate_user()
+        task_factory.create_batch(5, user=user['user_instance'], title="Errand")
+        api_client_with_credentials(user['token'], api_client)
+
+        first = api_client.get(reverse("task:task-list"), {"search": "errand", "page_size": 3}).json()
+        second = api_client.get(first['links']['next']).json()
+
+        assert set(first['results'][0]) == set(TaskSerializer.Meta.fields)
+        assert len({task['id'] for task in first['results'] + second['results']}) == 5
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from ..async_views import TaskDetailAsyncView, TaskListAsyncView
 from ..views import TaskViewSets
 
 app_name = 'task'
@@ -8,6 +10,15 @@ app_name = 'task'
 router = DefaultRouter()
 router.register('', TaskViewSets)
 
+# Same URLs and names as the router's list and detail routes.
+async_urlpatterns = [
+    path('', TaskListAsyncView.as_view(), name='task-list'),
+    path('<uuid:id>/', TaskDetailAsyncView.as_view(), name='task-detail'),
+]
+
 urlpatterns = [
     path('', include(router.urls)),
 ]
+
+if settings.TASKS_ASYNC_VIEWS:
+    urlpatterns = async_urlpatterns + urlpatterns
@@ -1,27 +1,61 @@
-from django.shortcuts import get_object_or_404
+from contextlib import ExitStack
+from itertools import chain
+from uuid import UUID
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.http import Http404
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
 
 from rest_framework import viewsets
 from rest_framework import permissions
-from rest_framework import filters
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
 
 
+from core.fieldsets import SparseFieldsViewMixin
+from core.pagination import KeysetPagination
+from core.routers import ReplicaReadsMixin, reset_replica, use_primary
 from user.utils import is_admin_user
 
-from .models import Task
-from .serializers import TaskSerializer
+from .cache import ALL_USERS, task_list_cache
+from .conditional import get_list_etag, get_not_modified, get_task_validators, list_state
+from .export import EXPORT_WRITERS, stream_tasks
+from .filters import TaskSearchFilter
+from .imports import TaskImporter, TaskImportSerializer
+from .models import ArchivedTask, Task, TaskStats, TaskTombstone
+from .serializers import (
+    BULK_MAX_ITEMS,
+    BulkDeleteTaskSerializer,
+    BulkUpdateTaskSerializer,
+    TaskSerializer,
+    TaskValuesSerializer,
+)
 from .permissions import IsOwner
+from .shards import for_shard, is_sharded, shard_for_user, shard_querysets, user_tasks
+from .sync import get_changes
 # Create your views here.
 
 
-class TaskViewSets(viewsets.ModelViewSet):
+class TaskViewSets(ReplicaReadsMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """ A viewset for the Task Model. """
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
     http_method_names = ["get", "post", "patch", "delete"]
     lookup_field = "id"
-    filter_backends = [filters.SearchFilter]
-    search_fields = ["title"]
+    pagination_class = KeysetPagination
+    export_chunk_size = 2000
+    import_batch_size = 1000
+    filter_backends = [TaskSearchFilter]
+    search_fields = ["title", "description"]
+    include_archived_param = "include_archived"
 
     def get_queryset(self):
         """ Users can list only their events and admins can list all. """
@@ -30,19 +64,325 @@ class TaskViewSets(viewsets.ModelViewSet):
         if is_admin_user(user):
             return Task.objects.all()
         else:
-            return Task.objects.filter(user=user)
+            return user_tasks(user.id)
+
+    def get_querysets(self):
+        """
+        `get_queryset` split by shard: admins of a sharded setup read every
+        shard, everyone else one queryset. Reads with `?include_archived=1`
+        add the matching `ArchivedTask` querysets.
+        """
+        user = self.request.user
+        if is_sharded() and is_admin_user(user):
+            querysets = shard_querysets(Task)
+        else:
+            querysets = [self.get_queryset()]
+
+        if self.include_archived():
+            if self.request.query_params.get(TaskSearchFilter.search_param):
+                raise ValidationError(
+                    {self.include_archived_param: ["Archived tasks cannot be searched."]})
+            if is_admin_user(user):
+                querysets += shard_querysets(ArchivedTask)
+            else:
+                querysets.append(for_shard(ArchivedTask, user.id).filter(user_id=user.id))
+        return querysets
+
+    def include_archived(self):
+        return (
+            self.request.method in SAFE_METHODS
+            and self.request.query_params.get(self.include_archived_param) in ("1", "true")
+        )
+
+    def atomic(self):
+        """ A transaction on every database `get_querysets` reads. """
+        stack = ExitStack()
+        for queryset in self.get_querysets():
+            stack.enter_context(transaction.atomic(using=queryset.db))
+        return stack
     
     def get_object(self):
-        # Custom logic to retrieve the object based on the request
+        if self.include_archived():
+            return self.get_task(Task, ArchivedTask)
+        return self.get_task(Task)
+
+    def get_task(self, *models):
+        """
+        Fetch the task by primary key in a single query, looking in the
+        user's own shard first, then in the other `models`. `IsOwner` then
+        authorizes it on `user_id`, so non-owners still get a 403. With
+        `?fields=` only those columns are read, plus the ones the permission
+        check and the ETag need.
+        """
         task_id = self.kwargs.get('id')
+        fields = self.get_requested_fields()
+        querysets = chain.from_iterable(
+            shard_querysets(model, self.request.user.id) for model in models)
 
-        # Customize the logic based on your requirements
-        obj = get_object_or_404(Task, id=task_id)
+        for queryset in querysets:
+            if fields is not None:
+                queryset = queryset.only(*fields, "user", "updated_at")
+            try:
+                obj = queryset.get(id=task_id)
+                break
+            except queryset.model.DoesNotExist:
+                continue
+        else:
+            raise Http404
 
         self.check_object_permissions(self.request, obj)
 
         return obj
 
+    def list(self, request, *args, **kwargs):
+        """
+        Serve repeated listings from `task_list_cache` until the user's
+        tasks change, and answer If-None-Match with a 304 before the page
+        query runs. The ETag covers the filtered list's newest `updated_at`
+        and its row count, so edits, additions and deletions all change it.
+        No Last-Modified is sent: a deletion does not advance the newest
+        `updated_at`.
+
+        Admins list every task, where the aggregate would scan the whole
+        table, so their lists are cached but not validated.
+
+        Misses read the primary: a page read from a lagging replica would
+        be cached as current until the next write.
+        """
+        is_admin = is_admin_user(request.user)
+        cache_key = task_list_cache.make_key(request, ALL_USERS if is_admin else request.user.id)
+        entry = task_list_cache.get(cache_key)
+        if entry is not None:
+            return self.get_cached_list(entry)
+
+        token = use_primary()
+        try:
+            etag = None
+            if not is_admin:
+                queryset = self.filter_queryset(self.get_queryset())
+                etag = get_list_etag(request, queryset.order_by().aggregate(**list_state()))
+                not_modified = get_not_modified(request, etag)
+                if not_modified is not None:
+                    return not_modified
+
+            response = self.list_page()
+        finally:
+            reset_replica(token)
+        if etag:
+            response["ETag"] = etag
+        task_list_cache.set(cache_key, {"etag": etag, "data": response.data})
+        return response
+
+    def list_page(self):
+        """
+        `ListModelMixin.list` on `values()` rows, see `TaskValuesSerializer`,
+        merging the pages of every shard an admin reads.
+        """
+        fields = self.get_requested_fields()
+        querysets = [
+            TaskValuesSerializer.values(self.filter_queryset(queryset), fields)
+            for queryset in self.get_querysets()
+        ]
+        page = self.paginator.paginate_querysets(querysets, self.request, view=self)
+        return self.get_paginated_response(TaskValuesSerializer(page, fields).data)
+
+    def get_cached_list(self, entry):
+        etag = entry["etag"]
+        if etag is None:
+            return Response(entry["data"])
+        not_modified = get_not_modified(self.request, etag)
+        if not_modified is not None:
+            return not_modified
+        return Response(entry["data"], headers={"ETag": etag})
+
+    def retrieve(self, request, *args, **kwargs):
+        """ Answer If-None-Match/If-Modified-Since with a 304 before serializing. """
+        instance = self.get_object()
+        etag, last_modified = get_task_validators(request, instance, self.get_requested_fields())
+        not_modified = get_not_modified(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = Response(self.get_serializer(instance).data)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # Bodies and ETags depend on the negotiated renderer.
+        patch_vary_headers(response, ["Accept"])
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def get_pagination_count(self):
+        """
+        Totals of unsearched lists come from `TaskStats` instead of a
+        COUNT(*): one row for a user, one row per user for admins.
+        Archived tasks are not counted there.
+        """
+        if self.request.query_params.get(TaskSearchFilter.search_param) or self.include_archived():
+            return None
+        if is_admin_user(self.request.user):
+            return sum(
+                queryset.aggregate(total=Sum("total"))["total"] or 0
+                for queryset in shard_querysets(TaskStats)
+            )
+        return for_shard(TaskStats, self.request.user.id).for_user(self.request.user.id)["total"]
+
     def perform_create(self, serializer):
         # Set the user of the task to the authenticated user during creation
         serializer.save(user=self.request.user)
+
+    @action(detail=True, methods=["post"], url_path="restore")
+    def restore(self, request, id=None):
+        """ Move an archived task back to the user's tasks. """
+        archived = self.get_task(ArchivedTask)
+        restored = ArchivedTask.objects.using(archived._state.db).filter(id=archived.id).restore()
+        if not restored:
+            # Restored by another request meanwhile.
+            raise Http404
+        return Response(TaskSerializer(restored[0]).data)
+
+    @action(detail=False, methods=["get"], url_path="stats")
+    def stats(self, request):
+        """
+        Total, completed and pending task counts of the user, read from
+        `TaskStats`. Admins may ask for any user's with `?user=<id>`.
+        """
+        user_id = request.user.id
+        if is_admin_user(request.user) and "user" in request.query_params:
+            try:
+                # Parsed, so any spelling of the id hashes to the same shard.
+                user_id = UUID(request.query_params["user"])
+            except ValueError:
+                raise ValidationError({"user": ["Must be a valid UUID."]})
+        return Response(for_shard(TaskStats, user_id).for_user(user_id))
+
+    @action(detail=False, methods=["get"], url_path="changes")
+    def changes(self, request):
+        """
+        Tasks created or edited and ids of tasks deleted since the `since`
+        sync token, in batches of at most `limit`. Clients call again with
+        the returned `since` until `has_more` is false. Changes from just
+        before the previous sync are sent again, so clients merge by id.
+
+        Tokens cannot span shards, so admins of a sharded setup cannot sync.
+        """
+        shard = None
+        if is_admin_user(request.user):
+            if is_sharded():
+                raise ValidationError({"since": ["Changes across shards cannot be synced."]})
+            tombstones = TaskTombstone.objects.all()
+        else:
+            shard = shard_for_user(request.user.id)
+            tombstones = for_shard(TaskTombstone, request.user.id).filter(user=request.user)
+
+        changed, deleted, token, has_more = get_changes(
+            self.get_queryset(), tombstones, request.query_params.get("since"),
+            self.get_sync_limit(), shard)
+        return Response({
+            "since": token,
+            "has_more": has_more,
+            "results": TaskSerializer(changed, many=True).data,
+            "deleted": deleted,
+        })
+
+    def get_sync_limit(self):
+        max_limit = settings.TASK_SYNC_MAX_BATCH
+        try:
+            limit = int(self.request.query_params["limit"])
+        except (KeyError, ValueError):
+            return max_limit
+        return min(limit, max_limit) if limit > 0 else max_limit
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Stream every task the user can list (optionally narrowed by
+        `search`) as NDJSON, or CSV with `?type=csv`, in constant memory.
+        """
+        export_format = request.query_params.get("type", "ndjson")
+        if export_format not in EXPORT_WRITERS:
+            raise ValidationError({"type": [f"Choose one of: {', '.join(EXPORT_WRITERS)}."]})
+        querysets = [self.filter_queryset(queryset) for queryset in self.get_querysets()]
+        return stream_tasks(querysets, export_format, self.export_chunk_size)
+
+    @action(
+        detail=False, methods=["post"], url_path="import", url_name="import",
+        parser_classes=[MultiPartParser], serializer_class=TaskImportSerializer,
+    )
+    def import_tasks(self, request):
+        """
+        Create a task for every valid row of an uploaded CSV or NDJSON
+        `file`, reporting the rows that failed validation by line number.
+        """
+        serializer = TaskImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        importer = TaskImporter(request.user, self.import_batch_size)
+        result = importer.run(
+            serializer.validated_data["file"], serializer.validated_data["type"])
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["post", "patch", "delete"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Create (POST), update (PATCH) or delete (DELETE) up to BULK_MAX_ITEMS
+        tasks in one transaction, returning a result for every item.
+        """
+        if request.method == "POST":
+            return self.bulk_create(request)
+        if request.method == "PATCH":
+            return self.bulk_update(request)
+        return self.bulk_destroy(request)
+
+    def bulk_create(self, request):
+        serializer = TaskSerializer(
+            data=request.data, many=True, max_length=BULK_MAX_ITEMS)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic(using=shard_for_user(request.user.id)):
+            serializer.save(user=request.user)
+        results = [
+            {"id": task["id"], "status": status.HTTP_201_CREATED, "data": task}
+            for task in serializer.data
+        ]
+        return Response({"results": results}, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request):
+        serializer = BulkUpdateTaskSerializer(
+            data=request.data, many=True, partial=True, max_length=BULK_MAX_ITEMS)
+        serializer.is_valid(raise_exception=True)
+        ids = [item["id"] for item in serializer.validated_data]
+
+        with self.atomic():
+            serializer.instance = list(chain.from_iterable(
+                queryset.filter(id__in=ids).select_for_update() for queryset in self.get_querysets()))
+            updated = {task.id: task for task in serializer.save()}
+
+        results = []
+        for task_id in ids:
+            if task_id in updated:
+                data = TaskSerializer(updated[task_id]).data
+                results.append({"id": task_id, "status": status.HTTP_200_OK, "data": data})
+            else:
+                results.append({"id": task_id, "status": status.HTTP_404_NOT_FOUND})
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    def bulk_destroy(self, request):
+        serializer = BulkDeleteTaskSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+
+        found = set()
+        with self.atomic():
+            for queryset in self.get_querysets():
+                queryset = queryset.filter(id__in=ids)
+                found.update(queryset.select_for_update().values_list("id", flat=True))
+                queryset.delete()
+
+        results = [
+            {
+                "id": task_id,
+                "status": status.HTTP_204_NO_CONTENT if task_id in found else status.HTTP_404_NOT_FOUND,
+            }
+            for task_id in ids
+        ]
+        return Response({"results": results}, status=status.HTTP_200_OK)
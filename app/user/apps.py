@@ -1,7 +1,20 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 from django.utils.translation import gettext_lazy as _
 
 
 class UserConfig(AppConfig):
     name = 'user'
     verbose_name = _('user')
+
+    def ready(self):
+        from core.metrics import register_collector
+
+        from .hashing import collect_metrics
+        from .models import User
+        from .signals import drop_cached_user
+
+        register_collector(collect_metrics)
+
+        post_save.connect(drop_cached_user, sender=User)
+        post_delete.connect(drop_cached_user, sender=User)
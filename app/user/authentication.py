@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_CACHE_KEY = "auth:user:{}"
+
+# What authentication and permission checks read. The other fields, the
+# password hash among them, are deferred and loaded on first access.
+CACHED_USER_FIELDS = ("id", "email", "is_active", "is_staff", "is_superuser", "is_admin")
+
+
+def get_user_cache():
+    return caches[getattr(settings, "AUTH_USER_CACHE_ALIAS", "default")]
+
+
+def user_cache_key(user_id) -> str:
+    return USER_CACHE_KEY.format(user_id)
+
+
+def invalidate_cached_user(user_id) -> None:
+    get_user_cache().delete(user_cache_key(user_id))
+
+
+def to_cached_user(user) -> dict:
+    return {name: getattr(user, name) for name in CACHED_USER_FIELDS}
+
+
+def from_cached_user(user_model, fields):
+    # `from_db` takes the values in the model's field order.
+    names = [field.attname for field in user_model._meta.concrete_fields if field.attname in fields]
+    return user_model.from_db(user_model._default_manager.db, names, [fields[name] for name in names])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that keeps the token's user in the cache, keyed by the
+    user id claim, instead of selecting it on every request. Only
+    CACHED_USER_FIELDS are kept.
+
+    Entries are dropped whenever the user is saved or deleted (see
+    `user.signals`), so deactivation and admin changes apply on the next
+    request, given a cache shared by every process; otherwise within
+    AUTH_USER_CACHE_TIMEOUT.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        cache = get_user_cache()
+        key = user_cache_key(user_id)
+        values = cache.get(key)
+        if values is None:
+            user = super().get_user(validated_token)
+            cache.set(key, to_cached_user(user), getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 30))
+            return user
+
+        user = from_cached_user(self.user_model, values)
+        self.check_user(validated_token, user)
+        return user
+
+    async def aauthenticate(self, request):
+        """ `authenticate` for async views, looking the user up through the async ORM. """
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        cache = get_user_cache()
+        key = user_cache_key(user_id)
+        values = await cache.aget(key)
+        if values is None:
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            self.check_user(validated_token, user)
+            await cache.aset(key, to_cached_user(user), getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 30))
+            return user
+
+        user = from_cached_user(self.user_model, values)
+        self.check_user(validated_token, user)
+        return user
+
+    def check_user(self, validated_token, user):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
@@ -0,0 +1,211 @@
+"""
+Password hashing off the request thread.
+
+PBKDF2 deliberately burns CPU for hundreds of milliseconds. Hashing and
+verification are handed to a bounded process pool so request workers (WSGI
+threads or the ASGI event loop) only wait on a future. When more than
+PASSWORD_HASHING_MAX_PENDING jobs are waiting the request is refused with a
+503 instead of queueing behind everyone else.
+"""
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingServiceBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "The server is busy, please retry shortly."
+    default_code = "hashing_busy"
+    # Sent back as Retry-After by DRF's exception handler.
+    wait = 1
+
+
+@lru_cache
+def _load_hashers(paths):
+    return [import_string(path)() for path in paths]
+
+
+def _hash(paths, password):
+    """ Runs in a pool worker: encode `password` with the preferred hasher. """
+    hasher = _load_hashers(paths)[0]
+    return hasher.encode(password, hasher.salt())
+
+
+def _verify(paths, password, encoded):
+    """ Runs in a pool worker: return (is_correct, must_update). """
+    available = _load_hashers(paths)
+    algorithm = encoded.split("$", 1)[0]
+    hasher = next((h for h in available if h.algorithm == algorithm), None)
+    if hasher is None:
+        return False, False
+    preferred = available[0]
+    is_correct = hasher.verify(password, encoded)
+    must_update = hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+    return is_correct, must_update
+
+
+class PasswordHashingService:
+    """ Runs password hashers in a process pool with a bounded backlog. """
+
+    def __init__(self, workers, max_pending, timeout):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "pending": 0,
+            "completed": 0,
+            "rejected": 0,
+            "seconds_total": 0.0,
+            "seconds_max": 0.0,
+        }
+
+    @property
+    def executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                # spawn rather than fork: request threads may hold locks.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def submit(self, fn, *args):
+        """ Start `fn(*args)` and return a future, or refuse when saturated. """
+        if not self._slots.acquire(blocking=False):
+            self._record(rejected=True)
+            raise HashingServiceBusy()
+
+        started = time.perf_counter()
+        with self._stats_lock:
+            self._stats["pending"] += 1
+
+        def done(_future):
+            self._slots.release()
+            self._record(seconds=time.perf_counter() - started)
+
+        try:
+            if self.workers:
+                future = self.executor.submit(fn, *args)
+            else:
+                future = _run_inline(fn, *args)
+        except BaseException:
+            done(None)
+            raise
+        future.add_done_callback(done)
+        return future
+
+    def run(self, fn, *args):
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise HashingServiceBusy()
+
+    async def arun(self, fn, *args):
+        future = self.submit(fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise HashingServiceBusy()
+
+    def _record(self, seconds=None, rejected=False):
+        with self._stats_lock:
+            if rejected:
+                self._stats["rejected"] += 1
+                return
+            self._stats["pending"] -= 1
+            self._stats["completed"] += 1
+            self._stats["seconds_total"] += seconds
+            self._stats["seconds_max"] = max(self._stats["seconds_max"], seconds)
+
+    def stats(self) -> dict:
+        """ Counters for monitoring: backlog, throughput and latency. """
+        with self._stats_lock:
+            return dict(self._stats, max_pending=self.max_pending, workers=self.workers)
+
+
+def _run_inline(fn, *args):
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except BaseException as exc:
+        future.set_exception(exc)
+    return future
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_hashing_service() -> PasswordHashingService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = PasswordHashingService(
+                workers=getattr(settings, "PASSWORD_HASHING_WORKERS", 0),
+                max_pending=getattr(settings, "PASSWORD_HASHING_MAX_PENDING", 32),
+                timeout=getattr(settings, "PASSWORD_HASHING_TIMEOUT", 10),
+            )
+        return _service
+
+
+def _hasher_paths():
+    return tuple(settings.PASSWORD_HASHERS)
+
+
+def make_password(password):
+    """ Drop-in for django.contrib.auth.hashers.make_password. """
+    if password is None:
+        return hashers.make_password(None)
+    return get_hashing_service().run(_hash, _hasher_paths(), password)
+
+
+def verify_password(password, encoded):
+    """ Return (is_correct, must_update) for `password` against `encoded`. """
+    if password is None or not encoded or not hashers.is_password_usable(encoded):
+        return False, False
+    return get_hashing_service().run(_verify, _hasher_paths(), password, encoded)
+
+
+async def amake_password(password):
+    if password is None:
+        return hashers.make_password(None)
+    return await get_hashing_service().arun(_hash, _hasher_paths(), password)
+
+
+async def averify_password(password, encoded):
+    if password is None or not encoded or not hashers.is_password_usable(encoded):
+        return False, False
+    return await get_hashing_service().arun(_verify, _hasher_paths(), password, encoded)
+
+
+def collect_metrics():
+    """ Hashing pool samples for `core.metrics`. """
+    stats = get_hashing_service().stats()
+    return [
+        ("password_hashing_pending", "gauge", "Hashing jobs running or queued.", stats["pending"]),
+        ("password_hashing_completed_total", "counter", "Hashing jobs finished.", stats["completed"]),
+        ("password_hashing_rejected_total", "counter", "Hashing jobs refused with a 503.", stats["rejected"]),
+        ("password_hashing_seconds_total", "counter", "Time spent on hashing jobs.", stats["seconds_total"]),
+    ]
@@ -0,0 +1,18 @@
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from jobs.queue import job
+
+from .models import User
+
+
+@job
+def save_last_login(user_id, logged_in_at):
+    """
+    Move the user's `last_login` forward to `logged_in_at`. Only ever
+    forward, so retried or reordered jobs cannot rewind it.
+    """
+    logged_in_at = parse_datetime(logged_in_at)
+    User.objects.filter(id=user_id).filter(
+        Q(last_login__isnull=True) | Q(last_login__lt=logged_in_at)
+    ).update(last_login=logged_in_at)
@@ -1,12 +1,18 @@
 import uuid
+from datetime import timedelta
 
+from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
+from django.core.cache import cache
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
+from . import hashing
 from .managers import CustomUserManager
 
+LAST_LOGIN_KEY = "user:last-login:{}"
+
 
 class User(AbstractBaseUser, PermissionsMixin):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -31,6 +37,42 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self) -> str:
         return self.email
 
+    def set_password(self, raw_password) -> None:
+        """ Hash through the worker pool instead of on the request thread. """
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password) -> bool:
+        is_correct, must_update = hashing.verify_password(raw_password, self.password)
+        if is_correct and must_update:
+            # Re-hash with the preferred hasher, as AbstractBaseUser does.
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=["password"])
+        return is_correct
+
+    async def acheck_password(self, raw_password) -> bool:
+        is_correct, must_update = await hashing.averify_password(raw_password, self.password)
+        if is_correct and must_update:
+            self.password = await hashing.amake_password(raw_password)
+            await self.asave(update_fields=["password"])
+        return is_correct
+
     def save_last_login(self) -> None:
-        self.last_login = timezone.now()
-        self.save()
\ No newline at end of file
+        """
+        Record a login. The write to `last_login` is queued as a job, so
+        logins do not contend for the user's row. Logins closer together
+        than LAST_LOGIN_UPDATE_INTERVAL seconds are coalesced into the
+        first one's write: `last_login` only changes once a worker ran the
+        job, so a key in the default cache marks the interval meanwhile.
+        """
+        from .jobs import save_last_login
+
+        now = timezone.now()
+        seconds = getattr(settings, "LAST_LOGIN_UPDATE_INTERVAL", 0)
+        if self.last_login and now - self.last_login < timedelta(seconds=seconds):
+            return
+        if seconds and not cache.add(LAST_LOGIN_KEY.format(self.id), True, seconds):
+            return
+        self.last_login = now
+        save_last_login.enqueue(user_id=self.id, logged_in_at=now)
\ No newline at end of file
@@ -2,19 +2,24 @@ from datetime import timedelta
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.hashers import make_password
 from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 from rest_framework import exceptions, serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer, TokenObtainSerializer)
 
+from core.fieldsets import SparseFieldsSerializerMixin
+
+from .hashing import make_password
 from .models import User
 
 
 class CustomObtainTokenPairSerializer(TokenObtainPairSerializer):
 
     def validate(self, attrs):
-        data = super().validate(attrs)
+        # Only authenticate here: TokenObtainPairSerializer.validate would
+        # mint a token pair that is then thrown away.
+        data = TokenObtainSerializer.validate(self, attrs)
         options = {"hours": settings.TOKEN_LIFESPAN}
         refresh = self.get_token(self.user)
         access_token = refresh.access_token
@@ -38,7 +43,7 @@ class TokenDecodeSerializer(serializers.Serializer):
     token = serializers.CharField(required=True)
 
 
-class ListUserSerializer(serializers.ModelSerializer):
+class ListUserSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = get_user_model()
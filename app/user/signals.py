@@ -0,0 +1,9 @@
+from .authentication import invalidate_cached_user
+
+
+def drop_cached_user(sender, instance, update_fields=None, **kwargs):
+    """ Forget the authenticated user cached for `instance`. """
+    # A login only moves last_login, which authentication never reads.
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    invalidate_cached_user(instance.pk)
@@ -1,6 +1,10 @@
 import pytest
 from django.urls import reverse
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from jobs.models import Job
+from jobs.worker import Worker
 
 from .conftest import api_client_with_credentials
 
@@ -77,4 +81,56 @@ class TestAuthEndpoints:
             self.password_change_url, data, format="json")
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
+    def test_login_only_writes_last_login(self, api_client, active_user, auth_user_password):
+        updated_at = active_user.updated_at
+        data = {
+            "email": active_user.email,
+            "password": auth_user_password
+        }
+        response = api_client.post(self.login_url, data)
+        assert response.status_code == status.HTTP_200_OK
+        Worker().run_pending()
+        active_user.refresh_from_db()
+        assert active_user.last_login is not None
+        assert active_user.updated_at == updated_at
+
+    def test_logins_within_interval_are_coalesced(
+            self, api_client, active_user, auth_user_password, settings, django_assert_num_queries):
+        settings.LAST_LOGIN_UPDATE_INTERVAL = 60
+        data = {
+            "email": active_user.email,
+            "password": auth_user_password
+        }
+        api_client.post(self.login_url, data)
+        Worker().run_pending()
+        active_user.refresh_from_db()
+        first_login = active_user.last_login
+
+        with django_assert_num_queries(1):
+            response = api_client.post(self.login_url, data)
 
+        assert response.status_code == status.HTTP_200_OK
+        assert Worker().run_pending() == 0
+        active_user.refresh_from_db()
+        assert active_user.last_login == first_login
+
+    def test_logins_are_coalesced_before_the_job_runs(self, api_client, active_user, auth_user_password, settings):
+        settings.LAST_LOGIN_UPDATE_INTERVAL = 60
+        data = {
+            "email": active_user.email,
+            "password": auth_user_password
+        }
+        for _ in range(3):
+            assert api_client.post(self.login_url, data).status_code == status.HTTP_200_OK
+
+        assert Job.objects.count() == 1
+
+    def test_access_token_uses_token_lifespan(self, api_client, active_user, auth_user_password, settings):
+        data = {
+            "email": active_user.email,
+            "password": auth_user_password
+        }
+        response = api_client.post(self.login_url, data)
+        access = AccessToken(response.json()['access'])
+        lifetime = access['exp'] - access['iat']
+        assert lifetime == settings.TOKEN_LIFESPAN * 3600
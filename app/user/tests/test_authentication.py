@@ -0,0 +1,77 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from .conftest import api_client_with_credentials
+from ..authentication import get_user_cache, user_cache_key
+
+pytestmark = pytest.mark.django_db
+
+
+class TestCachedJWTAuthentication:
+    task_list_url = reverse("task:task-list")
+
+    def test_cached_user_skips_the_user_query(self, api_client, authenticate_user, django_assert_num_queries):
+        user = authenticate_user()
+        api_client_with_credentials(user['token'], api_client)
+        api_client.get(self.task_list_url)
+
+        # Only the list's ETag aggregate and page query, no user lookup. A
+        # new query string keeps the page itself out of the list cache.
+        with django_assert_num_queries(2):
+            response = api_client.get(self.task_list_url, {"page_size": 5})
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_saving_user_invalidates_cache(self, api_client, authenticate_user):
+        user = authenticate_user()
+        user_instance = user['user_instance']
+        api_client_with_credentials(user['token'], api_client)
+        api_client.get(self.task_list_url)
+        assert get_user_cache().get(user_cache_key(user_instance.id)) is not None
+
+        user_instance.is_active = False
+        user_instance.save()
+
+        assert get_user_cache().get(user_cache_key(user_instance.id)) is None
+        response = api_client.get(self.task_list_url)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_only_authorization_fields_are_cached(self, api_client, authenticate_user, auth_user_password):
+        user = authenticate_user()
+        user_instance = user['user_instance']
+        api_client_with_credentials(user['token'], api_client)
+        api_client.get(self.task_list_url)
+
+        assert "password" not in get_user_cache().get(user_cache_key(user_instance.id))
+
+        # The password hash is loaded when needed, and saved alone.
+        response = api_client.post(
+            reverse('auth:password-change-list'),
+            {'old_password': auth_user_password, 'new_password': 'newpass@@'}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        user_instance.refresh_from_db()
+        assert user_instance.check_password('newpass@@')
+        assert user_instance.is_active
+
+    def test_admin_flag_change_applies_on_next_request(self, api_client, authenticate_user, task_factory):
+        user = authenticate_user()
+        user_instance = user['user_instance']
+        task_factory()
+        api_client_with_credentials(user['token'], api_client)
+        assert api_client.get(self.task_list_url).json()['results'] == []
+
+        user_instance.is_admin = True
+        user_instance.save()
+
+        assert len(api_client.get(self.task_list_url).json()['results']) == 1
+
+    def test_deleted_user_is_rejected(self, api_client, authenticate_user):
+        user = authenticate_user()
+        api_client_with_credentials(user['token'], api_client)
+        api_client.get(self.task_list_url)
+
+        user['user_instance'].delete()
+
+        response = api_client.get(self.task_list_url)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,44 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .conftest import api_client_with_credentials
+
+pytestmark = pytest.mark.django_db
+
+
+class TestUserSparseFieldsets:
+    user_list_url = reverse("user:user-list")
+
+    def test_list_returns_requested_fields_only(self, api_client, user_factory, authenticate_user):
+        user_factory.create_batch(2)
+        user = authenticate_user(is_admin=True)
+        api_client_with_credentials(user['token'], api_client)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(self.user_list_url, {"fields": "email"})
+
+        assert response.status_code == 200
+        assert all(list(item) == ["email"] for item in response.json()['results'])
+        assert '"password"' not in queries.captured_queries[-1]['sql']
+
+    def test_retrieve_returns_requested_fields_only(self, api_client, authenticate_user):
+        user = authenticate_user()
+        api_client_with_credentials(user['token'], api_client)
+        url = reverse("user:user-detail", kwargs={"pk": user['user_instance'].id})
+
+        response = api_client.get(url, {"fields": "id,firstname"})
+
+        assert response.json() == {
+            "id": str(user['user_instance'].id),
+            "firstname": user['user_instance'].firstname,
+        }
+
+    def test_unknown_field_is_rejected(self, api_client, authenticate_user):
+        user = authenticate_user()
+        api_client_with_credentials(user['token'], api_client)
+
+        response = api_client.get(self.user_list_url, {"fields": "password"})
+
+        assert response.status_code == 400
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from django.contrib.auth.hashers import get_hasher
+from django.urls import reverse
+from rest_framework import status
+
+from .. import hashing
+from ..hashing import PasswordHashingService
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def service(monkeypatch):
+    def _service(**kwargs):
+        options = {"workers": 0, "max_pending": 4, "timeout": 10, **kwargs}
+        instance = PasswordHashingService(**options)
+        monkeypatch.setattr(hashing, "_service", instance)
+        return instance
+    yield _service
+    if isinstance(hashing._service, PasswordHashingService):
+        hashing._service.shutdown()
+
+
+class TestPasswordHashing:
+    login_url = reverse("auth:login")
+
+    def test_hash_and_verify_in_worker_process(self, service):
+        service(workers=1)
+
+        encoded = hashing.make_password("passer@@@111")
+
+        assert encoded.startswith("pbkdf2_sha256$")
+        assert hashing.verify_password("passer@@@111", encoded) == (True, False)
+        assert hashing.verify_password("wrong", encoded) == (False, False)
+
+    def test_async_hash_and_verify(self, service):
+        service(workers=1)
+
+        async def roundtrip():
+            encoded = await hashing.amake_password("passer@@@111")
+            return await hashing.averify_password("passer@@@111", encoded)
+
+        assert asyncio.run(roundtrip()) == (True, False)
+
+    def test_unusable_password_never_verifies(self, service):
+        service()
+
+        assert hashing.verify_password("anything", hashing.make_password(None)) == (False, False)
+        assert hashing.verify_password("anything", None) == (False, False)
+
+    def test_stats_track_completed_jobs(self, service):
+        instance = service()
+
+        hashing.make_password("passer@@@111")
+        stats = instance.stats()
+
+        assert stats["completed"] == 1
+        assert stats["pending"] == 0
+        assert stats["seconds_total"] > 0
+
+    def test_saturated_pool_answers_503(self, service, api_client, active_user, auth_user_password):
+        instance = service(max_pending=1)
+        instance._slots.acquire()
+
+        data = {"email": active_user.email, "password": auth_user_password}
+        response = api_client.post(self.login_url, data)
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response["Retry-After"] == "1"
+        assert instance.stats()["rejected"] == 1
+
+    def test_outdated_hash_is_upgraded_on_login(self, service, settings, user_factory):
+        service()
+        settings.PASSWORD_HASHERS = [
+            "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+        ]
+        md5 = get_hasher("md5")
+        user = user_factory(is_active=True)
+        user.password = md5.encode("passer@@@111", md5.salt())
+        user.save()
+
+        assert user.check_password("passer@@@111")
+
+        user.refresh_from_db()
+        assert user.password.startswith("pbkdf2_sha256$")
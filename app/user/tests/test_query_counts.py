@@ -0,0 +1,103 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestUsersQueryBudget:
+    """
+    Exact number of SQL statements per users and auth endpoint once the
+    authenticated user is cached. Savepoints count: tests run in a transaction.
+    """
+    user_list_url = reverse("user:user-list")
+    login_url = reverse("auth:login")
+    password_change_url = reverse("auth:password-change-list")
+
+    @pytest.fixture
+    def client(self, client):
+        def _client(is_admin=False):
+            if is_admin:
+                client.user_instance.is_admin = True
+                client.user_instance.save()
+            # Warm the authentication cache.
+            client.get(self.user_list_url)
+            return client
+        return _client
+
+    def detail_url(self, user):
+        return reverse("user:user-detail", kwargs={"pk": user.id})
+
+    def test_list(self, client, django_assert_num_queries):
+        api_client = client()
+
+        with django_assert_num_queries(2):
+            response = api_client.get(self.user_list_url)
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_admin_list(self, client, user_factory, django_assert_num_queries):
+        api_client = client(is_admin=True)
+        user_factory.create_batch(3)
+
+        with django_assert_num_queries(2):
+            response = api_client.get(self.user_list_url)
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_retrieve(self, client, django_assert_num_queries):
+        api_client = client()
+
+        with django_assert_num_queries(1):
+            response = api_client.get(self.detail_url(api_client.user_instance))
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_update(self, client, django_assert_num_queries):
+        api_client = client()
+
+        with django_assert_num_queries(2):
+            response = api_client.patch(self.detail_url(api_client.user_instance), {"firstname": "Nike"})
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_admin_delete(self, client, user_factory, django_assert_num_queries):
+        api_client = client(is_admin=True)
+        app_user = user_factory()
+
+        with django_assert_num_queries(9):
+            response = api_client.delete(self.detail_url(app_user))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT, response.content
+
+    def test_signup(self, api_client, django_assert_num_queries):
+        data = {
+            "email": "new@example.com",
+            "firstname": "New",
+            "lastname": "User",
+            "password": "passer@@@111",
+        }
+
+        with django_assert_num_queries(5):
+            response = api_client.post(self.user_list_url, data)
+
+        assert response.status_code == status.HTTP_201_CREATED, response.content
+
+    def test_login(self, api_client, active_user, auth_user_password, django_assert_num_queries):
+        data = {"email": active_user.email, "password": auth_user_password}
+
+        with django_assert_num_queries(2):
+            response = api_client.post(self.login_url, data)
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_password_change(self, client, auth_user_password, django_assert_num_queries):
+        api_client = client()
+        data = {"old_password": auth_user_password, "new_password": "newpass@@"}
+
+        # The password hash is not cached with the user, then the update.
+        with django_assert_num_queries(2):
+            response = api_client.post(self.password_change_url, data)
+
+        assert response.status_code == status.HTTP_200_OK, response.content
@@ -9,6 +9,9 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.exceptions import AuthenticationFailed
 
+from core.fieldsets import SparseFieldsViewMixin
+from core.routers import ReplicaReadsMixin
+
 from .models import User
 from .utils import IsAdmin, is_admin_user
 from .serializers import (
@@ -36,7 +39,7 @@ class PasswordChangeView(viewsets.GenericViewSet):
         return Response({"message": "Your password has been updated."}, status.HTTP_200_OK)
 
 
-class UserViewsets(viewsets.ModelViewSet):
+class UserViewsets(ReplicaReadsMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = get_user_model().objects.all()
     serializer_class = ListUserSerializer
     permission_classes = [IsAuthenticated]
@@ -55,9 +58,13 @@ class UserViewsets(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user: User = self.request.user
+        queryset = super().get_queryset()
+        fields = self.get_requested_fields()
+        if fields is not None:
+            queryset = queryset.only(*fields)
         if is_admin_user(user):
-            return super().get_queryset().all()
-        return super().get_queryset().filter(id=user.id)
+            return queryset.all()
+        return queryset.filter(id=user.id)
 
     def get_serializer_class(self):
         if self.action in ["create"]: